@@ -0,0 +1,164 @@
+#===============================================================================
+# Bench Decode: JSON Decoder Benchmark
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Times each of the installed JSON decoders (``DECODERS``), and passing the body
+through undecoded (``raw_bytes``), on response bodies made to look like the
+ones the API sends back for ``getfiles``, and for ``get``, with a textfile.
+
+Usage:
+
+    python bench/bench_decode.py [number of rounds]
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dapiwrap import (
+    DECODERS,
+    GAMES
+)
+
+#===============================================================================
+# Recorded-Style Responses
+#===============================================================================
+
+WORDS = (
+    "doom map level wad megawad e1m1 base tech hell slaughter secret exit "
+    "boss cyberdemon imp shotgun plasma bfg zdoom boom limit-removing "
+    "vanilla tested by uploaded author thanks credits build time editor"
+).split()
+
+def make_file(rand, wad_id, full=False):
+    """
+    Makes a file record, like the ones in the API's responses.
+
+    :param rand: A ``random.Random``.
+    :param wad_id: The file's ID.
+    :param full: Whether to include the fields only ``get`` returns.
+
+    :returns: The record, in ``dict`` form.
+
+    """
+    def text(count):
+        return " ".join(rand.choice(WORDS) for _ in xrange(count))
+
+    wad_dir = "levels/%s/%s/" % (rand.choice(GAMES), rand.choice("abcdefg"))
+    filename = "%s%d.zip" % (rand.choice(WORDS)[0:5], wad_id)
+
+    record = {
+        "id": wad_id,
+        "title": text(3).title(),
+        "dir": wad_dir,
+        "filename": filename,
+        "size": rand.randint(1000, 20000000),
+        "age": rand.randint(700000000, 1400000000),
+        "date": "%d-%02d-%02d" % (
+            rand.randint(1994, 2014), rand.randint(1, 12), rand.randint(1, 28)
+        ),
+        "author": text(2).title(),
+        "email": "%s@example.com" % (rand.choice(WORDS)),
+        "description": text(25),
+        "rating": rand.uniform(0, 5),
+        "votes": rand.randint(0, 200),
+        "url": "http://www.doomworld.com/idgames/?id=%d" % (wad_id),
+        "idgamesurl": "idgames://%s%s" % (wad_dir, filename)
+    }
+
+    if full:
+        record.update({
+            "credits": text(10),
+            "base": text(4),
+            "buildtime": text(2),
+            "editors": text(3),
+            "bugs": text(8),
+            "textfile": "\r\n".join(text(12) for _ in xrange(150)),
+            "reviews": {"review": [
+                {"text": text(20), "vote": rand.randint(0, 5)}
+                for _ in xrange(rand.randint(1, 10))
+            ]}
+        })
+
+    return record
+
+def make_bodies(seed=1994):
+    """
+    Makes a ``getfiles`` response body, with 100 files, and a ``get``
+    response body.
+
+    :param seed: The random seed.
+
+    :returns: A list of ``(name, body)`` tuples.
+
+    """
+    rand = random.Random(seed)
+
+    getfiles = {"content": {"file": [
+        make_file(rand, x) for x in xrange(1000, 1100)
+    ]}, "meta": {"version": 3}}
+
+    get = {"content": make_file(rand, 1100, True), "meta": {"version": 3}}
+
+    return [
+        ("getfiles", json.dumps(getfiles)),
+        ("get", json.dumps(get))
+    ]
+
+#===============================================================================
+# Benchmark
+#===============================================================================
+
+def main(rounds=500):
+    """
+    Runs the benchmark, and prints the results.
+
+    :param rounds: How many times to decode each body.
+
+    :returns: None.
+
+    """
+    decoders = sorted(DECODERS.items())
+    decoders.append(("raw_bytes", lambda body: body))
+
+    print "%d rounds" % (rounds)
+    print "%-10s %10s %10s %12s" % ("response", "decoder", "bytes", "us/response")
+
+    for name, body in make_bodies():
+        expected = json.loads(body)
+
+        for decoder_name, decoder in decoders:
+            if decoder_name != "raw_bytes" and decoder(body) != expected:
+                print "%-10s %10s decodes differently!" % (name, decoder_name)
+                continue
+
+            start = time.time()
+            for _ in xrange(rounds):
+                decoder(body)
+            seconds = time.time() - start
+
+            print "%-10s %10s %10d %12.1f" % (
+                name, decoder_name, len(body), seconds / rounds * 1e6
+            )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,194 @@
+#===============================================================================
+# Bench Memory: WadInfo Memory Benchmark
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Measures how much memory a catalog takes, as plain ``dict`` objects, the way
+they come back from the API, and as ``WadInfo`` records, and times filtering
+and searching through each, checking they give the same results.
+
+The records are made up, by ``bench_decode``, and go through ``json`` so
+their text is ``unicode``, like a real response. Both the short records
+``getfiles`` and ``search`` return, and the full ones, with a textfile, that
+``get`` returns, are measured.
+
+Usage:
+
+    python bench/bench_memory.py [number of records]
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_decode import make_file
+
+from dapiwrap import (
+    DAPIWrap,
+    DOOM2,
+    FILTER_GAME,
+    FILTER_RATING,
+    FILTER_YEAR,
+    SORT_RATING,
+    TYPE_AUTHOR,
+    WadInfo
+)
+
+from dapiwrap.dapiwrecord import compact_records
+
+#===============================================================================
+# Benchmark
+#===============================================================================
+
+FILTERS = (
+    (FILTER_GAME, DOOM2),
+    (FILTER_YEAR, (1995, 2005)),
+    (FILTER_RATING, (3.0, 4.5))
+)
+
+def make_records(count, full=False, seed=1994):
+    """
+    Makes some records, as if they'd been decoded from a response.
+
+    :param count: The number of records.
+    :param full: Whether to make full records, with a textfile.
+    :param seed: The random seed.
+
+    :returns: A list of the records, in ``dict`` form.
+
+    """
+    rand = random.Random(seed)
+    records = [make_file(rand, x, full) for x in xrange(count)]
+
+    # Some authors, and their emails, are in the archive many times over.
+    authors = [(x["author"], x["email"]) for x in records[0:count // 20 + 1]]
+    for record in records:
+        record["author"], record["email"] = rand.choice(authors)
+
+    return json.loads(json.dumps(records))
+
+def deep_size(obj, seen=None):
+    """
+    Measures the memory an object takes, along with everything in it. Objects
+    that are in it more than once are only counted once.
+
+    :param obj: The object.
+    :param seen: The IDs of the objects already counted.
+
+    :returns: The size, in bytes.
+
+    """
+    if seen is None:
+        seen = set()
+
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        for key, value in obj.iteritems():
+            size += deep_size(key, seen) + deep_size(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            size += deep_size(item, seen)
+    elif isinstance(obj, WadInfo):
+        for slot in WadInfo.__slots__:
+            if hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+
+    return size
+
+def timed(func, *args):
+    """
+    Runs a function, and times it.
+
+    :returns: A tuple of the result, and the time taken, in seconds.
+
+    """
+    start = time.time()
+    result = func(*args)
+
+    return (result, time.time() - start)
+
+def main(count=20000):
+    """
+    Runs the benchmark, and prints the results.
+
+    :param count: The number of short records. A tenth as many full records
+    are made.
+
+    :returns: None.
+
+    """
+    daw = DAPIWrap()
+    params = {"type": TYPE_AUTHOR, "sort": SORT_RATING, "filter": FILTERS}
+
+    print "%-6s %8s %8s %10s %10s %7s %10s %10s %6s" % (
+        "kind", "records", "type", "MB", "bytes/rec", "saving",
+        "filter (s)", "search (s)", "same"
+    )
+
+    for kind, full, number in (
+            ("short", False, count),
+            ("full", True, count // 10)
+        ):
+        records = make_records(number, full)
+        compact, _ = timed(compact_records, records)
+
+        plain_size = deep_size(records)
+        compact_size = deep_size(compact)
+
+        for name, items, size in (
+                ("dict", records, plain_size),
+                ("WadInfo", compact, compact_size)
+            ):
+            filtered, filter_time = timed(daw.filter.chain, items, FILTERS)
+            found, search_time = timed(
+                daw.search_local, items, "doom", dict(params)
+            )
+
+            same = (
+                [x["id"] for x in filtered] ==
+                [x["id"] for x in daw.filter.chain(records, FILTERS)] and
+                [x["id"] for x in found] ==
+                [x["id"] for x in daw.search_local(
+                    records, "doom", dict(params)
+                )] and
+                daw.misc.make_id_list(items) == [x["id"] for x in records]
+            )
+
+            print "%-6s %8d %8s %10.1f %10d %6.1fx %10.4f %10.4f %6s" % (
+                kind, number, name, size / 1e6, size // number,
+                float(plain_size) / size, filter_time, search_time, same
+            )
+
+        if full:
+            same = all(
+                x["textfile"] == y["textfile"] for x, y in zip(records, compact)
+            )
+            print "%-6s textfiles decompress to the same text: %s" % (
+                kind, same
+            )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:2]])
@@ -0,0 +1,404 @@
+#===============================================================================
+# Bench Run: DAPIWrap Benchmark Suite
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Benchmarks ``DAPIWrap`` against the fake idgames servers, from ``dapiwfake``,
+so nothing is sent to Doomworld, or its mirrors. It measures:
+
+- The latency of single API calls (``call``).
+- How many IDs a second ``get_id_list`` gets, with several workers.
+- How many searches a second ``search``, and ``search_complete``, do.
+- How many bytes, and files, a second ``Downwad.bulk`` downloads, from the
+  HTTP mirror, and from the FTP mirror.
+
+Each benchmark is warmed up first, and then run several times, and the median
+of the runs is its result, so one slow run doesn't throw it off.
+
+The results can be saved, as JSON, and compared with earlier results, to spot
+regressions. Comparing exits with a status of 1 if anything got worse by more
+than the tolerance. Results with fewer runs than ``--min-samples``, on either
+side, are shown, but never counted as regressions.
+
+Usage:
+
+    python bench/run.py [--files N] [--latency SECONDS] [--bandwidth BYTES]
+                        [--rounds N] [--repeats N] [--warmup N]
+                        [--save FILE] [--compare FILE] [--tolerance RATIO]
+                        [--min-samples N]
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dapiwrap import (
+    A_GET_ID,
+    DIRECT_DESC,
+    FAKE_FILES,
+    SORT_RATING,
+    FakeIdgames
+)
+
+#===============================================================================
+# Benchmarks
+#===============================================================================
+
+QUERIES = ["doom", "map", "hell", "base", "tech", "e", "zzz", "castle"]
+
+def bench_call(fake, rounds):
+    """
+    Times single API calls, one after the other, with no cache.
+
+    :param fake: The running ``FakeIdgames``.
+    :param rounds: How many calls to make.
+
+    :returns: A ``dict`` of the results.
+
+    """
+    daw = fake.client()
+    files = len(fake.archive.records)
+    times = []
+
+    for x in xrange(rounds):
+        start = time.time()
+        daw.call(A_GET_ID, x % files + 1)
+        times.append(time.time() - start)
+
+    daw.close()
+    times.sort()
+
+    return {
+        "call_median_ms": result(times[len(times) // 2] * 1000, "ms", "lower"),
+        "call_p95_ms": result(
+            times[int(len(times) * 0.95)] * 1000, "ms", "lower"
+        )
+    }
+
+def bench_get_id_list(fake, rounds, workers=8):
+    """
+    Times getting a list of IDs, with several workers.
+
+    :param fake: The running ``FakeIdgames``.
+    :param rounds: How many IDs to get.
+    :param workers: How many to get at once.
+
+    :returns: A ``dict`` of the results.
+
+    """
+    daw = fake.client()
+    files = len(fake.archive.records)
+
+    start = time.time()
+    wads = daw.get_id_list(
+        [x % files + 1 for x in xrange(rounds)], workers=workers
+    )
+    seconds = time.time() - start
+
+    daw.close()
+
+    return {
+        "get_id_list_per_s": result(len(wads) / seconds, "ids/s", "higher")
+    }
+
+def bench_search(fake, rounds):
+    """
+    Times searches, and complete searches, one after the other.
+
+    :param fake: The running ``FakeIdgames``.
+    :param rounds: How many searches to do.
+
+    :returns: A ``dict`` of the results.
+
+    """
+    daw = fake.client()
+
+    start = time.time()
+    for x in xrange(rounds):
+        daw.search(
+            QUERIES[x % len(QUERIES)], {"sort": SORT_RATING, "dir": DIRECT_DESC}
+        )
+    search_seconds = time.time() - start
+
+    complete_rounds = max(1, rounds // 10)
+
+    start = time.time()
+    for x in xrange(complete_rounds):
+        daw.search_complete(QUERIES[x % len(QUERIES)])
+    complete_seconds = time.time() - start
+
+    daw.close()
+
+    return {
+        "search_per_s": result(rounds / search_seconds, "searches/s", "higher"),
+        "search_complete_per_s": result(
+            complete_rounds / complete_seconds, "searches/s", "higher"
+        )
+    }
+
+def bench_bulk(fake, rounds, per_mirror=4):
+    """
+    Times bulk downloads, from each mirror.
+
+    :param fake: The running ``FakeIdgames``.
+    :param rounds: How many files to download from each mirror.
+    :param per_mirror: How many files to download at once.
+
+    :returns: A ``dict`` of the results.
+
+    """
+    results = {}
+    files = len(fake.archive.records)
+
+    for name, server in (("http", fake.http.url), ("ftp", fake.ftp.url)):
+        daw = fake.client()
+        # Each file only once, as ``bulk`` fails files with the same target.
+        wads = daw.get_id_list(range(1, min(rounds, files) + 1))
+        dl_folder = tempfile.mkdtemp(prefix="dapiwrap-bench-") + os.sep
+
+        try:
+            report = daw.download.bulk(
+                wads, dl_folder, servers=[server], per_mirror=per_mirror
+            )
+        finally:
+            shutil.rmtree(dl_folder)
+            daw.close()
+
+        if report["failed"]:
+            raise IOError(
+                "%d %s downloads failed." % (report["failed"], name)
+            )
+
+        results["bulk_%s_mb_s" % (name)] = result(
+            report["bytes"] / report["seconds"] / 1e6, "MB/s", "higher"
+        )
+        results["bulk_%s_files_s" % (name)] = result(
+            report["ok"] / report["seconds"], "files/s", "higher"
+        )
+
+    return results
+
+# Every benchmark, in the order they're run.
+BENCHMARKS = (bench_call, bench_get_id_list, bench_search, bench_bulk)
+
+def median(values):
+    """
+    Gets the median of some values.
+
+    :param values: A list of numbers.
+
+    :returns: The median.
+
+    """
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+def result(value, unit, better):
+    """
+    Makes a result.
+
+    :param value: The measurement.
+    :param unit: The measurement's unit.
+    :param better: Which way is better, ``"lower"`` or ``"higher"``.
+
+    :returns: The result, in a ``dict``.
+
+    """
+    return {"value": value, "unit": unit, "better": better}
+
+def run_all(fake, rounds, repeats, warmup):
+    """
+    Runs every benchmark, warming each one up first, and then running it
+    several times.
+
+    :param fake: The running ``FakeIdgames``.
+    :param rounds: How many calls, searches and downloads each run times.
+    :param repeats: How many times to run each benchmark.
+    :param warmup: How many untimed runs to do first, with a tenth of the
+    rounds.
+
+    :returns: A ``dict`` of the results, each with the median of the runs as
+    its ``value``, and every run's measurement in ``samples``.
+
+    """
+    results = {}
+
+    for bench in BENCHMARKS:
+        for _ in xrange(warmup):
+            bench(fake, max(1, rounds // 10))
+
+        for _ in xrange(repeats):
+            for name, item in bench(fake, rounds).iteritems():
+                entry = results.setdefault(name, dict(item, samples=[]))
+                entry["samples"].append(item["value"])
+
+    for entry in results.itervalues():
+        entry["value"] = median(entry["samples"])
+
+    return results
+
+#===============================================================================
+# Saving & Comparing
+#===============================================================================
+
+def compare(results, baseline, tolerance, min_samples):
+    """
+    Compares results with earlier ones, and prints the differences.
+
+    :param results: The results of this run.
+    :param baseline: The results of an earlier run.
+    :param tolerance: How much worse, as a fraction, a result can be before
+    it counts as a regression.
+    :param min_samples: How many runs each side needs, for a result to count
+    as a regression.
+
+    :returns: A list of the names of the results that regressed.
+
+    """
+    if results["settings"] != baseline["settings"]:
+        print "Warning: the baseline was run with different settings: %s" % (
+            baseline["settings"]
+        )
+
+    regressions = []
+
+    print
+    print "%-24s %12s %12s %9s" % ("benchmark", "baseline", "now", "change")
+
+    for name in sorted(results["results"]):
+        now = results["results"][name]
+        then = baseline["results"].get(name)
+
+        if then is None or not then["value"]:
+            print "%-24s %12s %12.2f %9s" % (name, "-", now["value"], "new")
+            continue
+
+        change = now["value"] / then["value"] - 1
+        if now["better"] == "lower":
+            worse = change > tolerance
+        else:
+            worse = change < -tolerance
+
+        # Results saved before there were repeats count as one run.
+        samples = min(
+            len(now.get("samples", [None])), len(then.get("samples", [None]))
+        )
+
+        if samples < min_samples:
+            note = "too few runs (%d)" % (samples)
+        elif worse:
+            note = "REGRESSION"
+            regressions.append(name)
+        else:
+            note = ""
+
+        print "%-24s %12.2f %12.2f %+8.1f%% %s" % (
+            name, then["value"], now["value"], change * 100, note
+        )
+
+    return regressions
+
+def main(argv=None):
+    """
+    Runs the benchmarks, prints the results, and saves and compares them, if
+    asked to.
+
+    :param argv: The command line arguments.
+
+    :returns: The exit status.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=FAKE_FILES,
+        help="How many files the fake archive has.")
+    parser.add_argument("--latency", type=float, default=0.0,
+        help="The fake servers' latency, in seconds.")
+    parser.add_argument("--bandwidth", type=int, default=None,
+        help="The fake servers' bandwidth, in bytes per second.")
+    parser.add_argument("--rounds", type=int, default=100,
+        help="How many calls, searches and downloads each run times.")
+    parser.add_argument("--repeats", type=int, default=5,
+        help="How many times to run each benchmark.")
+    parser.add_argument("--warmup", type=int, default=1,
+        help="How many untimed runs of each benchmark to do first.")
+    parser.add_argument("--save", metavar="FILE",
+        help="Save the results to this file, as JSON.")
+    parser.add_argument("--compare", metavar="FILE",
+        help="Compare the results with those saved in this file.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+        help="How much worse a result can be before it's a regression.")
+    parser.add_argument("--min-samples", type=int, default=3,
+        help="How many runs a result needs to count as a regression.")
+    args = parser.parse_args(argv)
+
+    settings = {
+        "files": args.files,
+        "latency": args.latency,
+        "bandwidth": args.bandwidth,
+        "rounds": args.rounds,
+        "repeats": args.repeats,
+        "warmup": args.warmup
+    }
+
+    results = {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": {}
+    }
+
+    with FakeIdgames(args.files, args.latency, args.bandwidth) as fake:
+        results["results"] = run_all(
+            fake, args.rounds, args.repeats, args.warmup
+        )
+
+    print "%-24s %12s %12s %12s %s" % (
+        "benchmark", "median", "min", "max", "unit"
+    )
+    for name, item in sorted(results["results"].iteritems()):
+        print "%-24s %12.2f %12.2f %12.2f %s" % (
+            name, item["value"], min(item["samples"]), max(item["samples"]),
+            item["unit"]
+        )
+
+    if args.save:
+        with open(args.save, "w") as results_file:
+            json.dump(results, results_file, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, "r") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if compare(results, baseline, args.tolerance, args.min_samples):
+            return 1
+
+    return 0
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,16 @@
-from dapiwrap import DAPIWrap
+from dapiwrap import DECODERS, DAPIWrap
+from dapiwasync import AsyncDAPIWrap
+from dapiwcache import DiskCache, MemoryCache, TieredCache
+from dapiwcatalog import Catalog, CatalogView
 from dapiwconst import *
+from dapiwcrawl import CatalogSync, Crawler
+from dapiwfake import (
+    FakeAPI, FakeArchive, FakeFTPMirror, FakeHTTPMirror, FakeIdgames
+)
+from dapiwindex import SearchIndex
+from dapiwmapped import MappedCatalog
+from dapiwnet import (
+    FTPPool, MirrorMonitor, RateLimiter, SingleFlight, TokenBucket
+)
+from dapiwrecord import WadInfo
 from dapiwtools import *
\ No newline at end of file
@@ -0,0 +1,236 @@
+#===============================================================================
+# DAPIWAsync: Asynchronous Client for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``AsyncDAPIWrap``, a non-blocking version of ``DAPIWrap``.
+Every method returns right away, with an ``AsyncResult``, while the request
+itself runs on a pool of worker threads. Call ``.get()`` on the result to wait
+for the response, or pass a ``callback`` to have it handed over when it
+arrives.
+
+All of the requests are made through a single ``DAPIWrap`` instance, so they
+share its connection pool, and its rate limit.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+from dapiwconst import (
+    CONCURRENCY,
+    POOL_MAXSIZE
+)
+
+from dapiwrap import DAPIWrap
+
+#===============================================================================
+# AsyncDAPIWrap Class
+#===============================================================================
+
+class AsyncDAPIWrap(object):
+    """A non-blocking version of the DAPIWrap class."""
+
+    def __init__(self, daw=None, concurrency=CONCURRENCY, **kwargs):
+        """
+        The AsyncDAPIWrap init method.
+
+        :param daw: Optional. The DAPIWrap instance to make requests through.
+        If none is given, one is made, using any extra keyword arguments.
+        :param concurrency: The number of requests to have in flight at once.
+        Requests made past this are queued, and sending a new one waits, once
+        there are ``concurrency`` requests queued up on top of that.
+
+        """
+        if daw is None:
+            kwargs.setdefault("pool_maxsize", max(concurrency, POOL_MAXSIZE))
+            daw = DAPIWrap(**kwargs)
+
+        self.daw = daw
+        self.concurrency = concurrency
+
+        self._pool = ThreadPool(concurrency)
+        self._pending = threading.BoundedSemaphore(concurrency * 2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self, func, args):
+        """
+        Runs the given function on a worker thread, then frees its slot.
+
+        :param func: The function to run.
+        :param args: The arguments to call the function with.
+
+        :returns: The result of the function.
+
+        """
+        try:
+            return func(*args)
+        finally:
+            self._pending.release()
+
+    def _submit(self, func, args, callback=None):
+        """
+        Queues the given function to be run on the worker pool. Waits if too
+        many requests are already queued.
+
+        :param func: The function to run.
+        :param args: The arguments to call the function with.
+        :param callback: Optional. A function to call with the result.
+
+        :returns: An ``AsyncResult`` for the call.
+
+        """
+        self._pending.acquire()
+
+        try:
+            return self._pool.apply_async(
+                self._run, (func, args), callback=callback
+            )
+        except:
+            self._pending.release()
+            raise
+
+    def about(self, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.about``."""
+        return self._submit(self.daw.about, (raw,), callback)
+
+    def call(self, action, params=None, callback=None, raw_bytes=False):
+        """Asynchronous version of ``DAPIWrap.call``."""
+        return self._submit(
+            self.daw.call, (action, params, raw_bytes), callback
+        )
+
+    def close(self):
+        """
+        Waits for any queued requests to finish, then closes the worker pool,
+        and the DAPIWrap instance's connections.
+
+        :returns: None.
+
+        """
+        self._pool.close()
+        self._pool.join()
+        self.daw.close()
+
+    def dbping(self, callback=None):
+        """Asynchronous version of ``DAPIWrap.dbping``."""
+        return self._submit(self.daw.dbping, (), callback)
+
+    @staticmethod
+    def gather(results, timeout=None):
+        """
+        Waits for each of the given results.
+
+        :param results: A list of ``AsyncResult`` objects.
+        :param timeout: Optional. How long to wait for each result, in seconds.
+
+        :returns: A list of the results' values, in the same order.
+
+        """
+        return [x.get(timeout) for x in results]
+
+    def get_contents(self, path, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_contents``."""
+        return self._submit(self.daw.get_contents, (path, raw), callback)
+
+    def get_dirs(self, path, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_dirs``."""
+        return self._submit(self.daw.get_dirs, (path, raw), callback)
+
+    def get_file_path(self, path, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_file_path``."""
+        return self._submit(self.daw.get_file_path, (path, raw), callback)
+
+    def get_files(self, path, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_files``."""
+        return self._submit(self.daw.get_files, (path, raw), callback)
+
+    def get_id(self, wad_id, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_id``."""
+        return self._submit(self.daw.get_id, (wad_id, raw), callback)
+
+    def get_latestfiles(self, limit=10, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_latestfiles``."""
+        return self._submit(self.daw.get_latestfiles, (limit, raw), callback)
+
+    def get_latestvotes(self, limit=10, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_latestvotes``."""
+        return self._submit(self.daw.get_latestvotes, (limit, raw), callback)
+
+    def get_parent_dir(self, path, raw=False, callback=None):
+        """Asynchronous version of ``DAPIWrap.get_parent_dir``."""
+        return self._submit(self.daw.get_parent_dir, (path, raw), callback)
+
+    def ping(self, callback=None):
+        """Asynchronous version of ``DAPIWrap.ping``."""
+        return self._submit(self.daw.ping, (), callback)
+
+    def search(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search``."""
+        return self._submit(
+            self.daw.search, (query, dict(params or {})), callback
+        )
+
+    def search_author(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_author``."""
+        return self._submit(
+            self.daw.search_author, (query, dict(params or {})), callback
+        )
+
+    def search_credits(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_credits``."""
+        return self._submit(
+            self.daw.search_credits, (query, dict(params or {})), callback
+        )
+
+    def search_descrip(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_descrip``."""
+        return self._submit(
+            self.daw.search_descrip, (query, dict(params or {})), callback
+        )
+
+    def search_editors(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_editors``."""
+        return self._submit(
+            self.daw.search_editors, (query, dict(params or {})), callback
+        )
+
+    def search_email(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_email``."""
+        return self._submit(
+            self.daw.search_email, (query, dict(params or {})), callback
+        )
+
+    def search_text(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_text``."""
+        return self._submit(
+            self.daw.search_text, (query, dict(params or {})), callback
+        )
+
+    def search_title(self, query, params=None, callback=None):
+        """Asynchronous version of ``DAPIWrap.search_title``."""
+        return self._submit(
+            self.daw.search_title, (query, dict(params or {})), callback
+        )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
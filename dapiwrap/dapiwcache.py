@@ -0,0 +1,633 @@
+#===============================================================================
+# DAPIWCache: Response Caches for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains caches that can be given to ``DAPIWrap``, to keep API
+responses around, so repeated calls don't have to go to the Doomworld servers.
+
+Caches are keyed on the url of the API call, and hold the raw body of each
+response. How long a response is kept depends on its action (see
+``CACHE_TTL``, in ``dapiwconst``).
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from collections import OrderedDict
+
+from dapiwconst import (
+    CACHE_DISK_MAX_BYTES,
+    CACHE_DISK_TIMEOUT,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTL,
+    CACHE_TTL_DEFAULT
+)
+
+#===============================================================================
+# BaseCache Class
+#===============================================================================
+
+class BaseCache(object):
+    """The base class for the caches, which handles the time limits."""
+
+    def __init__(self, ttls=None, default_ttl=CACHE_TTL_DEFAULT):
+        """
+        The init method for the BaseCache class.
+
+        :param ttls: Optional. A ``dict`` of action constants, and how long,
+        in seconds, to keep their responses. Overrides ``CACHE_TTL``.
+        :param default_ttl: How long to keep the responses of any action not
+        in ``ttls``.
+
+        """
+        self.default_ttl = default_ttl
+        self.ttls = dict(CACHE_TTL)
+        if ttls:
+            self.ttls.update(ttls)
+
+    def ttl(self, action):
+        """
+        Gets how long to cache the responses of the given action.
+
+        :param action: An action constant from ``dapiwconst``.
+
+        :returns: The time to keep responses, in seconds.
+
+        """
+        return self.ttls.get(action, self.default_ttl)
+
+#===============================================================================
+# MemoryCache Class
+#===============================================================================
+
+class MemoryCache(BaseCache):
+    """
+    An in-memory, least recently used response cache, with a time limit for
+    each entry. Safe to share between threads.
+
+    """
+
+    def __init__(
+            self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+            ttls=None, default_ttl=CACHE_TTL_DEFAULT
+        ):
+        """
+        The init method for the MemoryCache class.
+
+        :param max_entries: The most responses to keep.
+        :param max_bytes: The most bytes of responses to keep.
+        :param ttls: Optional. A ``dict`` of action constants, and how long,
+        in seconds, to keep their responses. Overrides ``CACHE_TTL``.
+        :param default_ttl: How long to keep the responses of any action not
+        in ``ttls``.
+
+        """
+        super(MemoryCache, self).__init__(ttls, default_ttl)
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url, action=None):
+        """
+        Gets the cached response for the given url.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+        Actions that are never cached aren't looked up.
+
+        :returns: The body of the response, or ``None`` if it isn't cached, or
+        has expired.
+
+        """
+        entry = self.lookup(url, action)
+
+        if entry is None:
+            return None
+        return entry[1]
+
+    def lookup(self, url, action=None):
+        """
+        Gets the cached response for the given url, along with when it
+        expires.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+        Actions that are never cached aren't looked up.
+
+        :returns: A tuple of when the response expires, as a timestamp, and
+        its body, or ``None`` if it isn't cached, or has expired.
+
+        """
+        if action is not None and self.ttl(action) <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.pop(url, None)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, body = entry
+
+            if expires <= time.time():
+                self._bytes -= len(body)
+                self.misses += 1
+                return None
+
+            # Re-inserting moves the entry to the most recently used end.
+            self._entries[url] = entry
+            self.hits += 1
+
+            return entry
+
+    def invalidate(self, url=None):
+        """
+        Drops the cached response for the given url.
+
+        :param url: The url of the API call. If not given, every response
+        is dropped.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(url, None)
+                if entry is not None:
+                    self._bytes -= len(entry[1])
+
+    def set(self, url, body, action, expires=None):
+        """
+        Caches a response, dropping the least recently used responses, if the
+        cache is full.
+
+        :param url: The url of the API call.
+        :param body: The body of the response.
+        :param action: The action constant the call was made with.
+        :param expires: Optional. When the response expires, as a timestamp,
+        if it should be sooner than the action's time limit allows.
+
+        :returns: None.
+
+        """
+        expires = _expiry(self.ttl(action), expires)
+
+        if expires is None or len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+
+            self._entries[url] = (expires, body)
+            self._bytes += len(body)
+
+            while (
+                    len(self._entries) > self.max_entries or
+                    self._bytes > self.max_bytes
+                ):
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def stats(self):
+        """
+        Gets the cache's hit/miss counts, and how much it's holding.
+
+        :returns: A ``dict`` of the cache's stats.
+
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes
+            }
+
+#===============================================================================
+# DiskCache Class
+#===============================================================================
+
+class DiskCache(BaseCache):
+    """
+    A response cache stored in an SQLite database, so it lasts between runs. 
+    Responses are compressed, and the least recently used ones are dropped 
+    once the cache grows past its size limit. Can be shared by any number of 
+    threads, and processes, on the same machine.
+
+    """
+
+    # How often, in seconds, to record that a response has been used.
+    TOUCH_EVERY = 60
+
+    def __init__(
+            self, filename, max_bytes=CACHE_DISK_MAX_BYTES, ttls=None,
+            default_ttl=CACHE_TTL_DEFAULT, level=6
+        ):
+        """
+        The init method for the DiskCache class.
+
+        :param filename: The filename of the cache database. Made if it 
+        doesn't exist.
+        :param max_bytes: The most bytes of compressed responses to keep.
+        :param ttls: Optional. A ``dict`` of action constants, and how long,
+        in seconds, to keep their responses. Overrides ``CACHE_TTL``.
+        :param default_ttl: How long to keep the responses of any action not
+        in ``ttls``.
+        :param level: The zlib compression level, from 1 (fastest) to 9 
+        (smallest).
+
+        """
+        super(DiskCache, self).__init__(ttls, default_ttl)
+
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.level = level
+
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Bytes stored since the cache's size was last checked.
+        self._unchecked = None
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, expires REAL, accessed REAL, "
+            "size INTEGER, body BLOB)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed "
+            "ON responses (accessed)"
+        )
+
+    def __len__(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM responses"
+        ).fetchone()[0]
+
+    def _connect(self):
+        """
+        Gets the database connection for the current thread. SQLite 
+        connections can't be shared between threads, or carried over into a 
+        forked process, so each gets its own.
+
+        :returns: The connection.
+
+        """
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(
+                self.filename, timeout=CACHE_DISK_TIMEOUT,
+                isolation_level=None
+            )
+            # Write-ahead logging lets readers carry on while another 
+            # process is writing.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+
+        return conn
+
+    def _evict(self, conn):
+        """
+        Drops expired responses, then the least recently used ones, until the 
+        cache is back under its size limit.
+
+        :param conn: The database connection to use.
+
+        :returns: None.
+
+        """
+        query = "SELECT COALESCE(SUM(size), 0) FROM responses"
+
+        if conn.execute(query).fetchone()[0] <= self.max_bytes:
+            return
+
+        conn.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+
+        total = conn.execute(query).fetchone()[0]
+        # Leave some room, so this doesn't run again on the next store.
+        target = self.max_bytes * 0.9
+        dropped = []
+
+        rows = conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed"
+        ).fetchall()
+
+        for url, size in rows:
+            if total <= target:
+                break
+            dropped.append((url,))
+            total -= size
+
+        conn.executemany("DELETE FROM responses WHERE url = ?", dropped)
+
+    def get(self, url, action=None):
+        """
+        Gets the cached response for the given url.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+        Actions that are never cached aren't looked up.
+
+        :returns: The body of the response, or ``None`` if it isn't cached, or
+        has expired.
+
+        """
+        entry = self.lookup(url, action)
+
+        if entry is None:
+            return None
+        return entry[1]
+
+    def lookup(self, url, action=None):
+        """
+        Gets the cached response for the given url, along with when it
+        expires.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+        Actions that are never cached aren't looked up.
+
+        :returns: A tuple of when the response expires, as a timestamp, and
+        its body, or ``None`` if it isn't cached, or has expired.
+
+        """
+        if action is not None and self.ttl(action) <= 0:
+            return None
+
+        conn = self._connect()
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT expires, accessed, body FROM responses WHERE url = ?",
+            (url,)
+        ).fetchone()
+
+        if row is None or row[0] <= now:
+            if row is not None:
+                conn.execute(
+                    "DELETE FROM responses WHERE url = ? AND expires <= ?",
+                    (url, now)
+                )
+            with self._lock:
+                self.misses += 1
+            return None
+
+        expires, accessed, body = row
+
+        if accessed < now - self.TOUCH_EVERY:
+            conn.execute(
+                "UPDATE responses SET accessed = ? WHERE url = ?", (now, url)
+            )
+
+        with self._lock:
+            self.hits += 1
+
+        return (expires, zlib.decompress(body))
+
+    def invalidate(self, url=None):
+        """
+        Drops the cached response for the given url.
+
+        :param url: The url of the API call. If not given, every response
+        is dropped.
+
+        :returns: None.
+
+        """
+        conn = self._connect()
+
+        if url is None:
+            conn.execute("DELETE FROM responses")
+        else:
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def set(self, url, body, action, expires=None):
+        """
+        Caches a response, dropping the least recently used responses, if the
+        cache is full.
+
+        :param url: The url of the API call.
+        :param body: The body of the response.
+        :param action: The action constant the call was made with.
+        :param expires: Optional. When the response expires, as a timestamp,
+        if it should be sooner than the action's time limit allows.
+
+        :returns: None.
+
+        """
+        expires = _expiry(self.ttl(action), expires)
+
+        if expires is None:
+            return
+
+        data = zlib.compress(body, self.level)
+        now = time.time()
+
+        if len(data) > self.max_bytes:
+            return
+
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+            (url, expires, now, len(data), sqlite3.Binary(data))
+        )
+
+        # Eviction leaves 10% free, so the size only has to be checked again 
+        # once about that much has been stored.
+        with self._lock:
+            if self._unchecked is None:
+                self._unchecked = self.max_bytes
+            self._unchecked += len(data)
+            check = self._unchecked >= self.max_bytes * 0.1
+            if check:
+                self._unchecked = 0
+
+        if check:
+            self._evict(conn)
+
+    def stats(self):
+        """
+        Gets the cache's hit/miss counts, and how much it's holding. The 
+        hit/miss counts are for this instance only.
+
+        :returns: A ``dict`` of the cache's stats.
+
+        """
+        entries, size = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": entries,
+                "bytes": size
+            }
+
+#===============================================================================
+# TieredCache Class
+#===============================================================================
+
+class TieredCache(object):
+    """
+    Chains several caches together, such as a ``MemoryCache`` in front of a 
+    ``DiskCache``. Responses are looked up in each cache in order, and copied 
+    into the caches in front of the one they were found in, with the time 
+    they had left, so they don't outlive their time limit.
+
+    """
+
+    def __init__(self, *caches):
+        """
+        The init method for the TieredCache class.
+
+        :param caches: The caches to use, fastest first.
+
+        """
+        self.caches = caches
+
+    def get(self, url, action=None):
+        """
+        Gets the cached response for the given url, from the first cache 
+        that has it.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+
+        :returns: The body of the response, or ``None`` if it isn't cached.
+
+        """
+        entry = self.lookup(url, action)
+
+        if entry is None:
+            return None
+        return entry[1]
+
+    def lookup(self, url, action=None):
+        """
+        Gets the cached response for the given url, from the first cache 
+        that has it, along with when it expires.
+
+        :param url: The url of the API call.
+        :param action: Optional. The action constant the call is made with.
+
+        :returns: A tuple of when the response expires, as a timestamp, and 
+        its body, or ``None`` if it isn't cached.
+
+        """
+        for i, cache in enumerate(self.caches):
+            entry = cache.lookup(url, action)
+            if entry is not None:
+                if action is not None:
+                    for upper in self.caches[:i]:
+                        upper.set(url, entry[1], action, entry[0])
+                return entry
+
+        return None
+
+    def invalidate(self, url=None):
+        """
+        Drops the cached response for the given url, from every cache.
+
+        :param url: The url of the API call. If not given, every response
+        is dropped.
+
+        :returns: None.
+
+        """
+        for cache in self.caches:
+            cache.invalidate(url)
+
+    def set(self, url, body, action, expires=None):
+        """
+        Caches a response in every cache.
+
+        :param url: The url of the API call.
+        :param body: The body of the response.
+        :param action: The action constant the call was made with.
+        :param expires: Optional. When the response expires, as a timestamp.
+
+        :returns: None.
+
+        """
+        for cache in self.caches:
+            cache.set(url, body, action, expires)
+
+    def stats(self):
+        """
+        Gets the stats of each cache.
+
+        :returns: A list of each cache's stats ``dict``.
+
+        """
+        return [x.stats() for x in self.caches]
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def _expiry(ttl, expires=None):
+    """
+    Works out when a response being cached should expire.
+
+    :param ttl: The time limit for the response's action, in seconds.
+    :param expires: Optional. When the response already expires, as a
+    timestamp, such as when it's copied from another cache.
+
+    :returns: The earlier of the two, as a timestamp, or ``None`` if the
+    response shouldn't be cached.
+
+    """
+    now = time.time()
+
+    if ttl <= 0 or (expires is not None and expires <= now):
+        return None
+
+    if expires is None:
+        return now + ttl
+    return min(expires, now + ttl)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
@@ -0,0 +1,386 @@
+#===============================================================================
+# DAPIWCatalog: Columnar Catalog for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``Catalog``, which keeps the fields of a list of wad info
+that are filtered and sorted on in NumPy arrays, one per field, so that
+filtering and sorting is done on whole arrays at once, instead of record by
+record.
+
+Filtering and sorting return a ``CatalogView``, which is just the positions of
+the records it holds, in an array, so nothing gets copied until the records
+are asked for.
+
+This module requires the ``numpy`` package:
+http://www.numpy.org/
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from dapiwconst import (
+    DIRECT_DESC,
+    FILTER_DATE,
+    FILTER_GAME,
+    FILTER_RATING,
+    FILTER_SIZE,
+    FILTER_VOTES,
+    FILTER_YEAR,
+    SORT_DATE,
+    SORT_FILE,
+    SORT_RATING,
+    SORT_SIZE
+)
+
+from dapiwtools import (
+    SearchFilter,
+    _date_number,
+    _rating_tenths
+)
+
+#===============================================================================
+# Catalog Class
+#===============================================================================
+
+class Catalog(object):
+    """A list of wad info, with its filterable fields kept in arrays."""
+
+    def __init__(self, records):
+        """
+        The Catalog init method.
+
+        :param records: A list of wad info, in ``dict`` form.
+
+        """
+        if numpy is None:
+            raise ImportError("Catalog requires the numpy package.")
+
+        self.records = list(records)
+
+        # The directories, by their code, and each record's code. The game
+        # filter is worked out once per directory, not once per record.
+        self.dirs = []
+        dir_codes = {}
+        codes = []
+        for record in self.records:
+            wad_dir = record.get("dir") or ""
+            if wad_dir not in dir_codes:
+                dir_codes[wad_dir] = len(self.dirs)
+                self.dirs.append(wad_dir)
+            codes.append(dir_codes[wad_dir])
+
+        self.dir_code = numpy.array(codes, dtype=numpy.int32)
+        self.id = self._column("id", int, -1, numpy.int64)
+        self.date = self._column("date", _date_number, 0, numpy.int32)
+        self.rating = self._column("rating", float, 0.0, numpy.float64)
+        self.rating_tenths = self._column(
+            "rating", _rating_tenths, 0, numpy.int32
+        )
+        self.size = self._column("size", int, 0, numpy.int64)
+        self.votes = self._column("votes", int, 0, numpy.int32)
+
+        # The units the year and size filters work in.
+        self.year = self.date // 10000
+        self.size_kb = self.size // 1000
+
+        self._filename_rank = None
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _column(self, field, convert, default, dtype):
+        """
+        Makes an array of one field of every record.
+
+        :param field: The field.
+        :param convert: A function to turn the field's value into a number.
+        :param default: The number to use if the field's missing, or can't
+        be converted.
+        :param dtype: The NumPy type of the array.
+
+        :returns: The array.
+
+        """
+        values = []
+
+        for record in self.records:
+            try:
+                values.append(convert(record[field]))
+            except (KeyError, TypeError, ValueError):
+                values.append(default)
+
+        return numpy.array(values, dtype=dtype)
+
+    def filename_rank(self):
+        """
+        Gets the place of each record's filename in sorted order, so sorting
+        by filename can be done on numbers. Worked out the first time it's
+        needed.
+
+        :returns: An array of the ranks.
+
+        """
+        if self._filename_rank is None:
+            filenames = [x.get("filename") or "" for x in self.records]
+            order = sorted(xrange(len(filenames)), key=filenames.__getitem__)
+            rank = numpy.empty(len(filenames), dtype=numpy.int64)
+            rank[order] = numpy.arange(len(filenames))
+            self._filename_rank = rank
+
+        return self._filename_rank
+
+    def view(self):
+        """
+        Gets a view of the whole catalog.
+
+        :returns: A ``CatalogView``.
+
+        """
+        return CatalogView(self, numpy.arange(len(self.records)))
+
+    def chain(self, filters):
+        """Same as ``CatalogView.chain``, on the whole catalog."""
+        return self.view().chain(filters)
+
+    def sort(self, key=SORT_DATE, direction=None):
+        """Same as ``CatalogView.sort``, on the whole catalog."""
+        return self.view().sort(key, direction)
+
+#===============================================================================
+# CatalogView Class
+#===============================================================================
+
+class CatalogView(object):
+    """Some of the records of a Catalog, in a given order."""
+
+    __slots__ = ("catalog", "index")
+
+    def __init__(self, catalog, index):
+        """
+        The CatalogView init method.
+
+        :param catalog: The ``Catalog``.
+        :param index: An array of the positions of the records in the view.
+
+        """
+        self.catalog = catalog
+        self.index = index
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CatalogView(self.catalog, self.index[key])
+        return self.catalog.records[self.index[key]]
+
+    def __iter__(self):
+        records = self.catalog.records
+        for position in self.index:
+            yield records[position]
+
+    def __len__(self):
+        return len(self.index)
+
+    def _mask(self, mask):
+        """
+        Keeps the records that the given mask is ``True`` for.
+
+        :param mask: An array of booleans, one for each record in the view.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        return CatalogView(self.catalog, self.index[mask])
+
+    def _between(self, column, low, high):
+        """
+        Keeps the records with a value in the given column between the given
+        values, inclusive.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        values = column[self.index]
+
+        return self._mask((values >= low) & (values <= high))
+
+    def chain(self, filters):
+        """
+        Filters the view with a filter, or a chain of filters, in the same
+        form as ``search_local``'s ``filter`` parameter.
+
+        :param filters: A filter and its value, in a tuple/list, or a
+        tuple/list of them.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        methods = {
+            FILTER_DATE: "date",
+            FILTER_GAME: "game",
+            FILTER_RATING: "rating",
+            FILTER_SIZE: "size",
+            FILTER_VOTES: "votes",
+            FILTER_YEAR: "year"
+        }
+
+        view = self
+        for name, value in SearchFilter.specs(filters):
+            view = getattr(view, methods[name])(value)
+
+        return view
+
+    def date(self, date):
+        """
+        Keeps the records from the given date.
+
+        :param date: The date, as "yyyy-mm-dd".
+
+        :returns: A new ``CatalogView``.
+
+        """
+        number = _date_number(date)
+
+        return self._mask(self.catalog.date[self.index] == number)
+
+    def game(self, game):
+        """
+        Keeps the records for the given game.
+
+        :param game: The game.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        game_path = "%s/" % (game)
+        matches = numpy.array(
+            [game_path in x for x in self.catalog.dirs], dtype=bool
+        )
+
+        return self._mask(matches[self.catalog.dir_code[self.index]])
+
+    def ids(self):
+        """
+        Gets the IDs of the records in the view.
+
+        :returns: An array of the IDs.
+
+        """
+        return self.catalog.id[self.index]
+
+    def rating(self, rating):
+        """
+        Keeps the records with the given rating, truncated to tenths, or in
+        the given range.
+
+        :param rating: The rating, or a range, low to high, in a tuple/list.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        low, high = SearchFilter.bounds(FILTER_RATING, rating)
+
+        return self._between(self.catalog.rating_tenths, low, high)
+
+    def records(self):
+        """
+        Gets the records in the view.
+
+        :returns: A list of the wad info.
+
+        """
+        return list(self)
+
+    def size(self, size):
+        """
+        Keeps the records of the given size, in kb, or in the given range.
+
+        :param size: The size, or a range, low to high, in a tuple/list.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        low, high = SearchFilter.bounds(FILTER_SIZE, size)
+
+        return self._between(self.catalog.size_kb, low, high)
+
+    def sort(self, key=SORT_DATE, direction=None):
+        """
+        Sorts the view. Records with the same value keep their order.
+
+        :param key: What to sort by, one of ``SORT_DATE``, ``SORT_FILE``,
+        ``SORT_RATING`` or ``SORT_SIZE``.
+        :param direction: Optional. ``DIRECT_DESC`` to sort high to low.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        columns = {
+            SORT_DATE: self.catalog.date,
+            SORT_RATING: self.catalog.rating,
+            SORT_SIZE: self.catalog.size
+        }
+
+        if key == SORT_FILE:
+            column = self.catalog.filename_rank()
+        else:
+            column = columns[key]
+
+        index = self.index[numpy.argsort(column[self.index], kind="mergesort")]
+
+        if direction == DIRECT_DESC:
+            index = index[::-1]
+
+        return CatalogView(self.catalog, index)
+
+    def votes(self, votes):
+        """
+        Keeps the records with the given number of votes, or in the given
+        range.
+
+        :param votes: The number of votes, or a range, low to high, in a
+        tuple/list.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        low, high = SearchFilter.bounds(FILTER_VOTES, votes)
+
+        return self._between(self.catalog.votes, low, high)
+
+    def year(self, year):
+        """
+        Keeps the records from the given year, or range of years.
+
+        :param year: The year, or a range, low to high, in a tuple/list.
+
+        :returns: A new ``CatalogView``.
+
+        """
+        low, high = SearchFilter.bounds(FILTER_YEAR, year)
+
+        return self._between(self.catalog.year, low, high)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
@@ -44,6 +44,71 @@ A_SEARCH_DIRECT = "&dir=%s"
 A_SEARCH_SORT = "&sort=%s"
 A_SEARCH_TYPE = "&type=%s"
 
+#-------------------------------------------------------------------------------
+# Response Caching
+#-------------------------------------------------------------------------------
+
+# How long, in seconds, to cache the responses of each action. Anything 
+# set to 0 is never cached.
+CACHE_TTL = {
+    A_ABOUT: 86400,
+    A_DBPING: 0,
+    A_GET_ID: 604800,
+    A_GET_FILE: 604800,
+    A_GETCONTENTS_ID: 3600,
+    A_GETCONTENTS_NAME: 3600,
+    A_GETDIRS_ID: 86400,
+    A_GETDIRS_NAME: 86400,
+    A_GETFILES_ID: 3600,
+    A_GETFILES_NAME: 3600,
+    A_LATESTVOTES: 60,
+    A_LATESTFILES: 60,
+    A_PARENTDIR_ID: 86400,
+    A_PARENTDIR_FILE: 86400,
+    A_PING: 0,
+    A_SEARCH: 3600
+}
+
+# How long to cache the responses of any action not in ``CACHE_TTL``
+CACHE_TTL_DEFAULT = 3600
+
+# Default limits for the in-memory cache
+CACHE_MAX_ENTRIES = 10000
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Default size limit for the on-disk cache, and how long, in seconds, to wait 
+# on another process that is writing to it
+CACHE_DISK_MAX_BYTES = 512 * 1024 * 1024
+CACHE_DISK_TIMEOUT = 30
+
+#-------------------------------------------------------------------------------
+# Connection Settings
+#-------------------------------------------------------------------------------
+
+# Number of hosts to keep connection pools for
+POOL_CONNECTIONS = 10
+
+# Maximum number of kept-alive connections per host
+POOL_MAXSIZE = 10
+
+# Timeouts, in seconds, for connecting, and for waiting on a response
+TIMEOUT_CONNECT = 10
+TIMEOUT_READ = 60
+
+# Default number of requests (API calls and downloads) to make per second, 
+# and how many can be made back to back
+RATE_REQUESTS = 5
+RATE_BURST = 5
+
+# Default number of requests to keep in flight, for the asynchronous client
+CONCURRENCY = 8
+
+# How often, in seconds, a crawl saves its checkpoint
+CRAWL_CHECKPOINT_EVERY = 10
+
+# How many of the latest files and votes a catalog sync looks at
+SYNC_LIMIT = 100
+
 #-------------------------------------------------------------------------------
 # Download Servers
 #-------------------------------------------------------------------------------
@@ -69,6 +134,50 @@ FTP_DIR_GERMANY = "pc/games/idgames/"
 FTP_DIR_GREECE = "pub/vendors/idgames/"
 FTP_DIR_TEXAS = "pub/idgames/"
 
+# The idgames path on each FTP server
+FTP_DIRS = {
+    DL_FTP_GERMANY: FTP_DIR_GERMANY,
+    DL_FTP_GREECE: FTP_DIR_GREECE,
+    DL_FTP_TEXAS: FTP_DIR_TEXAS
+}
+
+# The extension given to files while they are downloading
+PART_EXT = ".part"
+
+# The most FTP sessions to keep open to each FTP server, and how long, in 
+# seconds, a session can sit unused before it's checked to still be alive
+FTP_POOL_SIZE = 4
+FTP_CHECK_AFTER = 15
+
+# The smallest and biggest reads, in bytes, to copy downloads with, and about 
+# how long, in seconds, each read should take at the current transfer rate
+CHUNK_MIN = 64 * 1024
+CHUNK_MAX = 4 * 1024 * 1024
+CHUNK_TIME = 0.25
+
+# The wad info fields kept in a download Manifest
+MANIFEST_FIELDS = ("id", "filename", "dir", "size", "date", "md5")
+
+#-------------------------------------------------------------------------------
+# Mirror Health
+#-------------------------------------------------------------------------------
+
+# The file, in the idgames root, that mirrors are probed with, and how much of 
+# it to read
+MIRROR_PROBE_FILE = "ls-laR.gz"
+MIRROR_PROBE_BYTES = 256 * 1024
+
+# How many failures in a row take a mirror out of rotation
+MIRROR_MAX_FAILURES = 3
+
+# Mirrors slower than this fraction of the fastest mirror are taken out of 
+# rotation
+MIRROR_SLOW_RATIO = 0.1
+
+# How long, in seconds, to leave a mirror out of rotation before probing it 
+# again
+MIRROR_RETRY_AFTER = 600
+
 #-------------------------------------------------------------------------------
 # /idgames Paths and Game Names
 #-------------------------------------------------------------------------------
@@ -180,16 +289,27 @@ TYPE_FILE = "filename"
 TYPE_TEXT = "textfile"
 TYPE_TITLE = "title"
 
+# The fields a SearchIndex indexes by n-grams of INDEX_NGRAM characters, and 
+# the longer ones, which it only indexes by words
+INDEX_NGRAM = 3
+INDEX_NGRAM_FIELDS = [TYPE_AUTHOR, TYPE_EMAIL, TYPE_FILE, TYPE_TITLE]
+INDEX_TOKEN_FIELDS = [TYPE_CREDITS, TYPE_DESCRIP, TYPE_EDITORS, TYPE_TEXT]
+
 # Search sorting methods
 SORT_DATE = "date"
 SORT_FILE = "filename"
 SORT_RATING = "rating"
 SORT_SIZE = "size"
 
+SORTS = [SORT_DATE, SORT_FILE, SORT_RATING, SORT_SIZE]
+
 # Sort direction
 DIRECT_ASC = "asc"
 DIRECT_DESC = "desc"
 
+# The most results the API returns for a search
+SEARCH_LIMIT = 100
+
 #-------------------------------------------------------------------------------
 # Filter Stuff
 #-------------------------------------------------------------------------------
@@ -207,6 +327,54 @@ FILTERS = [
     FILTER_SIZE, FILTER_VOTES, FILTER_YEAR
 ]
 
+#-------------------------------------------------------------------------------
+# Compact Records
+#-------------------------------------------------------------------------------
+
+# The wad info fields a WadInfo has a slot for. Any others are kept in a dict.
+WAD_FIELDS = (
+    "id", "title", "dir", "filename", "size", "age", "date", "author", 
+    "email", "description", "credits", "base", "buildtime", "editors", 
+    "bugs", "textfile", "rating", "votes", "reviews", "url", "idgamesurl"
+)
+
+# The WadInfo fields whose values are shared between records, since many 
+# records have the same one
+WAD_SHARED_FIELDS = ("dir", "date", "author", "email", "base", "editors")
+
+# The most shared values to keep. Once there are this many, they're dropped, 
+# and sharing starts over. The whole archive has well under this many.
+WAD_SHARED_LIMIT = 50000
+
+# The zlib compression level for WadInfo textfiles
+WAD_TEXT_LEVEL = 6
+
+#-------------------------------------------------------------------------------
+# Mapped Catalogs
+#-------------------------------------------------------------------------------
+
+# The first bytes of a mapped catalog file, and the version of the format
+MAPPED_MAGIC = "DAPIWCAT"
+MAPPED_VERSION = 1
+
+# The most ID table slots to allow for each record. The table has a slot for 
+# every ID from the lowest to the highest, so this stops a few stray IDs from 
+# making it huge.
+MAPPED_SPARSE_LIMIT = 16
+
+#-------------------------------------------------------------------------------
+# Fake Servers
+#-------------------------------------------------------------------------------
+
+# How many files a FakeArchive has, the smallest and biggest file size, in 
+# bytes, and the random seed it's made from
+FAKE_FILES = 2000
+FAKE_SIZES = (1000, 100000)
+FAKE_SEED = 1994
+
+# How many bytes the fake servers send at a time, when limiting bandwidth
+FAKE_CHUNK = 16 * 1024
+
 #===============================================================================
 # If Main
 #===============================================================================
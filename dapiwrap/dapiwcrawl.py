@@ -0,0 +1,556 @@
+#===============================================================================
+# DAPIWCrawl: Archive Crawler for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``Crawler``, which walks the /idgames directory tree,
+breadth first, using ``getdirs`` and ``getfiles``, and hands back the info of
+every file it finds, as it finds it, and ``CatalogSync``, which keeps a catalog
+up to date afterwards, using ``latestfiles`` and ``latestvotes``.
+
+The directories are fetched on a pool of worker threads, all through a single
+``DAPIWrap`` instance, so they share its connection pool, and its rate limit.
+The crawl can be saved to a checkpoint file as it goes, so one that's stopped
+part way can pick up where it left off.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import collections
+import json
+import os
+import Queue
+import time
+
+from multiprocessing.pool import ThreadPool
+
+from dapiwconst import (
+    A_GET_ID,
+    A_LATESTFILES,
+    A_LATESTVOTES,
+    CONCURRENCY,
+    CRAWL_CHECKPOINT_EVERY,
+    GAMES,
+    LVLS,
+    POOL_MAXSIZE,
+    SYNC_LIMIT
+)
+
+from dapiwrap import (
+    DAPIWrap,
+    _content_list
+)
+
+from dapiwtools import _replace
+
+#===============================================================================
+# Crawler Class
+#===============================================================================
+
+class Crawler(object):
+    """Crawls the /idgames directory tree, breadth first."""
+
+    def __init__(
+            self, daw=None, roots=None, workers=CONCURRENCY, checkpoint=None,
+            **kwargs
+        ):
+        """
+        The Crawler init method.
+
+        :param daw: Optional. The DAPIWrap instance to make requests through.
+        If none is given, one is made, using any extra keyword arguments.
+        :param roots: Optional. The idgames paths to start crawling from.
+        Defaults to the levels directory of each game in ``GAMES``.
+        :param workers: The number of directories to fetch at once.
+        :param checkpoint: Optional. The filename of a checkpoint file. If it
+        exists, the crawl carries on from it, instead of starting at the
+        roots. It's kept up to date during the crawl, and removed once the
+        crawl is finished.
+
+        """
+        if daw is None:
+            kwargs.setdefault("pool_maxsize", max(workers, POOL_MAXSIZE))
+            daw = DAPIWrap(**kwargs)
+
+        if roots is None:
+            roots = [LVLS % (x) for x in GAMES]
+
+        self.daw = daw
+        self.workers = workers
+        self.checkpoint = checkpoint
+
+        # The paths waiting to be crawled, and the ones that have been.
+        self.frontier = collections.deque(roots)
+        self.done = set()
+        # Paths that couldn't be fetched, with the error, for each.
+        self.errors = {}
+
+        self.stats = {
+            "dirs": 0,
+            "files": 0,
+            "errors": 0,
+            "seconds": 0.0
+        }
+
+        if checkpoint and os.path.exists(checkpoint):
+            self._load()
+
+    def _fetch(self, path):
+        """
+        Gets the subdirectories and files of a directory. Runs on a worker
+        thread.
+
+        :param path: The idgames path of the directory.
+
+        :returns: A tuple of the path, the subdirectory paths, the file
+        records, and the error, or ``None``.
+
+        """
+        try:
+            dirs = self.daw.get_dirs(path)
+            files = self.daw.get_files(path, raw=True)
+        except Exception as err:
+            return (path, [], [], str(err))
+
+        for response in (dirs, files):
+            if "error" in response:
+                return (path, [], [], response["error"].get("message"))
+
+        subdirs = dirs.get("dir", []) if type(dirs) == dict else []
+        if type(subdirs) == dict:
+            subdirs = [subdirs]
+
+        files = self.daw._records(_content_list(files, "file"))
+
+        return (path, [x["name"] for x in subdirs], files, None)
+
+    def _load(self):
+        """
+        Loads the crawl's state from the checkpoint file.
+
+        :returns: None.
+
+        """
+        with open(self.checkpoint, "r") as state_file:
+            state = json.load(state_file)
+
+        self.frontier = collections.deque(state["frontier"])
+        self.done = set(state["done"])
+        self.errors = state.get("errors", {})
+        self.stats.update(state.get("stats", {}))
+
+    def _save(self, pending=()):
+        """
+        Saves the crawl's state to the checkpoint file. The file is written
+        to a temporary file first, and then moved into place, so there's
+        always a whole checkpoint to go back to.
+
+        :param pending: Paths that have been started, but not finished.
+        They're saved to the front of the frontier.
+
+        :returns: None.
+
+        """
+        state = {
+            "frontier": list(pending) + list(self.frontier),
+            "done": list(self.done),
+            "errors": self.errors,
+            "stats": self.stats
+        }
+
+        temp_name = self.checkpoint + ".tmp"
+
+        with open(temp_name, "w") as state_file:
+            json.dump(state, state_file)
+
+        _replace(temp_name, self.checkpoint)
+
+    def crawl(self):
+        """
+        Crawls the directory tree, breadth first, from the roots, or from
+        where the checkpoint left off. Directories that can't be fetched are
+        kept in ``Crawler.errors``, and left out of the crawl.
+
+        A directory is only marked as done once all of its files have been
+        handed back, so if the crawl is stopped, the files of the directory
+        it was in the middle of will be handed back again, when it's resumed.
+
+        :yields: The info of each file found, in ``dict`` form.
+
+        """
+        results = Queue.Queue()
+        pending = set()
+        pool = ThreadPool(self.workers)
+
+        queued = set(self.frontier) | self.done
+        start = time.time()
+        last_save = start
+
+        try:
+            while self.frontier or pending:
+                # Keep every worker busy, without queuing up the whole tree.
+                while self.frontier and len(pending) < self.workers:
+                    path = self.frontier.popleft()
+                    pending.add(path)
+                    pool.apply_async(self._fetch, (path,), callback=results.put)
+
+                path, subdirs, files, error = results.get()
+
+                if error is not None:
+                    pending.discard(path)
+                    self.errors[path] = error
+                    self.stats["errors"] += 1
+                    continue
+
+                for subdir in subdirs:
+                    if subdir not in queued:
+                        queued.add(subdir)
+                        self.frontier.append(subdir)
+
+                for wad_info in files:
+                    self.stats["files"] += 1
+                    yield wad_info
+
+                pending.discard(path)
+                self.done.add(path)
+                self.stats["dirs"] += 1
+
+                if self.checkpoint:
+                    if time.time() - last_save >= CRAWL_CHECKPOINT_EVERY:
+                        self._save(pending)
+                        last_save = time.time()
+        finally:
+            self.stats["seconds"] += time.time() - start
+            pool.close()
+            pool.join()
+
+            # Directories that were still being fetched, when the crawl was 
+            # stopped, go back on the front of the frontier.
+            self.frontier.extendleft(sorted(pending, reverse=True))
+
+            if self.checkpoint:
+                if self.frontier:
+                    self._save()
+                elif os.path.exists(self.checkpoint):
+                    os.remove(self.checkpoint)
+
+    def close(self):
+        """
+        Closes the DAPIWrap instance's connections.
+
+        :returns: None.
+
+        """
+        self.daw.close()
+
+#===============================================================================
+# CatalogSync Class
+#===============================================================================
+
+class CatalogSync(object):
+    """
+    Works out which files have been uploaded, or voted on, since the last 
+    sync, using ``latestfiles`` and ``latestvotes``, and gets their info.
+
+    """
+
+    def __init__(
+            self, daw=None, state=None, limit=SYNC_LIMIT, dirs=None, 
+            workers=CONCURRENCY, **kwargs
+        ):
+        """
+        The CatalogSync init method.
+
+        :param daw: Optional. The DAPIWrap instance to make requests through. 
+        If none is given, one is made, using any extra keyword arguments.
+        :param state: Optional. The filename of a JSON file to keep the high 
+        water marks in, between runs.
+        :param limit: How many of the latest files, and votes, to look at, 
+        each sync.
+        :param dirs: Optional. A list of idgames paths to always rescan, if 
+        the sync falls too far behind. The directories the latest files and 
+        votes are in are always rescanned.
+        :param workers: The number of records, or directories, to fetch at 
+        once.
+
+        """
+        if daw is None:
+            kwargs.setdefault("pool_maxsize", max(workers, POOL_MAXSIZE))
+            daw = DAPIWrap(**kwargs)
+
+        self.daw = daw
+        self.state = state
+        self.limit = limit
+        self.dirs = list(dirs or [])
+        self.workers = workers
+
+        # The highest file ID seen, and the votes in the last window.
+        self.last_id = None
+        self.votes = None
+
+        if state and os.path.exists(state):
+            with open(state, "r") as state_file:
+                marks = json.load(state_file)
+            self.last_id = marks.get("last_id")
+            self.votes = marks.get("votes")
+
+    def _latest(self, action, key):
+        """
+        Gets the latest files, or votes, skipping the cache.
+
+        :param action: ``A_LATESTFILES`` or ``A_LATESTVOTES``.
+        :param key: The key of the list in the response's content.
+
+        :returns: A list of the entries, newest first.
+
+        """
+        self.daw.invalidate(action, self.limit)
+        return _content_list(self.daw.call(action, self.limit), key)
+
+    def _fetch(self, ids, errors):
+        """
+        Gets the info of the given files, fresh from the API.
+
+        :param ids: A list of wad IDs.
+        :param errors: A list to add ``(id, response)`` tuples to, for the 
+        IDs that couldn't be fetched.
+
+        :returns: A ``dict`` of wad IDs, and their info.
+
+        """
+        for wad_id in ids:
+            self.daw.invalidate(A_GET_ID, wad_id)
+
+        records = self.daw.get_id_list(
+            ids, workers=self.workers, errors=errors
+        )
+
+        return dict((int(x["id"]), x) for x in records)
+
+    def _rescan(self, dirs):
+        """
+        Gets the files in the given directories, fresh from the API.
+
+        :param dirs: A list of idgames paths.
+
+        :returns: A list of the files' info.
+
+        """
+        def files(path):
+            try:
+                return self.daw.get_files(path)
+            except Exception:
+                return []
+
+        pool = ThreadPool(max(1, min(self.workers, len(dirs))))
+        try:
+            results = pool.map(files, dirs)
+        finally:
+            pool.close()
+            pool.join()
+
+        return [x for result in results for x in result]
+
+    def _save(self):
+        """
+        Saves the high water marks to the state file.
+
+        :returns: None.
+
+        """
+        temp_name = self.state + ".tmp"
+
+        with open(temp_name, "w") as state_file:
+            json.dump(
+                {"last_id": self.last_id, "votes": self.votes}, state_file
+            )
+
+        _replace(temp_name, self.state)
+
+    def mark(self, records):
+        """
+        Sets the file high water mark from a list of file info, such as the 
+        results of a full crawl, so the next sync only looks for what's come 
+        in since.
+
+        :param records: An iterable of wad info, in ``dict`` form.
+
+        :returns: None.
+
+        """
+        ids = [int(x["id"]) for x in records if "id" in x]
+
+        if ids:
+            self.last_id = max([self.last_id or 0] + ids)
+            if self.state:
+                self._save()
+
+    def sync(self):
+        """
+        Syncs with the archive. New files are the ones with a higher ID than 
+        the high water mark, and changed files are the ones that have been 
+        voted on since the last sync. Only those are fetched, with ``get``.
+
+        If the latest files, or votes, don't reach back to the last sync, 
+        there may be some that were missed, so the directories of the latest 
+        files, and of the files voted on since the last sync, and 
+        ``CatalogSync.dirs``, are rescanned with ``getfiles``. After a votes 
+        gap, every file found in the rescan is counted as changed.
+
+        The first sync, with no high water marks, only sets them, unless 
+        ``mark`` was used.
+
+        :returns: A ``dict`` with the keys ``new`` and ``changed``, lists of 
+        the files' info, ``gap``, whether a rescan was needed, and 
+        ``errors``, a list of ``(id, response)`` tuples, for the IDs that 
+        couldn't be fetched.
+
+        """
+        files = self._latest(A_LATESTFILES, "file")
+        votes = self._latest(A_LATESTVOTES, "vote")
+
+        file_ids = [int(x["id"]) for x in files]
+        vote_marks = [_vote_mark(x) for x in votes]
+
+        result = {"new": [], "changed": [], "gap": False, "errors": []}
+
+        first = self.last_id is None
+        last_id = self.last_id or 0
+        new_ids = [x for x in file_ids if x > last_id]
+
+        # Every vote before where the last window carries on is new.
+        new_votes = votes[0:_vote_overlap(vote_marks, self.votes or [])]
+
+        files_gap = (
+            not first and len(files) >= self.limit and 
+            len(new_ids) == len(file_ids)
+        )
+        votes_gap = (
+            self.votes is not None and len(votes) >= self.limit and 
+            len(new_votes) == len(votes)
+        )
+
+        if first:
+            new_ids = []
+        if self.votes is None:
+            new_votes = []
+
+        changed_ids = [
+            _vote_file(x) for x in new_votes if _vote_file(x) not in new_ids
+        ]
+
+        records = {}
+        fetch_ids = new_ids + changed_ids
+
+        if files_gap or votes_gap:
+            result["gap"] = True
+
+            # Votes don't say which directory their file is in, so get the 
+            # voted files first, to find out.
+            records = self._fetch(changed_ids, result["errors"])
+
+            dirs = set(self.dirs)
+            dirs.update(
+                x["dir"] for x in files + records.values() if x.get("dir")
+            )
+
+            rescanned = {}
+            for wad_info in self._rescan(sorted(dirs)):
+                wad_id = int(wad_info["id"])
+                if wad_id > last_id or votes_gap:
+                    rescanned[wad_id] = wad_info
+
+            # The records from a rescan are fresh, so only fetch the rest.
+            fetch_ids = [x for x in new_ids if x not in rescanned]
+            for wad_id, wad_info in rescanned.iteritems():
+                records.setdefault(wad_id, wad_info)
+
+        records.update(self._fetch(fetch_ids, result["errors"]))
+
+        for wad_id, wad_info in sorted(records.items()):
+            if wad_id > last_id and not first:
+                result["new"].append(wad_info)
+            else:
+                result["changed"].append(wad_info)
+
+        # Don't move the file mark past an ID that couldn't be fetched.
+        failed = [int(x[0]) for x in result["errors"] if int(x[0]) > last_id]
+        marks = [x for x in file_ids + records.keys() if x not in failed]
+        if failed:
+            marks = [x for x in marks if x < min(failed)]
+        if marks:
+            self.last_id = max([last_id] + marks)
+
+        self.votes = vote_marks
+
+        if self.state:
+            self._save()
+
+        return result
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def _vote_file(vote):
+    """
+    Gets the ID of the file a vote is for.
+
+    :param vote: A vote, from ``latestvotes``. Its ``id`` is the ID of the 
+    file, as votes don't have IDs of their own.
+
+    :returns: The file's ID.
+
+    """
+    return int(vote["id"])
+
+def _vote_mark(vote):
+    """
+    Makes a mark for a vote, to spot it again in a later window, from the 
+    file's ID, the vote, and the review text.
+
+    :param vote: A vote, from ``latestvotes``.
+
+    :returns: The mark, as a string.
+
+    """
+    return json.dumps(
+        [int(vote["id"]), vote.get("vote"), vote.get("reviewtext") or ""]
+    )
+
+def _vote_overlap(marks, old_marks):
+    """
+    Works out where the last window of votes carries on, in the latest one. 
+    Identical votes have the same mark, so rather than looking for the first 
+    mark that's been seen before, this looks for the first place the rest of 
+    the latest window lines up with the start of the last one.
+
+    :param marks: The marks of the latest votes, newest first.
+    :param old_marks: The marks of the votes from the last sync, newest 
+    first.
+
+    :returns: How many of the latest votes are new. All of them, if the 
+    windows don't overlap.
+
+    """
+    for start in xrange(len(marks)):
+        rest = marks[start:]
+        if rest == old_marks[0:len(rest)]:
+            return start
+
+    return len(marks)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
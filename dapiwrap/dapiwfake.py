@@ -0,0 +1,1053 @@
+#===============================================================================
+# DAPIWFake: Fake idgames Servers for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains local stand-ins for the servers DAPIWrap talks to, for
+testing, and benchmarking, without hammering Doomworld, or its mirrors:
+
+- ``FakeArchive``, a made up idgames archive, with files, directories, and
+  votes, which answers the actions of the API (``api.php``).
+- ``FakeAPI``, an HTTP server for the archive's API.
+- ``FakeHTTPMirror`` & ``FakeFTPMirror``, mirrors of the archive's files.
+- ``FakeIdgames``, which runs all three, and makes ``DAPIWrap`` instances
+  that use them.
+
+Each server runs in a background thread, and can be made slower, with a
+latency, in seconds, added before each reply, and a bandwidth, in bytes per
+second, for each connection. The archive is made from a random seed, so the
+same seed always gives the same archive.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import BaseHTTPServer
+import calendar
+import hashlib
+import json
+import posixpath
+import random
+import re
+import socket
+import SocketServer
+import sys
+import threading
+import time
+import urlparse
+
+from dapiwconst import (
+    DIRECT_DESC,
+    FAKE_CHUNK,
+    FAKE_FILES,
+    FAKE_SEED,
+    FAKE_SIZES,
+    GAMES,
+    IDGAMES,
+    LVLS,
+    MIRROR_PROBE_BYTES,
+    MIRROR_PROBE_FILE,
+    SEARCH_LIMIT,
+    SORT_DATE,
+    TYPE_FILE
+)
+
+from dapiwnet import RateLimiter
+from dapiwrap import DAPIWrap
+
+#===============================================================================
+# FakeArchive Class
+#===============================================================================
+
+_WORDS = (
+    "doom map level wad megawad base tech hell slaughter secret exit boss "
+    "cyberdemon imp shotgun plasma bfg zdoom boom vanilla tested author "
+    "thanks credits build time editor castle outpost refinery crypt lab "
+    "tower station canyon"
+).split()
+
+# The letter ranges the levels directories are split into.
+_SUBDIRS = ("a-c", "d-f", "g-i", "j-l", "m-o", "p-r", "s-u", "v-z")
+
+# The fields the API sends for each file in a listing, or search. ``get``
+# sends every field.
+_SHORT_FIELDS = (
+    "id", "title", "dir", "filename", "size", "age", "date", "author",
+    "email", "description", "rating", "votes", "url", "idgamesurl"
+)
+
+class FakeArchive(object):
+    """A made up idgames archive, and the API actions to look through it."""
+
+    def __init__(self, files=FAKE_FILES, sizes=FAKE_SIZES, seed=FAKE_SEED):
+        """
+        The FakeArchive init method. Makes up the archive.
+
+        :param files: How many files to make.
+        :param sizes: The smallest, and biggest, file size, in bytes.
+        :param seed: The random seed.
+
+        """
+        rand = random.Random(seed)
+
+        # The bytes every file's data is made from.
+        self._block = "".join(chr(rand.randint(0, 255)) for _ in xrange(4096))
+
+        # The full info of each file, by ID, and the IDs, by path.
+        self.records = {}
+        self.paths = {}
+
+        # The ID of each directory, by path, and the subdirectories, and the
+        # IDs of the files, in each one.
+        self.dirs = {}
+        self.subdirs = {}
+        self.files = {}
+
+        authors = [
+            (_text(rand, 2).title(), "%s@example.com" % (rand.choice(_WORDS)))
+            for _ in xrange(max(1, files // 10))
+        ]
+
+        for wad_id in xrange(1, files + 1):
+            record = self._make_record(rand, wad_id, sizes, authors)
+            self.records[wad_id] = record
+            self.paths[record["dir"] + record["filename"]] = wad_id
+            self._add_dir(record["dir"])
+            self.files[record["dir"]].append(wad_id)
+
+        for dir_id, path in enumerate(sorted(self.dirs), 1):
+            self.dirs[path] = dir_id
+            self.subdirs[path].sort()
+        self._dir_paths = dict((y, x) for x, y in self.dirs.iteritems())
+
+        # The votes, newest first. Like the real ones, they don't have IDs of
+        # their own, just the ID of the file.
+        self.votes = []
+        for _ in xrange(files // 2):
+            record = self.records[rand.randint(1, files)]
+            self.votes.append({
+                "id": record["id"],
+                "title": record["title"],
+                "reviewtext": _text(rand, 8),
+                "vote": rand.randint(1, 5)
+            })
+
+        self.probe = self._data(0, MIRROR_PROBE_BYTES * 2)
+
+    def _add_dir(self, path):
+        """
+        Adds a directory, and the ones it's in, to the tree.
+
+        :param path: The directory's path, ending in a slash.
+
+        :returns: None.
+
+        """
+        while path and path not in self.dirs:
+            self.dirs[path] = None
+            self.subdirs.setdefault(path, [])
+            self.files.setdefault(path, [])
+
+            parent = _parent(path)
+            if parent:
+                self.subdirs.setdefault(parent, []).append(path)
+            path = parent
+
+    def _data(self, wad_id, size):
+        """
+        Makes the data of a file. Each file starts at a different place in
+        the block, so no two are the same.
+
+        :param wad_id: The file's ID.
+        :param size: The file's size, in bytes.
+
+        :returns: The data.
+
+        """
+        start = (wad_id * 7919) % len(self._block)
+        block = self._block[start:] + self._block[:start]
+
+        return (block * (size // len(block) + 1))[0:size]
+
+    def _make_record(self, rand, wad_id, sizes, authors):
+        """
+        Makes up the info of a file.
+
+        :param rand: A ``random.Random``.
+        :param wad_id: The file's ID.
+        :param sizes: The smallest, and biggest, file size, in bytes.
+        :param authors: A list of ``(author, email)`` tuples to pick from.
+
+        :returns: The wad info, in ``dict`` form.
+
+        """
+        filename = "%s%d.zip" % (rand.choice(_WORDS)[0:5], wad_id)
+        subdir = [x for x in _SUBDIRS if x[0] <= filename[0] <= x[2]][0]
+        wad_dir = "%s%s/" % (LVLS % (rand.choice(GAMES)), subdir)
+
+        year, month, day = (
+            rand.randint(1994, 2014), rand.randint(1, 12), rand.randint(1, 28)
+        )
+        votes = rand.randint(0, 50)
+        size = rand.randint(*sizes)
+        author, email = rand.choice(authors)
+
+        return {
+            "id": wad_id,
+            "title": _text(rand, 3).title(),
+            "dir": wad_dir,
+            "filename": filename,
+            "size": size,
+            "age": calendar.timegm((year, month, day, 0, 0, 0)),
+            "date": "%04d-%02d-%02d" % (year, month, day),
+            "author": author,
+            "email": email,
+            "description": _text(rand, 20),
+            "credits": _text(rand, 6),
+            "base": _text(rand, 3),
+            "buildtime": _text(rand, 2),
+            "editors": _text(rand, 2),
+            "bugs": _text(rand, 4),
+            "textfile": "\r\n".join(_text(rand, 10) for _ in xrange(40)),
+            "rating": round(rand.uniform(1, 5), 4) if votes else 0,
+            "votes": votes,
+            "reviews": {"review": [
+                {"text": _text(rand, 8), "vote": rand.randint(1, 5)}
+                for _ in xrange(min(votes, 3))
+            ]},
+            "md5": hashlib.md5(self._data(wad_id, size)).hexdigest(),
+            "url": "http://www.doomworld.com/idgames/?id=%d" % (wad_id),
+            "idgamesurl": "idgames://%s%s" % (wad_dir, filename)
+        }
+
+    def api(self, query):
+        """
+        Answers an API request.
+
+        :param query: The request's query string, in a ``dict``, with the
+        ``action``, and its parameters.
+
+        :returns: The response, in ``dict`` (JSON) form.
+
+        """
+        actions = {
+            "about": self._about,
+            "dbping": self._ping,
+            "get": self._get,
+            "getcontents": self._getcontents,
+            "getdirs": self._getdirs,
+            "getfiles": self._getfiles,
+            "getparentdir": self._getparentdir,
+            "latestfiles": self._latestfiles,
+            "latestvotes": self._latestvotes,
+            "ping": self._ping,
+            "search": self._search
+        }
+
+        action = actions.get(query.get("action"))
+
+        if action is None:
+            return _response(error="Unknown action.")
+
+        try:
+            return action(query)
+        except (KeyError, ValueError) as err:
+            return _response(error="Bad parameters: %s" % (err))
+
+    def data(self, path):
+        """
+        Gets the data of a file on the mirrors.
+
+        :param path: The path of the file, from the idgames root.
+
+        :returns: The data, or ``None`` if there's no such file.
+
+        """
+        if path == MIRROR_PROBE_FILE:
+            return self.probe
+
+        wad_id = self.paths.get(path)
+
+        if wad_id is None:
+            return
+
+        return self._data(wad_id, self.records[wad_id]["size"])
+
+    def is_dir(self, path):
+        """
+        Checks whether a path is a directory on the mirrors.
+
+        :param path: The path, from the idgames root.
+
+        :returns: ``True`` if it's a directory.
+
+        """
+        path = path.strip("/")
+
+        return not path or path + "/" in self.dirs
+
+    def _dir(self, query):
+        """
+        Gets the directory a request is for, by its ``id``, or ``name``.
+
+        :returns: The directory's path, or ``None``.
+
+        """
+        if "id" in query:
+            return self._dir_paths.get(int(query["id"]))
+
+        name = query["name"]
+        if not name.endswith("/"):
+            name += "/"
+
+        return name if name in self.dirs else None
+
+    def _short(self, wad_id):
+        """
+        Gets the info of a file, as it's sent in listings.
+
+        :param wad_id: The file's ID.
+
+        :returns: The wad info, in ``dict`` form.
+
+        """
+        record = self.records[wad_id]
+
+        return dict((x, record[x]) for x in _SHORT_FIELDS)
+
+    def _about(self, query):
+        return _response({
+            "info": "A fake of the idgames API, from dapiwfake.",
+            "credits": "DAPIWrap",
+            "copyright": "None"
+        })
+
+    def _get(self, query):
+        if "id" in query:
+            wad_id = int(query["id"])
+        else:
+            wad_id = self.paths.get(query["file"])
+
+        if wad_id not in self.records:
+            return _response(error="File not found.")
+
+        return _response(self.records[wad_id])
+
+    def _getcontents(self, query):
+        path = self._dir(query)
+
+        if path is None:
+            return _response(error="Directory not found.")
+
+        return _response(_listing(
+            file=[self._short(x) for x in self.files[path]],
+            dir=[{"id": self.dirs[x], "name": x} for x in self.subdirs[path]]
+        ))
+
+    def _getdirs(self, query):
+        path = self._dir(query)
+
+        if path is None:
+            return _response(error="Directory not found.")
+
+        return _response(_listing(
+            dir=[{"id": self.dirs[x], "name": x} for x in self.subdirs[path]]
+        ))
+
+    def _getfiles(self, query):
+        path = self._dir(query)
+
+        if path is None:
+            return _response(error="Directory not found.")
+
+        return _response(_listing(
+            file=[self._short(x) for x in self.files[path]]
+        ))
+
+    def _getparentdir(self, query):
+        path = self._dir(query)
+        parent = path and _parent(path)
+
+        if not parent:
+            return _response(error="Directory not found.")
+
+        return _response({"id": self.dirs[parent], "name": parent})
+
+    def _latestfiles(self, query):
+        newest = sorted(self.records, reverse=True)[0:int(query["limit"])]
+
+        return _response(_listing(file=[self._short(x) for x in newest]))
+
+    def _latestvotes(self, query):
+        return _response(_listing(vote=self.votes[0:int(query["limit"])]))
+
+    def _ping(self, query):
+        return _response({"status": "true"})
+
+    def _search(self, query):
+        text = query["query"].lower()
+        field = query.get("type") or TYPE_FILE
+        sort = query.get("sort") or SORT_DATE
+
+        found = [
+            x for x in sorted(self.records)
+            if text in unicode(self.records[x].get(field, "")).lower()
+        ]
+        found.sort(key=lambda x: self.records[x][sort])
+
+        if query.get("dir") == DIRECT_DESC:
+            found.reverse()
+
+        if not found:
+            return _response(warning="No files returned.")
+
+        return _response(_listing(
+            file=[self._short(x) for x in found[0:SEARCH_LIMIT]]
+        ))
+
+#===============================================================================
+# Fake Servers
+#===============================================================================
+
+class _FakeServer(object):
+    """The base of the fake servers, which run in a background thread."""
+
+    def __init__(
+            self, archive=None, latency=0.0, bandwidth=None, host="127.0.0.1",
+            port=0
+        ):
+        """
+        The init method for the fake servers. Binds the server, but doesn't
+        start it.
+
+        :param archive: Optional. The ``FakeArchive`` to serve. One is made,
+        with the defaults, if not given.
+        :param latency: How long to wait, in seconds, before each reply.
+        :param bandwidth: Optional. The most bytes to send each second, on
+        each connection.
+        :param host: The address to listen on.
+        :param port: The port to listen on. Any free port, if 0.
+
+        """
+        if archive is None:
+            archive = FakeArchive()
+
+        self.archive = archive
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+        # How many requests the server has had.
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        self._server = self._make_server((host, port))
+        self._server.fake = self
+        self.host, self.port = self._server.server_address[0:2]
+
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _make_server(self, address):
+        """Makes the ``SocketServer`` server, bound to the given address."""
+        raise NotImplementedError
+
+    def count(self):
+        """
+        Counts a request.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            self.requests += 1
+
+    def reply(self):
+        """
+        Counts a request, and waits for the latency, before replying to it.
+
+        :returns: None.
+
+        """
+        self.count()
+
+        if self.latency:
+            time.sleep(self.latency)
+
+    def send(self, write, data):
+        """
+        Sends data, no faster than the bandwidth.
+
+        :param write: The function to write the data with.
+        :param data: The data.
+
+        :returns: None.
+
+        """
+        if not self.bandwidth:
+            write(data)
+            return
+
+        start = time.time()
+
+        for offset in xrange(0, len(data), FAKE_CHUNK):
+            chunk = data[offset:offset + FAKE_CHUNK]
+            write(chunk)
+
+            wait = start + (offset + len(chunk)) / float(self.bandwidth)
+            wait -= time.time()
+            if wait > 0:
+                time.sleep(wait)
+
+    def start(self):
+        """
+        Starts the server, in a background thread.
+
+        :returns: The server.
+
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stops the server, and closes its socket.
+
+        :returns: None.
+
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.close_requests()
+        self._server.server_close()
+
+class _ServerMixIn(SocketServer.ThreadingMixIn):
+    """
+    Handles each connection in a thread, and keeps track of them, so they 
+    can all be closed when the server's stopped, including kept-alive ones.
+
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def close_requests(self):
+        """
+        Shuts down every open connection.
+
+        :returns: None.
+
+        """
+        for request in list(self._requests()):
+            try:
+                request.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def process_request(self, request, client_address):
+        self._requests().add(request)
+        SocketServer.ThreadingMixIn.process_request(
+            self, request, client_address
+        )
+
+    def shutdown_request(self, request):
+        self._requests().discard(request)
+        SocketServer.TCPServer.shutdown_request(self, request)
+
+    def _requests(self):
+        if not hasattr(self, "_open_requests"):
+            self._open_requests = set()
+        return self._open_requests
+
+class _HTTPServer(_ServerMixIn, BaseHTTPServer.HTTPServer):
+    """A threaded HTTP server, that doesn't complain about dropped clients."""
+
+    def handle_error(self, request, client_address):
+        if not issubclass(sys.exc_info()[0], socket.error):
+            BaseHTTPServer.HTTPServer.handle_error(
+                self, request, client_address
+            )
+
+class _HTTPHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """The base of the fake HTTP servers' request handlers."""
+
+    # Keep connections alive, like the real servers, so sessions reuse them.
+    protocol_version = "HTTP/1.1"
+    # Each header is written on its own, so without this, replies wait on
+    # delayed ACKs, and every call takes an extra 40ms or so.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type, headers=()):
+        """
+        Sends a response.
+
+        :param status: The HTTP status code.
+        :param body: The body.
+        :param content_type: The body's content type.
+        :param headers: Any other headers, as ``(name, value)`` tuples.
+
+        :returns: None.
+
+        """
+        fake = self.server.fake
+        fake.reply()
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+
+        if self.command != "HEAD":
+            fake.send(self.wfile.write, body)
+
+#===============================================================================
+# FakeAPI Class
+#===============================================================================
+
+class _APIHandler(_HTTPHandler):
+    """Answers requests to the fake ``api.php``."""
+
+    def do_GET(self):
+        url = urlparse.urlparse(self.path)
+
+        if url.path != "/api.php":
+            self.send_body(404, "Not found.", "text/plain")
+            return
+
+        query = dict(
+            (x, y[0]) for x, y in
+            urlparse.parse_qs(url.query, keep_blank_values=True).iteritems()
+        )
+        response = self.server.fake.archive.api(query)
+
+        self.send_body(200, json.dumps(response), "application/json")
+
+class FakeAPI(_FakeServer):
+    """
+    A fake of the idgames API. Pass its ``url`` to ``DAPIWrap`` as the
+    ``api_url``.
+
+    """
+
+    def _make_server(self, address):
+        return _HTTPServer(address, _APIHandler)
+
+    @property
+    def url(self):
+        """The API url, up to the action, for ``DAPIWrap``'s ``api_url``."""
+        return "http://%s:%d/api.php?action=" % (self.host, self.port)
+
+#===============================================================================
+# FakeHTTPMirror Class
+#===============================================================================
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+class _MirrorHandler(_HTTPHandler):
+    """Sends the files of the fake archive, or ranges of them."""
+
+    def do_GET(self):
+        path = urlparse.urlparse(self.path).path.lstrip("/")
+
+        data = None
+        if path.startswith(IDGAMES):
+            data = self.server.fake.archive.data(path[len(IDGAMES):])
+
+        if data is None:
+            self.send_body(404, "Not found.", "text/plain")
+            return
+
+        match = _RANGE_RE.match(self.headers.get("Range", ""))
+
+        if match is None or not any(match.groups()):
+            self.send_body(200, data, "application/octet-stream")
+            return
+
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            end = min(int(end), len(data) - 1) if end else len(data) - 1
+        else:
+            # The last bytes of the file.
+            start = max(0, len(data) - int(end))
+            end = len(data) - 1
+
+        if start >= len(data) or start > end:
+            self.send_body(
+                416, "", "application/octet-stream",
+                [("Content-Range", "bytes */%d" % (len(data)))]
+            )
+            return
+
+        self.send_body(
+            206, data[start:end + 1], "application/octet-stream",
+            [("Content-Range", "bytes %d-%d/%d" % (start, end, len(data)))]
+        )
+
+    do_HEAD = do_GET
+
+class FakeHTTPMirror(_FakeServer):
+    """
+    A fake HTTP mirror of the archive's files, which supports ranges, for
+    resuming downloads. Its ``url`` goes in ``Downwad.servers``.
+
+    """
+
+    def _make_server(self, address):
+        return _HTTPServer(address, _MirrorHandler)
+
+    @property
+    def url(self):
+        """The mirror's url, as used for the servers in ``DL_HTTP``."""
+        return "http://%s:%d/" % (self.host, self.port)
+
+#===============================================================================
+# FakeFTPMirror Class
+#===============================================================================
+
+class _FTPServer(_ServerMixIn, SocketServer.TCPServer):
+    """A threaded TCP server, for the FTP control connections."""
+
+class _FTPHandler(SocketServer.StreamRequestHandler):
+    """
+    Answers the commands of one FTP session. Only the commands DAPIWrap uses
+    are supported: logging in anonymously, changing directory, and passive,
+    binary, resumable downloads.
+
+    """
+
+    def handle(self):
+        self.fake = self.server.fake
+        self.cwd = "/"
+        self.rest = 0
+        self.passive = None
+
+        try:
+            self._reply("220 dapiwfake FTP server ready.")
+
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    break
+
+                command, _, arg = line.strip().partition(" ")
+                command = command.upper()
+
+                if command == "QUIT":
+                    self._reply("221 Goodbye.")
+                    break
+
+                handler = getattr(self, "ftp_" + command, None)
+                if handler is None:
+                    self._reply("502 %s not implemented." % (command))
+                else:
+                    handler(arg)
+        except socket.error:
+            pass
+        finally:
+            self._close_passive()
+
+    def _close_passive(self):
+        if self.passive is not None:
+            self.passive.close()
+            self.passive = None
+
+    def _path(self, arg):
+        """Gets the full path of a command's argument."""
+        return posixpath.normpath(posixpath.join(self.cwd, arg or "."))
+
+    def _reply(self, line):
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        self.wfile.write(line + "\r\n")
+
+    def ftp_ABOR(self, arg):
+        self._reply("226 Nothing to abort.")
+
+    def ftp_CWD(self, arg):
+        path = self._path(arg)
+
+        if not self.fake.archive.is_dir(path.lstrip("/")):
+            self._reply("550 %s: No such directory." % (arg))
+            return
+
+        self.cwd = path
+        self._reply("250 Directory changed to %s." % (path))
+
+    def ftp_EPSV(self, arg):
+        self._listen()
+        self._reply(
+            "229 Entering Extended Passive Mode (|||%d|)." % (
+                self.passive.getsockname()[1]
+            )
+        )
+
+    def ftp_NOOP(self, arg):
+        self._reply("200 OK.")
+
+    def ftp_PASS(self, arg):
+        self._reply("230 Logged in.")
+
+    def ftp_PASV(self, arg):
+        self._listen()
+        host, port = self.passive.getsockname()[0:2]
+
+        self._reply("227 Entering Passive Mode (%s,%d,%d)." % (
+            host.replace(".", ","), port >> 8, port & 0xFF
+        ))
+
+    def ftp_PWD(self, arg):
+        self._reply('257 "%s" is the current directory.' % (self.cwd))
+
+    def ftp_REST(self, arg):
+        self.rest = int(arg)
+        self._reply("350 Restarting at %d." % (self.rest))
+
+    def ftp_RETR(self, arg):
+        data = self.fake.archive.data(self._path(arg).lstrip("/"))
+
+        if data is None:
+            self.rest = 0
+            self._reply("550 %s: No such file." % (arg))
+            return
+
+        if self.passive is None:
+            self._reply("425 Use PASV first.")
+            return
+
+        self.fake.count()
+        self._reply("150 Opening BINARY mode data connection.")
+
+        aborted = False
+        try:
+            data_conn, _ = self.passive.accept()
+            try:
+                self.fake.send(data_conn.sendall, data[self.rest:])
+            finally:
+                data_conn.close()
+        except socket.error:
+            aborted = True
+        finally:
+            self._close_passive()
+            self.rest = 0
+
+        if aborted:
+            self._reply("426 Connection closed; transfer aborted.")
+        else:
+            self._reply("226 Transfer complete.")
+
+    def ftp_SIZE(self, arg):
+        data = self.fake.archive.data(self._path(arg).lstrip("/"))
+
+        if data is None:
+            self._reply("550 %s: No such file." % (arg))
+        else:
+            self._reply("213 %d" % (len(data)))
+
+    def ftp_SYST(self, arg):
+        self._reply("215 UNIX Type: L8")
+
+    def ftp_TYPE(self, arg):
+        self._reply("200 Type set to %s." % (arg))
+
+    def ftp_USER(self, arg):
+        self._reply("331 Send anything as the password.")
+
+    def _listen(self):
+        """Opens a new passive data socket, on the control connection's host."""
+        self._close_passive()
+
+        self.passive = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.passive.bind((self.connection.getsockname()[0], 0))
+        self.passive.listen(1)
+        self.passive.settimeout(30)
+
+class FakeFTPMirror(_FakeServer):
+    """
+    A fake FTP mirror of the archive's files. The idgames root is the FTP
+    root, so add its ``url`` to ``Downwad.ftp_dirs``, with an empty path.
+
+    """
+
+    def _make_server(self, address):
+        return _FTPServer(address, _FTPHandler)
+
+    @property
+    def url(self):
+        """The mirror's address, as used for the servers in ``DL_FTP``."""
+        return "%s:%d" % (self.host, self.port)
+
+#===============================================================================
+# FakeIdgames Class
+#===============================================================================
+
+class FakeIdgames(object):
+    """A fake API, HTTP mirror and FTP mirror, all serving one archive."""
+
+    def __init__(
+            self, files=FAKE_FILES, latency=0.0, bandwidth=None,
+            seed=FAKE_SEED, host="127.0.0.1"
+        ):
+        """
+        The FakeIdgames init method. Makes the archive, and the servers, but
+        doesn't start them.
+
+        :param files: How many files the archive has.
+        :param latency: How long each server waits, in seconds, before each
+        reply.
+        :param bandwidth: Optional. The most bytes each server sends each
+        second, on each connection.
+        :param seed: The random seed for the archive.
+        :param host: The address to listen on.
+
+        """
+        self.archive = FakeArchive(files, seed=seed)
+
+        self.api = FakeAPI(self.archive, latency, bandwidth, host)
+        self.http = FakeHTTPMirror(self.archive, latency, bandwidth, host)
+        self.ftp = FakeFTPMirror(self.archive, latency, bandwidth, host)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def client(self, **kwargs):
+        """
+        Makes a ``DAPIWrap`` that uses the fake servers. With no rate limit,
+        unless a ``limiter`` is given.
+
+        Any arguments are passed on to ``DAPIWrap``.
+
+        :returns: The ``DAPIWrap`` instance.
+
+        """
+        kwargs.setdefault("api_url", self.api.url)
+        kwargs.setdefault("limiter", RateLimiter(None))
+
+        daw = DAPIWrap(**kwargs)
+        daw.download.servers = [self.http.url, self.ftp.url]
+        daw.download.ftp_dirs[self.ftp.url] = ""
+
+        return daw
+
+    def start(self):
+        """
+        Starts the servers.
+
+        :returns: The FakeIdgames instance.
+
+        """
+        for server in (self.api, self.http, self.ftp):
+            server.start()
+
+        return self
+
+    def stop(self):
+        """
+        Stops the servers.
+
+        :returns: None.
+
+        """
+        for server in (self.api, self.http, self.ftp):
+            server.stop()
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def _listing(**lists):
+    """
+    Makes the content of a listing, the way the API does: a list with one
+    item is sent as just the item, and empty lists are left out.
+
+    Each keyword is a key of the content, and its list.
+
+    :returns: The content, in a ``dict``.
+
+    """
+    content = {}
+
+    for key, items in lists.iteritems():
+        if len(items) == 1:
+            content[key] = items[0]
+        elif items:
+            content[key] = items
+
+    return content
+
+def _parent(path):
+    """
+    Gets the directory a directory is in.
+
+    :param path: The directory's path, ending in a slash.
+
+    :returns: The parent's path, ending in a slash, or an empty string, for
+    a top level directory.
+
+    """
+    parent = posixpath.dirname(path.rstrip("/"))
+
+    return parent + "/" if parent else ""
+
+def _response(content=None, error=None, warning=None):
+    """
+    Wraps the content of a response, or an error, or a warning, the way the
+    API does.
+
+    :returns: The response, in a ``dict``.
+
+    """
+    response = {"meta": {"version": 3}}
+
+    if error is not None:
+        response["error"] = {"type": "Error", "message": error}
+    elif warning is not None:
+        response["warning"] = {"type": "Warning", "message": warning}
+    else:
+        response["content"] = content
+
+    return response
+
+def _text(rand, count):
+    """
+    Makes up some text.
+
+    :param rand: A ``random.Random``.
+    :param count: How many words.
+
+    :returns: The text.
+
+    """
+    return " ".join(rand.choice(_WORDS) for _ in xrange(count))
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
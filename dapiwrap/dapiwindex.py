@@ -0,0 +1,376 @@
+#===============================================================================
+# DAPIWIndex: Search Index for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``SearchIndex``, an index over a list of wad info, for
+``DAPIWrap.search_local``. It's built once, and then gives the same results as
+searching through the list, without going through every record, for every
+query.
+
+Each field is lowercased once, when a record is added, and indexed by the
+words in it, and, for the short fields, by every run of ``INDEX_NGRAM``
+characters as well. A query is looked up in the indexes, to get the records
+that could match, and then each of those is checked for the query, just like a
+plain search.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import re
+
+from dapiwconst import (
+    INDEX_NGRAM,
+    INDEX_NGRAM_FIELDS,
+    INDEX_TOKEN_FIELDS,
+    TYPE_FILE
+)
+
+#===============================================================================
+# SearchIndex Class
+#===============================================================================
+
+class SearchIndex(object):
+    """An in-memory index over a list of wad info."""
+
+    def __init__(
+            self, records=None, ngram_fields=INDEX_NGRAM_FIELDS,
+            token_fields=INDEX_TOKEN_FIELDS
+        ):
+        """
+        The SearchIndex init method.
+
+        :param records: Optional. A list of wad info to index.
+        :param ngram_fields: The fields to index by n-grams, as well as by
+        words. Best kept to the short fields, since every n-gram of every
+        record is kept.
+        :param token_fields: The fields to only index by words.
+
+        """
+        self.ngram_fields = list(ngram_fields)
+        self.fields = self.ngram_fields + [
+            x for x in token_fields if x not in self.ngram_fields
+        ]
+
+        # The records, by slot, and the slot of each record, by its key.
+        self._records = {}
+        self._slots = {}
+        self._next_slot = 0
+
+        # The lowercased text of each field, by slot, and the word and n-gram
+        # indexes, from each word/n-gram to the slots it's in.
+        self._text = dict((x, {}) for x in self.fields)
+        self._tokens = dict((x, {}) for x in self.fields)
+        self._grams = dict((x, {}) for x in self.ngram_fields)
+
+        for record in records or []:
+            self.add(record)
+
+    def __contains__(self, record):
+        return _key(record) in self._slots
+
+    def __iter__(self):
+        for slot in sorted(self._records):
+            yield self._records[slot]
+
+    def __len__(self):
+        return len(self._records)
+
+    def _index(self, slot, record):
+        """
+        Adds a record's fields to the indexes.
+
+        :param slot: The record's slot.
+        :param record: The wad info.
+
+        :returns: None.
+
+        """
+        for field in self.fields:
+            text = record.get(field)
+            if not isinstance(text, basestring):
+                continue
+
+            text = text.lower()
+            self._text[field][slot] = text
+
+            tokens = self._tokens[field]
+            for token in set(_tokenize(text)):
+                tokens.setdefault(token, set()).add(slot)
+
+            if field in self._grams:
+                grams = self._grams[field]
+                for gram in _ngrams(text):
+                    grams.setdefault(gram, set()).add(slot)
+
+    def _unindex(self, slot):
+        """
+        Removes a record's fields from the indexes.
+
+        :param slot: The record's slot.
+
+        :returns: None.
+
+        """
+        for field in self.fields:
+            text = self._text[field].pop(slot, None)
+            if text is None:
+                continue
+
+            _discard(self._tokens[field], _tokenize(text), slot)
+
+            if field in self._grams:
+                _discard(self._grams[field], _ngrams(text), slot)
+
+    def add(self, record):
+        """
+        Adds a record to the index. Records are told apart by their ``id``,
+        so adding a record that's already in the index replaces it, keeping
+        its place in the order.
+
+        :param record: The wad info, in ``dict`` form.
+
+        :returns: None.
+
+        """
+        key = _key(record)
+        slot = self._slots.get(key)
+
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot += 1
+            self._slots[key] = slot
+        else:
+            self._unindex(slot)
+
+        self._records[slot] = record
+        self._index(slot, record)
+
+    def extend(self, records):
+        """
+        Adds several records to the index.
+
+        :param records: An iterable of wad info.
+
+        :returns: None.
+
+        """
+        for record in records:
+            self.add(record)
+
+    def remove(self, record):
+        """
+        Removes a record from the index.
+
+        :param record: The wad info, or just its ID.
+
+        :returns: ``True`` if the record was in the index.
+
+        """
+        if hasattr(record, "get"):
+            key = _key(record)
+        else:
+            key = record
+
+        slot = self._slots.pop(key, None)
+
+        if slot is None:
+            return False
+
+        self._unindex(slot)
+        del self._records[slot]
+
+        return True
+
+    def _candidates(self, field, query):
+        """
+        Narrows down the records that could contain the query, using the
+        indexes.
+
+        :param field: The field to search.
+        :param query: The lowercased query.
+
+        :returns: A set of slots, or ``None`` if the indexes can't narrow it
+        down.
+
+        """
+        grams = self._grams.get(field)
+
+        if grams is not None and len(query) >= INDEX_NGRAM:
+            return _intersect([grams.get(x, ()) for x in set(_ngrams(query))])
+
+        words = _tokenize(query)
+        if not words:
+            return
+
+        tokens = self._tokens[field]
+
+        # A word in the middle of the query has to be a whole word in the
+        # record, but the ones at the ends can be cut off.
+        starts = query.startswith(words[0])
+        ends = query.endswith(words[-1])
+
+        whole = words[int(starts):len(words) - int(ends)]
+        if whole:
+            return _intersect([tokens.get(x, ()) for x in set(whole)])
+
+        postings = []
+
+        if len(words) == 1 and starts and ends:
+            postings.append(_union(tokens, lambda x: words[0] in x))
+        else:
+            if starts:
+                postings.append(_union(tokens, lambda x: x.endswith(words[0])))
+            if ends:
+                postings.append(
+                    _union(tokens, lambda x: x.startswith(words[-1]))
+                )
+
+        return _intersect(postings)
+
+    def search(self, query, field=TYPE_FILE):
+        """
+        Searches the index, just like searching through the records, with
+        ``query.lower() in record[field].lower()``.
+
+        :param query: The search query.
+        :param field: The field to search. Must be one of the indexed fields.
+
+        :returns: A list of the matching records, in the order they were
+        added.
+
+        """
+        if field not in self._text:
+            raise KeyError("The %s field isn't indexed." % (field))
+
+        query = query.lower()
+        text = self._text[field]
+
+        slots = self._candidates(field, query)
+        if slots is None:
+            slots = text
+
+        return [
+            self._records[x] for x in sorted(slots) if query in text[x]
+        ]
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def _discard(index, keys, slot):
+    """
+    Removes a slot from the given keys of an index, dropping any keys that
+    are left empty.
+
+    :param index: The index, a ``dict`` of sets.
+    :param keys: The keys the slot was added under.
+    :param slot: The slot to remove.
+
+    :returns: None.
+
+    """
+    for key in set(keys):
+        slots = index.get(key)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del index[key]
+
+def _intersect(postings):
+    """
+    Intersects sets of slots, starting with the smallest.
+
+    :param postings: A list of sets.
+
+    :returns: A set of the slots in all of them.
+
+    """
+    postings = sorted(postings, key=len)
+
+    if not postings or not postings[0]:
+        return set()
+
+    result = set(postings[0])
+    for slots in postings[1:]:
+        result &= slots
+        if not result:
+            break
+
+    return result
+
+def _key(record):
+    """
+    Gets the key to tell a record apart by.
+
+    :param record: The wad info.
+
+    :returns: The record's ``id``, or if it has none, the record itself's.
+
+    """
+    key = record.get("id")
+
+    if key is None:
+        return id(record)
+
+    return key
+
+def _ngrams(text):
+    """
+    Gets every run of ``INDEX_NGRAM`` characters in the given text.
+
+    :param text: The text.
+
+    :returns: A list of the n-grams.
+
+    """
+    return [
+        text[x:x + INDEX_NGRAM] for x in xrange(len(text) - INDEX_NGRAM + 1)
+    ]
+
+def _tokenize(text):
+    """
+    Splits the given text into words.
+
+    :param text: The text.
+
+    :returns: A list of the words.
+
+    """
+    return _TOKEN_RE.findall(text)
+
+def _union(tokens, match):
+    """
+    Gets every slot of the words that match a test.
+
+    :param tokens: A word index.
+    :param match: A function that takes a word, and returns whether it
+    matches.
+
+    :returns: A set of the slots.
+
+    """
+    result = set()
+
+    for token, slots in tokens.iteritems():
+        if match(token):
+            result |= slots
+
+    return result
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
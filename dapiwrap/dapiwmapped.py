@@ -0,0 +1,358 @@
+#===============================================================================
+# DAPIWMapped: Memory-Mapped Catalog for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``MappedCatalog``, a catalog of wad info kept in a binary
+file, and read through ``mmap``, for looking records up by ID without loading
+the whole catalog first.
+
+Opening one just reads the header, and a lookup reads one slot of the ID table
+and decodes one record, so it takes the same time however big the catalog is.
+Since the file is only read, any number of processes can open the same one,
+and share it through the OS's page cache.
+
+On POSIX systems, a catalog can be rebuilt while other processes have it
+open, and they carry on reading the old one. Windows won't replace a file
+that's mapped, so there, close the catalog everywhere before rebuilding it,
+or build it under a new filename.
+
+The file is laid out as:
+
+- A header: ``MAPPED_MAGIC``, the format version, flags, the lowest ID, the
+  number of ID table slots, the number of records, and where the ID table
+  starts.
+- The record heap: each record, as JSON (compressed, if the catalog was built
+  with ``compress``), one after the other.
+- The ID table: a slot for every ID, from the lowest to the highest, of where
+  its record starts in the file, and how long it is. Slots for IDs that
+  aren't in the catalog are left as zeros.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+from dapiwconst import (
+    MAPPED_MAGIC,
+    MAPPED_SPARSE_LIMIT,
+    MAPPED_VERSION
+)
+
+from dapiwrap import DECODER, DECODERS
+from dapiwrecord import WadInfo
+from dapiwtools import _replace, _to_json
+
+#===============================================================================
+# MappedCatalog Class
+#===============================================================================
+
+# magic, version, flags, lowest ID, slots, records, ID table offset
+_HEADER = struct.Struct("<8sIIqQQQ")
+# record offset, record length
+_SLOT = struct.Struct("<QI")
+
+# The records are zlib compressed.
+_FLAG_COMPRESSED = 1
+
+class MappedCatalog(object):
+    """A catalog of wad info, looked up by ID, straight from a mapped file."""
+
+    def __init__(self, filename, decoder=None, compact=False):
+        """
+        The MappedCatalog init method. Maps the file, and reads the header.
+
+        :param filename: The filename of a catalog made with ``build``.
+        :param decoder: Optional. The JSON decoder to use for records. Either
+        the name of one in ``DECODERS``, or a function. Defaults to the
+        fastest one installed.
+        :param compact: Whether to return records as ``WadInfo``, instead of
+        ``dict`` objects.
+
+        """
+        if decoder is None:
+            decoder = DECODER
+        if isinstance(decoder, basestring):
+            decoder = DECODERS[decoder]
+
+        self.filename = filename
+        self.decoder = decoder
+        self.compact = compact
+
+        self._file = open(filename, "rb")
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self._read_header()
+        except (ValueError, EnvironmentError, struct.error):
+            self.close()
+            raise
+
+    def __contains__(self, wad_id):
+        return self._slot(wad_id) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, wad_id):
+        slot = self._slot(wad_id)
+
+        if slot is None:
+            raise KeyError(wad_id)
+
+        return self._decode(*slot)
+
+    def __iter__(self):
+        for wad_id in self.ids():
+            yield self[wad_id]
+
+    def __len__(self):
+        return self.count
+
+    def _read_header(self):
+        """
+        Reads the header, and checks the file is a catalog this version can
+        read.
+
+        :returns: None.
+
+        """
+        if len(self._map) < _HEADER.size:
+            raise ValueError("%s isn't a mapped catalog." % (self.filename))
+
+        (magic, version, self.flags, self.low_id, self.slots, self.count,
+            self._table) = _HEADER.unpack_from(self._map, 0)
+
+        if magic != MAPPED_MAGIC:
+            raise ValueError("%s isn't a mapped catalog." % (self.filename))
+
+        if version != MAPPED_VERSION:
+            raise ValueError(
+                "%s is version %d of the format, expected %d." % (
+                    self.filename, version, MAPPED_VERSION
+                )
+            )
+
+        if self._table + self.slots * _SLOT.size > len(self._map):
+            raise ValueError("%s is cut off." % (self.filename))
+
+    def _decode(self, offset, length):
+        """
+        Decodes a record from the heap.
+
+        :param offset: Where the record starts in the file.
+        :param length: The record's length, in bytes.
+
+        :returns: The wad info.
+
+        """
+        data = self._map[offset:offset + length]
+
+        if self.flags & _FLAG_COMPRESSED:
+            data = zlib.decompress(data)
+
+        record = self.decoder(data)
+
+        if self.compact:
+            return WadInfo(record)
+        return record
+
+    def _slot(self, wad_id):
+        """
+        Reads the ID table slot for an ID.
+
+        :param wad_id: The wad ID.
+
+        :returns: A tuple of the record's offset and length, or ``None`` if
+        it isn't in the catalog.
+
+        """
+        try:
+            index = int(wad_id) - self.low_id
+        except (TypeError, ValueError):
+            return None
+
+        if not 0 <= index < self.slots:
+            return None
+
+        offset, length = _SLOT.unpack_from(
+            self._map, self._table + index * _SLOT.size
+        )
+
+        if not length:
+            return None
+
+        return (offset, length)
+
+    @staticmethod
+    def build(records, filename, compress=False):
+        """
+        Makes a mapped catalog file. The records are written as they come, so
+        they can come from a generator, like ``IOFuncs.open_jsonl``. The file
+        is written under a temporary name, and moved into place once it's
+        done, in one step. On POSIX systems, any process that already has the
+        old one open can carry on using it. On Windows, the old one can't be
+        replaced while it's open, so a ``WindowsError`` is raised, and it's
+        left as it was.
+
+        :param records: An iterable of wad info, each with an ``id``. If an
+        ID comes up more than once, the last one is kept.
+        :param filename: The filename of the catalog.
+        :param compress: Whether to zlib compress each record. Makes the file
+        smaller, and lookups slower.
+
+        :returns: The number of records in the catalog.
+
+        """
+        temp_name = filename + ".tmp"
+
+        try:
+            with open(temp_name, "wb") as catalog_file:
+                count = _write_catalog(records, catalog_file, compress)
+            _replace(temp_name, filename)
+        except:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+            raise
+
+        return count
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+
+        :returns: None.
+
+        """
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+
+        self._file.close()
+
+    def get(self, wad_id, default=None):
+        """
+        Gets a record by its ID.
+
+        :param wad_id: The wad ID.
+        :param default: What to return if the ID isn't in the catalog.
+
+        :returns: The wad info, or ``default``.
+
+        """
+        slot = self._slot(wad_id)
+
+        if slot is None:
+            return default
+
+        return self._decode(*slot)
+
+    def get_id_list(self, id_list):
+        """
+        Gets the records for a list of IDs, like ``DAPIWrap.get_id_list``.
+
+        :param id_list: A list of wad IDs.
+
+        :returns: A list of the wad info, leaving out IDs that aren't in the
+        catalog.
+
+        """
+        slots = [self._slot(x) for x in id_list]
+
+        return [self._decode(*x) for x in slots if x is not None]
+
+    def ids(self):
+        """
+        Goes through the IDs in the catalog, lowest first, reading just the
+        ID table.
+
+        :yields: Each wad ID.
+
+        """
+        for index in xrange(self.slots):
+            _, length = _SLOT.unpack_from(
+                self._map, self._table + index * _SLOT.size
+            )
+            if length:
+                yield self.low_id + index
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def _write_catalog(records, catalog_file, compress=False):
+    """
+    Writes a mapped catalog: the records to the heap, as they come, and then
+    the ID table, and lastly the header, once the IDs are known.
+
+    :param records: An iterable of wad info, each with an ``id``.
+    :param catalog_file: The file to write to, opened for writing.
+    :param compress: Whether to zlib compress each record.
+
+    :returns: The number of records written.
+
+    """
+    catalog_file.write("\0" * _HEADER.size)
+    offset = _HEADER.size
+    locations = {}
+
+    for record in records:
+        data = json.dumps(record, separators=(",", ":"), default=_to_json)
+        if compress:
+            data = zlib.compress(data)
+
+        catalog_file.write(data)
+        locations[int(record["id"])] = (offset, len(data))
+        offset += len(data)
+
+    if locations:
+        low_id = min(locations)
+        slots = max(locations) - low_id + 1
+    else:
+        low_id = 0
+        slots = 0
+
+    if slots > max(len(locations) * MAPPED_SPARSE_LIMIT, 4096):
+        raise ValueError(
+            "The IDs are too spread out: %d records, from %d to %d." % (
+                len(locations), low_id, low_id + slots - 1
+            )
+        )
+
+    table = bytearray(slots * _SLOT.size)
+    for wad_id, location in locations.iteritems():
+        _SLOT.pack_into(table, (wad_id - low_id) * _SLOT.size, *location)
+    catalog_file.write(table)
+
+    flags = _FLAG_COMPRESSED if compress else 0
+
+    catalog_file.seek(0)
+    catalog_file.write(_HEADER.pack(
+        MAPPED_MAGIC, MAPPED_VERSION, flags, low_id, slots, len(locations),
+        offset
+    ))
+
+    return len(locations)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
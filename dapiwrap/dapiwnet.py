@@ -0,0 +1,873 @@
+#===============================================================================
+# DAPIWNet: Networking Helpers for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains the networking helpers shared by ``DAPIWrap``, and the
+download functions in ``dapiwtools``, such as the rate limiter, which keeps
+the number of requests, and the bandwidth used, down to a polite level.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import ftplib
+import requests
+import socket
+import sys
+import threading
+import time
+import urlparse
+
+from dapiwconst import (
+    DL_FTP,
+    DL_HTTP,
+    FTP_CHECK_AFTER,
+    FTP_DIRS,
+    FTP_POOL_SIZE,
+    IDGAMES,
+    MIRROR_MAX_FAILURES,
+    MIRROR_PROBE_BYTES,
+    MIRROR_PROBE_FILE,
+    MIRROR_RETRY_AFTER,
+    MIRROR_SLOW_RATIO,
+    RATE_BURST,
+    RATE_REQUESTS,
+    TIMEOUT_CONNECT,
+    TIMEOUT_READ
+)
+
+#===============================================================================
+# TokenBucket Class
+#===============================================================================
+
+class TokenBucket(object):
+    """
+    A token bucket. Tokens are added at a steady rate, up to a maximum, and
+    taking more tokens than are available waits until they've been added.
+    Safe to share between threads.
+
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        The init method for the TokenBucket class.
+
+        :param rate: How many tokens are added each second. ``None`` for no
+        limit.
+        :param capacity: The most tokens the bucket can hold, which is how
+        many can be taken at once, without waiting. Defaults to ``rate``.
+
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+
+        self._tokens = self.capacity
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Takes the given number of tokens, waiting until they're available.
+
+        Tokens are taken right away, even if that leaves the bucket in debt,
+        and the wait happens outside of the lock. That way, waiting threads
+        don't hold each other up, and are let through in the order they came.
+
+        :param amount: The number of tokens to take.
+
+        :returns: How long was spent waiting, in seconds.
+
+        """
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.time()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            self._tokens -= amount
+
+            if self._tokens < 0:
+                wait = -self._tokens / float(self.rate)
+            else:
+                wait = 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+#===============================================================================
+# RateLimiter Class
+#===============================================================================
+
+class RateLimiter(object):
+    """
+    Limits the number of requests per second, and the bytes per second,
+    across every thread that shares it. A single ``RateLimiter`` is shared by
+    the API calls of a ``DAPIWrap`` instance, and its downloads.
+
+    """
+
+    def __init__(
+            self, rate=RATE_REQUESTS, burst=RATE_BURST, byte_rate=None,
+            byte_burst=None
+        ):
+        """
+        The init method for the RateLimiter class.
+
+        :param rate: The most requests to make each second. ``None`` for no
+        limit.
+        :param burst: How many requests can be made back to back, after a
+        quiet period.
+        :param byte_rate: The most bytes to download each second. ``None`` for
+        no limit.
+        :param byte_burst: How many bytes can be downloaded at full speed,
+        after a quiet period. Defaults to one second's worth.
+
+        """
+        self.requests = TokenBucket(rate, burst)
+        self.bytes = TokenBucket(byte_rate, byte_burst)
+
+    def request(self):
+        """
+        Waits until another request can be made.
+
+        :returns: How long was spent waiting, in seconds.
+
+        """
+        return self.requests.acquire(1)
+
+    def transfer(self, size):
+        """
+        Accounts for the given number of downloaded bytes, waiting if they
+        go over the byte rate.
+
+        :param size: The number of bytes downloaded.
+
+        :returns: How long was spent waiting, in seconds.
+
+        """
+        return self.bytes.acquire(size)
+
+#===============================================================================
+# SingleFlight Class
+#===============================================================================
+
+class SingleFlight(object):
+    """
+    Makes sure only one of a set of identical calls is running at a time. 
+    Threads that make a call, with the same key as one that's already 
+    running, wait for it to finish, and get its result (or its exception), 
+    instead of making the call again. Safe to share between threads.
+
+    """
+
+    def __init__(self):
+        """The init method for the SingleFlight class."""
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        # How many calls were answered by one that was already running.
+        self.shared = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Calls the given function, unless a call with the same key is already 
+        running, in which case it waits for that one to finish.
+
+        :param key: The key that identical calls share, such as a url.
+        :param func: The function to call.
+
+        Any other arguments are passed on to the function.
+
+        :returns: The function's result.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            return call.wait()
+
+        try:
+            call.result = func(*args, **kwargs)
+        except:
+            call.error = sys.exc_info()
+            raise
+        finally:
+            # Later calls make their own, since the result could be stale.
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+class _Call(object):
+    """A call running under a SingleFlight, for the threads waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+        self.result = None
+
+    def wait(self):
+        """
+        Waits for the call to finish.
+
+        :returns: The call's result, or raises its exception.
+
+        """
+        self.done.wait()
+
+        if self.error is not None:
+            raise self.error[0], self.error[1], self.error[2]
+
+        return self.result
+
+#===============================================================================
+# MirrorMonitor Class
+#===============================================================================
+
+class MirrorMonitor(object):
+    """
+    Keeps track of the health of each download mirror: its connect latency,
+    and its throughput, as rolling averages of probes and real downloads.
+    Hands out the best mirror for each download, and takes mirrors that fail
+    repeatedly, or are far slower than the rest, out of rotation for a while,
+    before probing them again. Safe to share between threads.
+
+    """
+
+    def __init__(
+            self, session=None, timeout=(TIMEOUT_CONNECT, TIMEOUT_READ),
+            smoothing=0.3, max_failures=MIRROR_MAX_FAILURES,
+            slow_ratio=MIRROR_SLOW_RATIO, retry_after=MIRROR_RETRY_AFTER,
+            ftp_dirs=None
+        ):
+        """
+        The init method for the MirrorMonitor class.
+
+        :param session: Optional. The ``requests`` session to probe HTTP
+        mirrors with.
+        :param timeout: The timeout for probes, in seconds. Either a single
+        number, or a (connect, read) tuple.
+        :param smoothing: How much weight the latest measurement is given,
+        when updating a mirror's averages (0 to 1).
+        :param max_failures: How many failures in a row take a mirror out of
+        rotation.
+        :param slow_ratio: Mirrors slower than this fraction of the fastest
+        mirror's throughput are taken out of rotation.
+        :param retry_after: How long, in seconds, to leave a mirror out of
+        rotation, before probing it again.
+        :param ftp_dirs: Optional. A ``dict`` of the idgames path on each FTP
+        server, like ``Downwad.ftp_dirs``. Defaults to ``FTP_DIRS``.
+
+        """
+        if session is None:
+            session = requests.Session()
+        if ftp_dirs is None:
+            ftp_dirs = FTP_DIRS
+
+        self.session = session
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.max_failures = max_failures
+        self.slow_ratio = slow_ratio
+        self.retry_after = retry_after
+        self.ftp_dirs = ftp_dirs
+
+        self._stats = {}
+        self._cond = threading.Condition()
+
+    def _average(self, old, new):
+        """
+        Works a new measurement into a rolling average.
+
+        :param old: The current average, or ``None``.
+        :param new: The new measurement.
+
+        :returns: The new average.
+
+        """
+        if old is None:
+            return new
+
+        return old + self.smoothing * (new - old)
+
+    def _check(self, mirror):
+        """
+        Takes the given mirror out of rotation, if it has failed too many
+        times in a row, or is too slow. Must be called holding the lock.
+
+        :param mirror: The mirror.
+
+        :returns: None.
+
+        """
+        stats = self._entry(mirror)
+        rates = [x["rate"] for x in self._stats.values() if x["rate"]]
+
+        too_slow = (
+            stats["rate"] and
+            stats["rate"] < max(rates) * self.slow_ratio
+        )
+
+        if stats["failures"] >= self.max_failures or too_slow:
+            stats["down_until"] = time.time() + self.retry_after
+
+    def _cost(self, mirror):
+        """
+        Estimates how long a download from the given mirror would take,
+        relative to the other mirrors. Must be called holding the lock.
+
+        :param mirror: The mirror.
+
+        :returns: The relative cost of using the mirror.
+
+        """
+        stats = self._entry(mirror)
+        rate = stats["rate"]
+
+        # Mirrors without any measurements yet are assumed to be as fast as
+        # the fastest known mirror, so they get tried.
+        if not rate:
+            rates = [x["rate"] for x in self._stats.values() if x["rate"]]
+            rate = max(rates) if rates else 1.0
+
+        # The size of the average download so far, for weighing throughput 
+        # against latency.
+        count = sum(x["ok"] for x in self._stats.values())
+        if count:
+            size = sum(x["bytes"] for x in self._stats.values()) / count
+        else:
+            size = MIRROR_PROBE_BYTES
+
+        return (
+            (stats["latency"] or 0.0) + (stats["active"] + 1) * size / rate
+        )
+
+    def _entry(self, mirror):
+        """
+        Gets the stats for the given mirror, adding them if needed. Must be
+        called holding the lock.
+
+        :param mirror: The mirror.
+
+        :returns: The mirror's stats ``dict``.
+
+        """
+        if mirror not in self._stats:
+            self._stats[mirror] = {
+                "active": 0,
+                "latency": None,
+                "rate": None,
+                "ok": 0,
+                "failed": 0,
+                "failures": 0,
+                "bytes": 0,
+                "probed": None,
+                "down_until": None
+            }
+
+        return self._stats[mirror]
+
+    def _refresh(self, mirrors):
+        """
+        Probes any of the given mirrors that haven't been probed yet, or
+        whose time out of rotation is over.
+
+        :param mirrors: The mirrors to check.
+
+        :returns: None.
+
+        """
+        now = time.time()
+
+        with self._cond:
+            stale = []
+            for mirror in mirrors:
+                stats = self._entry(mirror)
+                if stats["probed"] is None and not stats["ok"]:
+                    stale.append(mirror)
+                elif stats["down_until"] and stats["down_until"] <= now:
+                    stale.append(mirror)
+            for mirror in stale:
+                # Stops other threads from probing the same mirror.
+                stats = self._entry(mirror)
+                stats["probed"] = now
+                if stats["down_until"]:
+                    stats["down_until"] = now + self.retry_after
+
+        if stale:
+            self.probe_all(stale)
+
+    def acquire(self, mirrors, limit, exclude=()):
+        """
+        Picks the mirror to download the next file from, waiting until one
+        of them has a free slot. Mirrors out of rotation are only used if
+        every mirror is.
+
+        :param mirrors: The mirrors to choose from.
+        :param limit: The most downloads to run from any one mirror at once.
+        :param exclude: Optional. Mirrors not to use.
+
+        :returns: The chosen mirror, or ``None`` if every mirror is excluded.
+        Once the download is done, ``release`` must be called with it.
+
+        """
+        mirrors = [x for x in mirrors if x not in exclude]
+
+        if not mirrors:
+            return None
+
+        self._refresh(mirrors)
+
+        with self._cond:
+            while True:
+                up = [x for x in mirrors if self.is_up(x)] or mirrors
+                free = [x for x in up if self._entry(x)["active"] < limit]
+                if free:
+                    break
+                self._cond.wait()
+
+            mirror = min(free, key=self._cost)
+            self._entry(mirror)["active"] += 1
+
+        return mirror
+
+    def best(self, mirrors):
+        """
+        Picks the best mirror to download from, probing any mirrors that
+        need it first.
+
+        :param mirrors: The mirrors to choose from.
+
+        :returns: The best mirror. If every mirror is out of rotation, the
+        one that was taken out first.
+
+        """
+        self._refresh(mirrors)
+
+        with self._cond:
+            up = [x for x in mirrors if self.is_up(x)]
+            if not up:
+                return min(mirrors, key=lambda x: self._entry(x)["down_until"])
+            return min(up, key=self._cost)
+
+    def is_up(self, mirror):
+        """
+        Checks whether the given mirror is in rotation.
+
+        :param mirror: The mirror.
+
+        :returns: ``True`` if the mirror is in rotation.
+
+        """
+        down_until = self._entry(mirror)["down_until"]
+
+        return not down_until or down_until <= time.time()
+
+    def probe(self, mirror):
+        """
+        Measures the connect latency, and throughput, of the given mirror, by
+        connecting to it, and reading the start of ``MIRROR_PROBE_FILE``.
+
+        :param mirror: The mirror to probe. Either an HTTP mirror url, or an
+        FTP server address.
+
+        :returns: ``True`` if the probe succeeded.
+
+        """
+        host, port = _mirror_address(mirror)
+
+        try:
+            start = time.time()
+            sock = socket.create_connection(
+                (host, port), _split_timeout(self.timeout)[0]
+            )
+            latency = time.time() - start
+            sock.close()
+
+            start = time.time()
+            if is_ftp(mirror):
+                size = self._probe_ftp(mirror)
+            else:
+                size = self._probe_http(mirror)
+            seconds = time.time() - start
+        except (socket.error, ftplib.Error, requests.RequestException,
+                EOFError):
+            with self._cond:
+                stats = self._entry(mirror)
+                stats["failed"] += 1
+                stats["failures"] += 1
+                self._check(mirror)
+            return False
+
+        with self._cond:
+            stats = self._entry(mirror)
+            stats["latency"] = self._average(stats["latency"], latency)
+            stats["probed"] = time.time()
+            stats["down_until"] = None
+            stats["failures"] = 0
+            if size and seconds > 0:
+                stats["rate"] = self._average(stats["rate"], size / seconds)
+            self._check(mirror)
+
+        return True
+
+    def _probe_ftp(self, mirror):
+        """
+        Reads the start of the probe file from an FTP mirror.
+
+        :param mirror: The FTP server address.
+
+        :returns: The number of bytes read.
+
+        """
+        host, port = _mirror_address(mirror)
+        connection = ftplib.FTP()
+        connection.connect(host, port, _split_timeout(self.timeout)[0])
+
+        try:
+            connection.login()
+            connection.cwd(self.ftp_dirs.get(mirror, ""))
+            data = connection.transfercmd("RETR %s" % (MIRROR_PROBE_FILE))
+            size = 0
+            try:
+                while size < MIRROR_PROBE_BYTES:
+                    chunk = data.recv(MIRROR_PROBE_BYTES - size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+            finally:
+                data.close()
+        finally:
+            connection.close()
+
+        return size
+
+    def _probe_http(self, mirror):
+        """
+        Reads the start of the probe file from an HTTP mirror.
+
+        :param mirror: The HTTP mirror url.
+
+        :returns: The number of bytes read.
+
+        """
+        response = self.session.get(
+            "%s%s%s" % (mirror, IDGAMES, MIRROR_PROBE_FILE),
+            headers={"Range": "bytes=0-%d" % (MIRROR_PROBE_BYTES - 1)},
+            stream=True, timeout=self.timeout
+        )
+
+        try:
+            response.raise_for_status()
+            size = 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size >= MIRROR_PROBE_BYTES:
+                    break
+        finally:
+            response.close()
+
+        return size
+
+    def probe_all(self, mirrors=DL_HTTP + DL_FTP):
+        """
+        Probes the given mirrors, all at once.
+
+        :param mirrors: The mirrors to probe.
+
+        :returns: A ``dict`` of mirrors, and whether their probe succeeded.
+
+        """
+        threads = []
+        results = {}
+
+        def run(mirror):
+            results[mirror] = self.probe(mirror)
+
+        for mirror in mirrors:
+            thread = threading.Thread(target=run, args=(mirror,))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def record(self, mirror, size=0, seconds=0.0, ok=True):
+        """
+        Records a finished download from the given mirror.
+
+        :param mirror: The mirror the file was downloaded from.
+        :param size: The number of bytes downloaded.
+        :param seconds: How long the download took.
+        :param ok: Whether the download succeeded.
+
+        :returns: None.
+
+        """
+        with self._cond:
+            stats = self._entry(mirror)
+
+            if ok:
+                stats["ok"] += 1
+                stats["failures"] = 0
+                stats["bytes"] += size
+                if size and seconds > 0:
+                    stats["rate"] = self._average(stats["rate"], size / seconds)
+            else:
+                stats["failed"] += 1
+                stats["failures"] += 1
+
+            self._check(mirror)
+
+    def release(self, mirror):
+        """
+        Frees the slot taken with ``acquire``.
+
+        :param mirror: The mirror.
+
+        :returns: None.
+
+        """
+        with self._cond:
+            self._entry(mirror)["active"] -= 1
+            self._cond.notify_all()
+
+    def snapshot(self):
+        """
+        Gets a copy of the stats of every mirror seen so far.
+
+        :returns: A ``dict`` of mirrors, and their stats.
+
+        """
+        with self._cond:
+            return dict((k, dict(v)) for k, v in self._stats.items())
+
+#===============================================================================
+# FTPPool Class
+#===============================================================================
+
+class FTPPool(object):
+    """
+    A pool of logged in FTP sessions, for each FTP server, so that downloads 
+    don't have to connect, and log in, for every file. Sessions that have 
+    dropped are replaced with new ones. Safe to share between threads.
+
+    """
+
+    def __init__(
+            self, size=FTP_POOL_SIZE, timeout=TIMEOUT_READ,
+            check_after=FTP_CHECK_AFTER
+        ):
+        """
+        The init method for the FTPPool class.
+
+        :param size: The most sessions to open to each server.
+        :param timeout: The timeout for FTP commands, in seconds.
+        :param check_after: How long, in seconds, a session can sit unused, 
+        before it's checked to still be alive, before being used again.
+
+        """
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+
+        self._idle = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, server):
+        """
+        Opens a new session to the given server, and logs in anonymously.
+
+        :param server: The FTP server address, optionally with a port.
+
+        :returns: The logged in session.
+
+        """
+        host, port = _mirror_address(server)
+
+        connection = _PooledFTP()
+        connection.connect(host, port, self.timeout)
+        try:
+            connection.login()
+            connection.home = connection.pwd()
+        except:
+            connection.close()
+            raise
+
+        return connection
+
+    def _slot(self, server):
+        """
+        Gets the semaphore that limits the sessions to the given server.
+
+        :param server: The FTP server address.
+
+        :returns: The semaphore.
+
+        """
+        with self._lock:
+            if server not in self._slots:
+                self._slots[server] = threading.BoundedSemaphore(self.size)
+                self._idle[server] = []
+            return self._slots[server]
+
+    def acquire(self, server):
+        """
+        Gets a logged in session to the given server, waiting if all of the 
+        server's sessions are in use.
+
+        :param server: The FTP server address, optionally with a port.
+
+        :returns: The session. Must be handed back with ``release``.
+
+        """
+        self._slot(server).acquire()
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle[server]:
+                        break
+                    connection = self._idle[server].pop()
+
+                if time.time() - connection.last_used < self.check_after:
+                    return connection
+                try:
+                    connection.voidcmd("NOOP")
+                    return connection
+                except ftplib.all_errors:
+                    connection.close()
+
+            return self._connect(server)
+        except:
+            self._slot(server).release()
+            raise
+
+    def close(self):
+        """
+        Logs out of, and closes, every idle session.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            idle = [x for sessions in self._idle.values() for x in sessions]
+            for sessions in self._idle.values():
+                del sessions[:]
+
+        for connection in idle:
+            try:
+                connection.quit()
+            except ftplib.all_errors:
+                connection.close()
+
+    def release(self, server, connection, broken=False):
+        """
+        Hands a session back to the pool.
+
+        :param server: The FTP server address the session is connected to.
+        :param connection: The session.
+        :param broken: Whether the session failed, and should be closed, 
+        rather than reused.
+
+        :returns: None.
+
+        """
+        if broken:
+            connection.close()
+        else:
+            connection.last_used = time.time()
+            with self._lock:
+                self._idle[server].append(connection)
+
+        self._slot(server).release()
+
+class _PooledFTP(ftplib.FTP):
+    """An FTP session, that remembers its home directory, and last use."""
+
+    home = "/"
+    last_used = 0.0
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def is_ftp(mirror):
+    """
+    Checks whether the given mirror is an FTP server.
+
+    :param mirror: The mirror.
+
+    :returns: ``True`` if the mirror is an FTP server address.
+
+    """
+    return "://" not in mirror
+
+def _split_timeout(timeout):
+    """
+    Splits a timeout into its connect, and read, timeouts.
+
+    :param timeout: Either a single number, or a (connect, read) tuple.
+
+    :returns: A (connect, read) tuple.
+
+    """
+    if type(timeout) in (tuple, list):
+        return tuple(timeout)
+
+    return timeout, timeout
+
+def _mirror_address(mirror):
+    """
+    Gets the host and port to connect to, for the given mirror.
+
+    :param mirror: Either an HTTP mirror url, or an FTP server address, 
+    optionally with a port (``host:port``).
+
+    :returns: A (host, port) tuple.
+
+    """
+    if is_ftp(mirror):
+        host, _, port = mirror.partition(":")
+        return host, int(port or 21)
+
+    parsed = urlparse.urlparse(mirror)
+
+    if parsed.port:
+        return parsed.hostname, parsed.port
+    if parsed.scheme == "https":
+        return parsed.hostname, 443
+    return parsed.hostname, 80
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
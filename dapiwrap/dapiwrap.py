@@ -30,40 +30,65 @@ their server. Be cool.
 This package requires the ``requests`` package:
 http://docs.python-requests.org/en/latest/
 
+If ``orjson`` or ``ujson`` is installed, it's used to decode the responses, 
+instead of the ``json`` module, since they're much faster.
+
 """
 
 #===============================================================================
 # Imports
 #===============================================================================
 
+import json
 import requests
+from multiprocessing.pool import ThreadPool
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 from dapiwconst import (
     A_ABOUT,
     A_DBPING,
-    A_GET_ID,
     A_GET_FILE,
+    A_GET_ID,
     A_GETCONTENTS_ID,
     A_GETCONTENTS_NAME,
     A_GETDIRS_ID,
     A_GETDIRS_NAME,
     A_GETFILES_ID,
     A_GETFILES_NAME,
-    A_LATESTVOTES,
     A_LATESTFILES,
-    A_PARENTDIR_ID,
+    A_LATESTVOTES,
+    A_OUT_JSON,
     A_PARENTDIR_FILE,
+    A_PARENTDIR_ID,
     A_PING,
     A_SEARCH,
-    A_SEARCH_QUERY,
     A_SEARCH_DIRECT,
+    A_SEARCH_QUERY,
     A_SEARCH_SORT,
     A_SEARCH_TYPE,
-    A_OUT_JSON,
     API_URL,
+    CONCURRENCY,
     DIRECT_ASC,
     DIRECT_DESC,
+    GAMES,
+    LVLS,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    SEARCH_LIMIT,
     SORT_DATE,
+    SORTS,
+    TIMEOUT_CONNECT,
+    TIMEOUT_READ,
     TYPE_AUTHOR,
     TYPE_CREDITS,
     TYPE_DESCRIP,
@@ -71,9 +96,13 @@ from dapiwconst import (
     TYPE_EMAIL,
     TYPE_FILE,
     TYPE_TEXT,
-    TYPE_TITLE,
+    TYPE_TITLE
 )
 
+from dapiwindex import SearchIndex
+from dapiwnet import RateLimiter, SingleFlight
+from dapiwrecord import compact_records
+
 from dapiwtools import (
     Downwad,
     IOFuncs,
@@ -81,6 +110,26 @@ from dapiwtools import (
     SearchFilter
 )
 
+#===============================================================================
+# JSON Decoders
+#===============================================================================
+
+# The JSON decoders that are installed, by name, and the fastest of them.
+DECODERS = {"json": json.loads}
+
+if ujson is not None:
+    try:
+        # Older versions of ujson lose float precision, unless asked not to.
+        ujson.loads("0.1", precise_float=True)
+        DECODERS["ujson"] = lambda body: ujson.loads(body, precise_float=True)
+    except TypeError:
+        DECODERS["ujson"] = ujson.loads
+
+if orjson is not None:
+    DECODERS["orjson"] = orjson.loads
+
+DECODER = DECODERS.get("orjson") or DECODERS.get("ujson") or json.loads
+
 #===============================================================================
 # DAPIWrap Class
 #===============================================================================
@@ -98,14 +147,71 @@ class DAPIWrap(object):
         A_LATESTFILES, A_LATESTVOTES, A_PARENTDIR_FILE
     ]
 
-    def __init__(self, dl_folder=None):
+    def __init__(
+            self, dl_folder=None, pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE, pool_block=False, keep_alive=True,
+            timeout=(TIMEOUT_CONNECT, TIMEOUT_READ), limiter=None,
+            cache=None, decoder=None, compact=False, single_flight=True,
+            api_url=API_URL
+        ):
         """
         The DAPIWrap init method.
 
         :param dl_folder: The location to download files to.
+        :param pool_connections: The number of hosts to keep connection 
+        pools for.
+        :param pool_maxsize: The maximum number of connections to keep open 
+        to each host.
+        :param pool_block: Whether to wait for a free connection when a 
+        host's pool is in use, instead of opening an extra one.
+        :param keep_alive: Whether to keep connections open between requests.
+        :param timeout: The timeout for each request, in seconds. Either a 
+        single number, or a (connect, read) tuple.
+        :param limiter: Optional. The ``RateLimiter``, from ``dapiwnet``, to 
+        use for API calls and downloads. It can be shared with other 
+        instances. If none is given, one is made with the default rates.
+        :param cache: Optional. A response cache, such as a ``MemoryCache``, 
+        from ``dapiwcache``, to check before calling the API.
+        :param decoder: Optional. The JSON decoder to use for responses. 
+        Either the name of one in ``DECODERS``, or a function that takes the 
+        response body, and returns the decoded data. Defaults to the fastest 
+        one installed.
+        :param compact: Whether to return wad info as ``WadInfo`` records, 
+        from ``dapiwrecord``, instead of ``dict`` objects. They take much 
+        less memory, for big catalogs, and can be read the same way.
+        :param single_flight: Whether threads calling the API for the same 
+        url at the same time should share one request, instead of each 
+        making their own.
+        :param api_url: The url of the API, up to the action. Only needs 
+        changing to use another server, such as a fake one, from 
+        ``dapiwfake``.
 
         """
+        self.api_url = api_url
         self.dl_folder = dl_folder
+        self.timeout = timeout
+        self.cache = cache
+        self.compact = compact
+
+        if decoder is None:
+            decoder = DECODER
+        if isinstance(decoder, basestring):
+            decoder = DECODERS[decoder]
+        self.decoder = decoder
+
+        if limiter is None:
+            limiter = RateLimiter()
+        self.limiter = limiter
+
+        if single_flight:
+            self.flights = SingleFlight()
+        else:
+            self.flights = None
+
+        # Shared HTTP session, used for API calls and HTTP downloads.
+        self.session = self._make_session(
+            pool_connections, pool_maxsize, pool_block, keep_alive
+        )
 
         # DAPIWrap "tools".
         self.download = Downwad(self)
@@ -113,10 +219,46 @@ class DAPIWrap(object):
         self.io = IOFuncs()
         self.misc = MiscFuncs(self)
 
-    def about(self):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _make_session(pool_connections, pool_maxsize, pool_block, keep_alive):
+        """
+        Makes a ``requests`` session, with a connection pool of the given size.
+
+        :param pool_connections: The number of hosts to keep pools for.
+        :param pool_maxsize: The maximum number of connections per host.
+        :param pool_block: Whether to block when a host's pool is in use.
+        :param keep_alive: Whether to keep connections open between requests.
+
+        :returns: The session.
+
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+    def about(self, raw=False):
         """
         Get information about the Doomworld API.
 
+        :param raw: Whether to return the data exactly as recieved (raw), or
+        to extract the contents and return just the contents in a list.
+
         :returns: Information about the Doomworld API.
 
         """
@@ -127,28 +269,30 @@ class DAPIWrap(object):
         else:
             return about
 
-    def call(self, action, params=None):
+    def build_url(self, action, params=None):
         """
-        Calls the API, using the given action/parameters.
+        Builds the API url for the given action/parameters.
 
         :param action: An action constant from ``dapiwconst``.
         :param params: Any additional parameters for the action.
 
-        :returns: The Doomworld API response.
+        :returns: The url to request.
 
         """
         if action in self.A_NOPARAM:
-            url = "%s%s%s" % (API_URL, action, A_OUT_JSON)
+            url = "%s%s%s" % (self.api_url, action, A_OUT_JSON)
         elif action in self.A_SINGLEPARAM:
             url = "%s%s%s" % (
-                API_URL, action % (
+                self.api_url, action % (
                     params
                 ), A_OUT_JSON
             )
         else:
             if action == A_SEARCH:
                 if type(params) == dict:
-                    url = "%s%s" % (API_URL, A_SEARCH_QUERY % (params["query"]))
+                    url = "%s%s" % (
+                        self.api_url, A_SEARCH_QUERY % (params["query"])
+                    )
                     if "type" in params:
                         url += A_SEARCH_TYPE % (params["type"])
                     if "sort" in params:
@@ -156,13 +300,79 @@ class DAPIWrap(object):
                     if "dir" in params:
                         url += A_SEARCH_DIRECT % (params["dir"])
                 else:
-                    url = "%s%s" % (API_URL, A_SEARCH_QUERY % (params))
+                    url = "%s%s" % (self.api_url, A_SEARCH_QUERY % (params))
                 url += A_OUT_JSON
 
-        data = requests.get(url).json()
+        return url
+
+    def call(self, action, params=None, raw_bytes=False):
+        """
+        Calls the API, using the given action/parameters. If the instance has 
+        a cache, a cached response is returned instead, when there is one. 
+        If another thread is already calling the API for the same url, this 
+        waits for its response, and uses that, instead of calling it again.
+
+        :param action: An action constant from ``dapiwconst``.
+        :param params: Any additional parameters for the action.
+        :param raw_bytes: Whether to return the response body as it is, 
+        without decoding it, for storing. Responses got this way aren't 
+        added to the cache, since they aren't checked for errors.
+
+        :returns: The Doomworld API response, or its body, if ``raw_bytes`` 
+        is ``True``.
+
+        """
+        url = self.build_url(action, params)
+
+        if self.cache is not None:
+            body = self.cache.get(url, action)
+            if body is not None:
+                if raw_bytes:
+                    return body
+                return self.decoder(body)
+
+        if self.flights is not None:
+            body = self.flights.do(url, self._fetch, url)
+        else:
+            body = self._fetch(url)
+
+        if raw_bytes:
+            return body
+
+        data = self.decoder(body)
+
+        # Don't hold on to error responses.
+        if self.cache is not None and "error" not in data:
+            self.cache.set(url, body, action)
 
         return data
 
+    def close(self):
+        """
+        Closes the connections held by the session, and any idle FTP sessions.
+
+        :returns: None.
+
+        """
+        self.session.close()
+        self.download.ftp.close()
+
+    def _fetch(self, url):
+        """
+        Requests the given API url.
+
+        :param url: The url to request.
+
+        :returns: The body of the response.
+
+        """
+        self.limiter.request()
+
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+
+        return response.content
+
     def dbping(self):
         """
         Ping the database.
@@ -204,7 +414,7 @@ class DAPIWrap(object):
         wad_info = self.call(A_GET_FILE, path)
 
         if not raw and "content" in wad_info:
-            return wad_info["content"]
+            return self._record(wad_info["content"])
         else:
             return wad_info
 
@@ -221,13 +431,10 @@ class DAPIWrap(object):
         """
         files = self.call(A_GETFILES_NAME, path)
 
-        if not raw and "content" in files:
-            if type(files["content"]["file"]) == list:
-                return files["content"]["file"]
-            else:
-                return [files["content"]["file"]]
+        if raw:
+            return files
         else:
-            return []
+            return self._records(_content_list(files, "file"))
 
     def get_dirs(self, path, raw=False):
         """
@@ -261,37 +468,108 @@ class DAPIWrap(object):
         wad_info = self.call(A_GET_ID, wad_id)
 
         if not raw and "content" in wad_info:
-            return wad_info["content"]
+            return self._record(wad_info["content"])
         else:
             return wad_info
 
-    def get_id_list(self, id_list, raw=False):
+    def get_id_list(self, id_list, raw=False, workers=1, errors=None):
         """
-        Gets the info for a wad with the given ID.
+        Gets the info for the wads with the given IDs. Duplicate IDs are 
+        only fetched once, and the results are returned in the order the IDs 
+        were given in.
 
         :param id_list: A list of wad ID numbers.
         :param raw: Whether to return the data exactly as recieved (raw), or
         to extract the contents and return just the contents in a list.
+        :param workers: The number of IDs to fetch at the same time. The 
+        instance's ``limiter`` still applies.
+        :param errors: Optional. A list to append an ``(id, response)`` tuple 
+        to, for each ID that couldn't be retrieved. Failed IDs are left out 
+        of the results, unless ``raw`` is ``True``.
 
         :returns: Wad info for the given list of IDs.
 
         """
+        seen = set()
+        wad_ids = [x for x in id_list if not (x in seen or seen.add(x))]
+
+        if workers > 1 and len(wad_ids) > 1:
+            pool = ThreadPool(min(workers, len(wad_ids)))
+            try:
+                responses = pool.map(self._get_id_safe, wad_ids)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            responses = [self._get_id_safe(x) for x in wad_ids]
+
         results = []
 
-        for wad_id in id_list:
-            wad_info = self.call(A_GET_ID, wad_id)
-            if not raw and "content" in wad_info:
-                results.append(wad_info["content"])
+        for wad_id, wad_info in zip(wad_ids, responses):
+            if "content" not in wad_info:
+                if errors is not None:
+                    errors.append((wad_id, wad_info))
+                if not raw:
+                    continue
+            if raw:
+                results.append(wad_info)
             else:
-                return wad_info
+                results.append(self._record(wad_info["content"]))
 
         return results
 
-    def get_latestfiles(self, limit=10):
+    def _get_id_safe(self, wad_id):
+        """
+        Calls the API for the given wad ID, turning any exception into an 
+        error response, so one failed ID doesn't stop a batch.
+
+        :param wad_id: The ID number of a wad.
+
+        :returns: The Doomworld API response, or an error response.
+
+        """
+        try:
+            return self.call(A_GET_ID, wad_id)
+        except (requests.RequestException, ValueError) as err:
+            return {
+                "error": {"type": type(err).__name__, "message": str(err)}
+            }
+
+    def _record(self, wad_info):
+        """
+        Turns wad info into a ``WadInfo`` record, if the instance is 
+        ``compact``.
+
+        :param wad_info: The wad info, in ``dict`` form.
+
+        :returns: The wad info, as a ``WadInfo``, or as it was.
+
+        """
+        if self.compact and type(wad_info) == dict:
+            return compact_records([wad_info])[0]
+        return wad_info
+
+    def _records(self, wad_list):
+        """
+        Turns a list of wad info into ``WadInfo`` records, if the instance 
+        is ``compact``.
+
+        :param wad_list: A list of wad info, in ``dict`` form.
+
+        :returns: A list of the wad info, as ``WadInfo``, or as it was.
+
+        """
+        if self.compact:
+            return compact_records(wad_list)
+        return wad_list
+
+    def get_latestfiles(self, limit=10, raw=False):
         """
         Get the latest uploaded files.
 
         :param limit: The number of items to retrieve.
+        :param raw: Whether to return the data exactly as recieved (raw), or
+        to extract the contents and return just the contents in a list.
 
         :returns: The latest files.
 
@@ -303,11 +581,13 @@ class DAPIWrap(object):
         else:
             return latest
 
-    def get_latestvotes(self, limit=10):
+    def get_latestvotes(self, limit=10, raw=False):
         """
         Get the latest votes.
 
         :param limit: The number of items to retrieve.
+        :param raw: Whether to return the data exactly as recieved (raw), or
+        to extract the contents and return just the contents in a list.
 
         :returns: The latest votes.
 
@@ -337,6 +617,118 @@ class DAPIWrap(object):
         else:
             return parent_dir
 
+    def invalidate(self, action=None, params=None):
+        """
+        Drops a cached response, so the next call for it goes to the API.
+
+        :param action: The action constant of the response to drop. If not 
+        given, the whole cache is cleared.
+        :param params: Any additional parameters for the action.
+
+        :returns: None.
+
+        """
+        if self.cache is None:
+            return
+
+        if action is None:
+            self.cache.invalidate()
+        else:
+            self.cache.invalidate(self.build_url(action, params))
+
+    def iter_dirs(self, path, recursive=False):
+        """
+        Goes through the directories under a directory, one listing at a 
+        time, instead of getting them all first. Only the paths still to be 
+        listed are kept, however big the tree is.
+
+        :param path: The idgames path to start from.
+        :param recursive: Whether to go into the subdirectories as well.
+
+        :yields: The info of each directory, in ``dict`` form, with its 
+        ``id`` and ``name`` (the directory's path).
+
+        """
+        for _, dirs, _ in self._walk(path, recursive, False):
+            for wad_dir in dirs:
+                yield wad_dir
+
+    def iter_files(self, path, recursive=False):
+        """
+        Goes through the files in a directory, one listing at a time, 
+        instead of getting them all first. Only the paths still to be listed 
+        are kept, however big the tree is.
+
+        :param path: The idgames path to start from.
+        :param recursive: Whether to go through the subdirectories as well.
+
+        :yields: The info of each file, in ``dict`` form.
+
+        """
+        # The subdirectories are only needed to go into them.
+        for _, _, files in self._walk(path, recursive, True, recursive):
+            for wad_info in files:
+                yield wad_info
+
+    def iter_tree(self, path=None):
+        """
+        Walks the directory tree, like ``os.walk``, getting each directory's 
+        listing as it goes.
+
+        :param path: Optional. The idgames path to start from. Defaults to 
+        the levels directory of each game in ``GAMES``.
+
+        :yields: A tuple for each directory, of its path, a list of its 
+        subdirectories' info, and a list of its files' info.
+
+        """
+        if path is None:
+            paths = [LVLS % (x) for x in GAMES]
+        else:
+            paths = [path]
+
+        for root in paths:
+            for item in self._walk(root, True, True):
+                yield item
+
+    def _walk(self, path, recursive=True, files=True, dirs=True):
+        """
+        Walks the directory tree, depth first.
+
+        :param path: The idgames path to start from.
+        :param recursive: Whether to go into the subdirectories.
+        :param files: Whether to get each directory's files.
+        :param dirs: Whether to get each directory's subdirectories. They're 
+        always got when ``recursive`` is set.
+
+        :yields: A tuple for each directory, of its path, a list of its 
+        subdirectories' info, and a list of its files' info.
+
+        """
+        stack = [path]
+
+        while stack:
+            current = stack.pop()
+
+            if dirs or recursive:
+                subdirs = _content_list(
+                    self.call(A_GETDIRS_NAME, current), "dir"
+                )
+            else:
+                subdirs = []
+
+            if files:
+                listing = self._records(_content_list(
+                    self.call(A_GETFILES_NAME, current), "file"
+                ))
+            else:
+                listing = []
+
+            yield (current, subdirs, listing)
+
+            if recursive:
+                stack.extend(x["name"] for x in reversed(subdirs))
+
     def ping(self):
         """
         Ping the Doomworld server.
@@ -385,27 +777,117 @@ class DAPIWrap(object):
         results = self.call(A_SEARCH, params)
 
         if "raw" not in params and "content" in results:
-            if type(results["content"]["file"]) == list:
-                results = results["content"]["file"]
-            else:
-                results = [results["content"]["file"]]
+            results = self._records(_content_list(results, "file"))
             if "filter" in params:
-                if type(params["filter"][0]) not in (tuple, list):
-                    srchfilter = params["filter"][0]
-                    filterargs = params["filter"][1]
-                    results = self.filter.filters[srchfilter](
-                        results, filterargs
-                    )
-                else:
-                    for item in params["filter"]:
-                        srchfilter = item[0]
-                        filterargs = item[1]
-                        results = self.filter.filters[srchfilter](
-                            results, filterargs
-                        )
+                results = self.filter.chain(results, params["filter"])
             return results
         return []
 
+    def search_complete(self, query, params=None, shards=None, 
+            workers=CONCURRENCY):
+        """
+        Searches the idgames archive, getting around the limit on how many 
+        results the API returns for one search (``SEARCH_LIMIT``), by 
+        searching again with each sort key, in both directions, at once. 
+        The results of every search are merged, without duplicates.
+
+        The results are known to be complete if any one of the searches came 
+        back under the limit, or if, for any sort key, the lowest value in 
+        the descending search is lower than the highest value in the 
+        ascending one, since the two then overlap.
+
+        :param query: The search query.
+        :param params: Optional. A ``dict`` of search parameters and/or 
+        filters, the same as ``search``. The ``sort`` and ``dir`` are used 
+        to sort the merged results.
+        :param shards: Optional. If the results can't be shown to be 
+        complete, the query is also searched for with each of these 
+        strings added to the end, and to the start, to find more results. 
+        That can't show the results are complete, though.
+        :param workers: How many searches to run at once. The instance's 
+        ``limiter`` still applies.
+
+        :returns: A tuple of the list of search results, and whether they're 
+        known to be complete.
+
+        """
+        params = dict(params or {})
+        srchtype = params.get("type", TYPE_FILE)
+        srchsort = params.get("sort", SORT_DATE)
+        srchdir = params.get("dir", DIRECT_ASC)
+
+        windows = [
+            {"query": query, "type": srchtype, "sort": x, "dir": y} 
+            for x in SORTS for y in (DIRECT_ASC, DIRECT_DESC)
+        ]
+
+        responses = self._search_many(windows, workers)
+
+        complete = any(
+            x is not None and len(x) < SEARCH_LIMIT for x in responses
+        )
+
+        if not complete:
+            for i, key in enumerate(SORTS):
+                asc, desc = responses[i * 2], responses[i * 2 + 1]
+                if asc is None or desc is None:
+                    continue
+                if max(x.get(key) for x in asc) > min(x.get(key) for x in desc):
+                    complete = True
+                    break
+
+        if not complete and shards:
+            extra = [
+                {"query": x, "type": srchtype} 
+                for shard in shards 
+                for x in (query + shard, shard + query)
+            ]
+            responses += self._search_many(extra, workers)
+
+        results = {}
+        for response in responses:
+            for wad_info in response or []:
+                results.setdefault(wad_info.get("id"), wad_info)
+        results = self._records(results.values())
+
+        if "filter" in params:
+            results = self.filter.chain(results, params["filter"])
+
+        results = sorted(results, key=lambda x: (x.get(srchsort), x.get("id")))
+
+        if srchdir == DIRECT_DESC:
+            results.reverse()
+
+        return (results, complete)
+
+    def _search_many(self, searches, workers=CONCURRENCY):
+        """
+        Runs several searches at once.
+
+        :param searches: A list of search parameter ``dict`` objects, each 
+        with a ``query``.
+        :param workers: How many searches to run at once.
+
+        :returns: A list of the results of each search, in the same order, 
+        with ``None`` for any search that got an error back.
+
+        """
+        def search(params):
+            response = self.call(A_SEARCH, params)
+            if "error" in response:
+                return None
+            return _content_list(response, "file")
+
+        if workers > 1 and len(searches) > 1:
+            pool = ThreadPool(min(workers, len(searches)))
+            try:
+                return pool.map(search, searches)
+            finally:
+                pool.close()
+                pool.join()
+
+        return [search(x) for x in searches]
+
     def search_author(self, query, params={}):
         """
         Search the idgames archive for the given author, using the 
@@ -500,7 +982,8 @@ class DAPIWrap(object):
         However, if the items were retrieved using ``DAPIWrap.get_id`` or
         ``DAPIWrap.get_file_path``, then you can search those areas as well.
 
-        :param items: A list of wad info to search through.
+        :param items: A list of wad info to search through, or a 
+        ``SearchIndex`` of it, which is much faster for repeated searches.
         :param query: The search query.
         :param params: A ``dict`` of search parameters and/or filters.
 
@@ -523,12 +1006,15 @@ class DAPIWrap(object):
             srchdir = DIRECT_ASC
 
         # Search through given items, build a list of results.
-        try:
-            local_results = [
-                x for x in items if query_lower in x[srchtype].lower()
-            ]
-        except AttributeError:
-            pass
+        if isinstance(items, SearchIndex):
+            local_results = items.search(query, srchtype)
+        else:
+            try:
+                local_results = [
+                    x for x in items if query_lower in x[srchtype].lower()
+                ]
+            except AttributeError:
+                pass
 
         # Filter the results, if called for.
         if srchfilters:
@@ -577,6 +1063,33 @@ class DAPIWrap(object):
             params["type"] = TYPE_TITLE
             return self.search(query, params)
 
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+def _content_list(response, key):
+    """
+    Gets a list out of a response's content. The API sends a single item on 
+    its own, rather than in a list, so it's put in one.
+
+    :param response: The Doomworld API response.
+    :param key: The key of the list in the content, such as ``file``.
+
+    :returns: The list, or an empty list, if there's no content.
+
+    """
+    content = response.get("content")
+
+    if not content or key not in content:
+        return []
+
+    items = content[key]
+
+    if type(items) == list:
+        return items
+    else:
+        return [items]
+
 #===============================================================================
 # If Main
 #===============================================================================
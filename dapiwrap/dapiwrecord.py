@@ -0,0 +1,288 @@
+#===============================================================================
+# DAPIWRecord: Compact Wad Info Records for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+This module contains ``WadInfo``, a compact stand-in for the ``dict`` form of
+a wad's info, for keeping large catalogs in memory. It can be used anywhere
+the ``dict`` form is read from, like ``SearchFilter``, ``search_local`` and
+``MiscFuncs.make_id_list``, but takes a fraction of the memory:
+
+- The fields are kept in ``__slots__``, rather than in a ``dict`` per record.
+- Text that's all ASCII is kept as ``str``, rather than ``unicode``, which
+  takes a quarter of the space.
+- Values that many records share, like the ``dir`` and ``author``, are only
+  kept once.
+- The textfile is kept zlib compressed, and only decompressed when it's asked
+  for.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import zlib
+
+from dapiwconst import (
+    TYPE_TEXT,
+    WAD_FIELDS,
+    WAD_SHARED_FIELDS,
+    WAD_SHARED_LIMIT,
+    WAD_TEXT_LEVEL
+)
+
+#===============================================================================
+# WadInfo Class
+#===============================================================================
+
+_SLOTS = tuple(x for x in WAD_FIELDS if x != TYPE_TEXT)
+_SLOT_SET = frozenset(_SLOTS)
+_SHARED_SET = frozenset(WAD_SHARED_FIELDS)
+
+class WadInfo(object):
+    """The info of a wad, in a compact, read-mostly form."""
+
+    __slots__ = _SLOTS + ("_textfile", "_extra")
+
+    # Records are compared by their fields, like a dict, so they can't be
+    # hashed, like a dict.
+    __hash__ = None
+
+    def __init__(self, wad_info=None):
+        """
+        The WadInfo init method.
+
+        :param wad_info: Optional. The wad info, in ``dict`` form, or another
+        ``WadInfo``.
+
+        """
+        self._extra = None
+
+        if wad_info is not None:
+            for key, value in wad_info.iteritems():
+                self[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __delitem__(self, key):
+        if key == TYPE_TEXT:
+            key = "_textfile"
+
+        if key in _SLOT_SET or key == "_textfile":
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, WadInfo)):
+            return self.to_dict() == dict(other.iteritems())
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __getitem__(self, key):
+        if key in _SLOT_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+
+        if key == TYPE_TEXT:
+            try:
+                return self.textfile
+            except AttributeError:
+                raise KeyError(key)
+
+        if self._extra and key in self._extra:
+            return self._extra[key]
+
+        raise KeyError(key)
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __repr__(self):
+        return "WadInfo(%r)" % (self.to_dict())
+
+    def __setitem__(self, key, value):
+        if key == TYPE_TEXT:
+            self.textfile = value
+        elif key in _SLOT_SET:
+            setattr(self, key, _compact(key, value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = _compact(key, value)
+
+    def __setstate__(self, state):
+        self.__init__(state)
+
+    @property
+    def textfile(self):
+        """The textfile, decompressed each time it's asked for."""
+        return self._textfile and _decompress(self._textfile)
+
+    @textfile.setter
+    def textfile(self, text):
+        self._textfile = text and _compress(text)
+
+    def get(self, key, default=None):
+        """
+        Gets a field, like ``dict.get``.
+
+        :param key: The field.
+        :param default: What to return if the record doesn't have the field.
+
+        :returns: The field's value, or ``default``.
+
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        """Gets a list of ``(field, value)`` tuples, like ``dict.items``."""
+        return list(self.iteritems())
+
+    def iteritems(self):
+        """Goes through the ``(field, value)`` tuples, like the dict method."""
+        for key in self.keys():
+            yield (key, self[key])
+
+    def keys(self):
+        """
+        Gets the fields the record has, like ``dict.keys``.
+
+        :returns: A list of the fields.
+
+        """
+        keys = [x for x in _SLOTS if hasattr(self, x)]
+
+        if hasattr(self, "_textfile"):
+            keys.append(TYPE_TEXT)
+        if self._extra:
+            keys.extend(self._extra)
+
+        return keys
+
+    def to_dict(self):
+        """
+        Gets the record in ``dict`` form, such as for saving it as JSON.
+
+        :returns: The wad info, in ``dict`` form.
+
+        """
+        return dict(self.iteritems())
+
+    def values(self):
+        """Gets a list of the values of the fields, like ``dict.values``."""
+        return [self[x] for x in self.keys()]
+
+#===============================================================================
+# Other Bits & Pieces
+#===============================================================================
+
+# The values of the shared fields, each kept once. Like intern, but for
+# unicode too, and limited to WAD_SHARED_LIMIT values, like the re module's
+# cache, so a long running process doesn't keep every value it's ever seen.
+_shared = {}
+
+def compact_records(records):
+    """
+    Turns a list of wad info into ``WadInfo`` records.
+
+    :param records: An iterable of wad info, in ``dict`` form.
+
+    :returns: A list of ``WadInfo``.
+
+    """
+    return [x if isinstance(x, WadInfo) else WadInfo(x) for x in records]
+
+def _compact(key, value):
+    """
+    Gets the most compact form of a field's value.
+
+    :param key: The field.
+    :param value: The value.
+
+    :returns: The value, as ``str`` if it's ASCII ``unicode``, and shared
+    with other records, if it's one of the shared fields.
+
+    """
+    if type(value) == unicode:
+        try:
+            value = value.encode("ascii")
+        except UnicodeEncodeError:
+            pass
+
+    if key in _SHARED_SET and isinstance(value, basestring):
+        if len(_shared) >= WAD_SHARED_LIMIT:
+            _shared.clear()
+        value = _shared.setdefault(value, value)
+
+    return value
+
+def _compress(text):
+    """
+    Compresses a textfile.
+
+    :param text: The text, ``str`` or ``unicode``.
+
+    :returns: A tuple of the compressed text, and whether it was ``unicode``.
+
+    """
+    if type(text) == unicode:
+        return (zlib.compress(text.encode("utf-8"), WAD_TEXT_LEVEL), True)
+
+    return (zlib.compress(text, WAD_TEXT_LEVEL), False)
+
+def _decompress(packed):
+    """
+    Decompresses a textfile.
+
+    :param packed: A tuple from ``_compress``.
+
+    :returns: The text.
+
+    """
+    data, is_unicode = packed
+    text = zlib.decompress(data)
+
+    if is_unicode:
+        return _compact(TYPE_TEXT, text.decode("utf-8"))
+
+    return text
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    print "You're doing it wrong."
@@ -18,28 +18,38 @@ download interface.
 # Imports
 #===============================================================================
 
+import ctypes
 import ftplib
 import gzip
+import hashlib
+import io
+import itertools
 import json
+import math
 import os
+import posixpath
 import random
-import requests
+import sys
+import threading
 import time
 import webbrowser
 
+from multiprocessing.pool import ThreadPool
+
 from dapiwconst import (
+    CHUNK_MAX,
+    CHUNK_MIN,
+    CHUNK_TIME,
     DL_FLORIDA,
     DL_FTP,
+    DL_HTTP,
     DL_FTP_GERMANY,
-    DL_FTP_GREECE,
-    DL_FTP_TEXAS,
     DOOM,
     DOOM2,
-    FTP_DIR_GERMANY,
-    FTP_DIR_GREECE,
-    FTP_DIR_TEXAS,
+    FTP_DIRS,
     FILTER_DATE,
     FILTER_GAME,
+    FILTER_GYR,
     FILTER_RATING,
     FILTER_SIZE,
     FILTER_VOTES,
@@ -55,7 +65,15 @@ from dapiwconst import (
     LVLS_PR,
     LVLS_SU,
     LVLS_VZ,
-    LVLS_ALL
+    LVLS_ALL,
+    MANIFEST_FIELDS,
+    PART_EXT
+)
+
+from dapiwnet import (
+    FTPPool,
+    MirrorMonitor,
+    is_ftp
 )
 
 #===============================================================================
@@ -63,7 +81,12 @@ from dapiwconst import (
 #===============================================================================
 
 class SearchFilter(object):
-    """Contains methods for filtering search results."""
+    """
+    Contains methods for filtering search results. A filter, or a chain of 
+    filters, is compiled into one test, which each result is run through 
+    once.
+
+    """
 
     def __init__(self):
         """The init method for the SearchFilter class."""
@@ -71,29 +94,129 @@ class SearchFilter(object):
         self.filters = {
             FILTER_DATE: self.date,
             FILTER_GAME: self.game,
+            FILTER_GYR: self.gyr,
             FILTER_RATING: self.rating,
             FILTER_SIZE: self.size,
             FILTER_VOTES: self.votes,
             FILTER_YEAR: self.year
         }
 
+    @staticmethod
+    def bounds(name, value):
+        """
+        Works out the range of values a year, rating, size, or votes filter 
+        lets through, as whole numbers. Years are compared as numbers, 
+        ratings in tenths (truncated, not rounded), sizes in kb (1000 
+        bytes), and votes as they are. Year and rating ranges include both 
+        ends, and size and votes ranges include the low end only.
+
+        :param name: The filter name, one of ``FILTER_YEAR``, 
+        ``FILTER_RATING``, ``FILTER_SIZE`` or ``FILTER_VOTES``.
+        :param value: The filter's value, or range of values, low to high, in 
+        a tuple/list.
+
+        :returns: A tuple of the lowest and highest values let through.
+
+        """
+        if type(value) in (tuple, list):
+            low, high = value
+        else:
+            low = high = value
+
+        if name == FILTER_RATING:
+            return (int(round(low * 10)), int(round(high * 10)))
+
+        if type(value) in (tuple, list) and name in (FILTER_SIZE, FILTER_VOTES):
+            return (int(low), int(high) - 1)
+
+        return (int(low), int(high))
+
+    @staticmethod
+    def specs(filters):
+        """
+        Splits a filter, or a chain of filters, into a list of filters. 
+        ``FILTER_GYR`` filters are split into their game, year, and rating 
+        filters.
+
+        :param filters: A filter and its value, in a tuple/list, or a 
+        tuple/list of them.
+
+        :returns: A list of ``(filter, value)`` tuples.
+
+        """
+        if type(filters[0]) in (tuple, list):
+            filters = [tuple(x) for x in filters]
+        else:
+            filters = [tuple(filters)]
+
+        specs = []
+
+        for name, value in filters:
+            if name == FILTER_GYR:
+                game, year, rating = value
+                specs.extend([
+                    (FILTER_GAME, game), 
+                    (FILTER_YEAR, year), 
+                    (FILTER_RATING, rating)
+                ])
+            else:
+                specs.append((name, value))
+
+        return specs
+
+    def compile(self, filters):
+        """
+        Compiles a filter, or a chain of filters, into a single test. Ranges 
+        become a pair of comparisons, rather than a list to look values up 
+        in.
+
+        :param filters: A filter and its value, in a tuple/list, or a 
+        tuple/list of them.
+
+        :returns: A function that takes a result, and returns ``True`` if it 
+        passes every filter.
+
+        """
+        tests = [_compile_filter(x, y) for x, y in self.specs(filters)]
+
+        if len(tests) == 1:
+            return tests[0]
+
+        def match(result):
+            for test in tests:
+                if not test(result):
+                    return False
+            return True
+
+        return match
+
     def chain(self, results, filters):
         """
         Filter given results using given chain of filters & parameters.
 
         :param results: The results to filter.
-        :param filters: A tuple/list of filters to apply to the results.
+        :param filters: A filter and its value, in a tuple/list, or a 
+        tuple/list of them, to apply to the results.
 
         :returns: The filtered results.
 
         """
-        if filters in (tuple, list):
-            for _filter in filters:
-                results = self.filters[_filter[0]](results, _filter[1])
-        else:
-            results = self.filters[filters[0]](results, filters[1])
+        match = self.compile(filters)
+
+        return [x for x in results if match(x)]
+
+    def ichain(self, results, filters):
+        """
+        Same as ``chain``, but filters the results as they're iterated over.
+
+        :param results: An iterable of results to filter.
+        :param filters: A filter and its value, in a tuple/list, or a 
+        tuple/list of them, to apply to the results.
 
-        return results
+        :returns: An iterator of the filtered results.
+
+        """
+        return itertools.ifilter(self.compile(filters), results)
 
     def date(self, results, date="yyyy-mm-dd"):
         """
@@ -105,7 +228,7 @@ class SearchFilter(object):
         :returns: The filtered results.
 
         """
-        return [x for x in results if x["date"] == date]
+        return self.chain(results, (FILTER_DATE, date))
 
     def year(self, results, year=1994):
         """
@@ -118,16 +241,7 @@ class SearchFilter(object):
         :returns: The filtered results.
 
         """
-        year_type = type(year)
-
-        if year_type in (tuple, list):
-            y_range = list(xrange(year[0], (year[1] + 1), 1))
-        else:
-            y_range = [year]
-
-        y_range = [str(x) for x in y_range]
-
-        return [x for x in results if x["date"][0:4] in y_range]
+        return self.chain(results, (FILTER_YEAR, year))
 
     def gyr(self, results, game=DOOM, year=1994, rating=5.0):
         """
@@ -143,9 +257,11 @@ class SearchFilter(object):
         """
         return self.chain(
             results, 
-            (FILTER_GAME, game), 
-            (FILTER_YEAR, year),
-            (FILTER_RATING, rating)
+            (
+                (FILTER_GAME, game), 
+                (FILTER_YEAR, year),
+                (FILTER_RATING, rating)
+            )
         )
 
     def game(self, results, game=DOOM):
@@ -157,13 +273,11 @@ class SearchFilter(object):
         :returns: The filtered results.
 
         """
-        game_path = "%s/" % (game)
-
-        return [x for x in results if game_path in x["dir"]]
+        return self.chain(results, (FILTER_GAME, game))
 
     def rating(self, results, rating=5.0):
         """
-        Filter the given results by rating.
+        Filter the given results by rating, truncated to one decimal place.
 
         :param rating: The rating to filter the results by. Can be a range,
         low to high, in a tuple/list.
@@ -171,58 +285,31 @@ class SearchFilter(object):
         :returns: The filtered results.
 
         """
-        rating_type = type(rating)
-
-        if rating_type in (tuple, list):
-            r_range = list(_frange(rating[0], rating[1], 0.1))
-        else:
-            r_range = [rating]
-
-        return [
-            x for x in results if _trunc_rating(x["rating"]) in r_range
-        ]
+        return self.chain(results, (FILTER_RATING, rating))
 
     def size(self, results, size=1000):
         """
         Filter the given results by file size.
 
-        :param size: The size to filter the results by. Must be at least 1000
-        (1kb). Can be a range, low to high, in a tuple/list.
+        :param size: The size to filter the results by, in kb. Can be a range, 
+        low to high, in a tuple/list.
 
         :returns: The filtered results.
 
         """
-        size_type = type(size)
-
-        if size_type in (tuple, list):
-            s_range = list(xrange(size[0], size[1], 1))
-        else:
-            s_range = [size]
-
-        return [
-            x for x in results if (x["size"] / 1000) in s_range
-        ]
+        return self.chain(results, (FILTER_SIZE, size))
 
     def votes(self, results, votes=1):
         """
         Filter the given results by number of votes.
 
         :param votes: The number of  votes to filter the results by. Can be a 
-        range, ow to high, in a tuple/list.
+        range, low to high, in a tuple/list.
 
         :returns: The filtered results.
 
         """
-        votes_type = type(votes)
-
-        if votes_type in (tuple, list):
-            v_range = list(xrange(votes[0], votes[1], 1))
-        else:
-            v_range = [votes]
-
-        return [
-            x for x in results if x["votes"] in v_range
-        ]
+        return self.chain(results, (FILTER_VOTES, votes))
 
 #===============================================================================
 # Downwad Class
@@ -234,8 +321,6 @@ class Downwad(object):
     on the Doomworld /idgames archive.
 
     """
-    # Don't set `DL_DELAY` much lower. Don't want to hammer the server.
-    DL_DELAY = 5
 
     def __init__(self, daw):
         """
@@ -247,25 +332,50 @@ class Downwad(object):
         """
         self.daw = daw
         self.last_server = None
+        self.last_report = None
+
+        # Whether to size .part files up front, when the size is known, so 
+        # the file system can lay them out in one piece.
+        self.preallocate = True
+        self._transfers = threading.local()
+
+        # A Manifest of the files already downloaded, to skip them when 
+        # they haven't changed. None downloads everything.
+        self.manifest = None
+
+        # The servers to pick from, when none is given, and how each of them 
+        # has been performing.
+        self.servers = DL_HTTP + DL_FTP
+
+        # The idgames path on each FTP server, and their pooled sessions. 
+        # The mirror monitor shares the paths, to probe the right place.
+        self.ftp_dirs = dict(FTP_DIRS)
+        self.ftp = FTPPool()
+        self.mirrors = MirrorMonitor(
+            daw.session, daw.timeout, ftp_dirs=self.ftp_dirs
+        )
 
     def download(
-            self, filename, file_dir, dl_folder=None, 
-            server=DL_FTP_GERMANY, newdir=True
+            self, filename, file_dir, dl_folder=None, server=None, 
+            newdir=True, size=None
         ):
         """
         Downloads a wad with the given filename from the given /idgames 
         directory. If `server` is an FTP server address, `download` will
-        call `download_ftp`, with the given arguments, instead.
+        call `ftp_download`, with the given arguments, instead. Otherwise, it 
+        calls `http_download`.
 
         :param filename: The filename of the file to download.
         :param file_dir: The /idgames path of the file.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. If not given, the best 
+        of ``Downwad.servers`` is picked, by ``Downwad.mirrors``.
         :param newdir: Whether to make a new subdirectory for the wad, using 
         the wad's filename.
+        :param size: Optional. The expected size of the file, in bytes. The 
+        file is only moved into place if it matches.
 
-        :returns: The file object, or if FTP is used, the final status of 
-        the download.
+        :returns: The closed file object.
 
         """
         if not dl_folder:
@@ -274,56 +384,143 @@ class Downwad(object):
             else:
                 return
 
-        if server not in DL_FTP:
+        if server is None:
+            server = self.mirrors.best(self.servers)
 
-            dl_url = "%s%s%s%s" % (server, IDGAMES, file_dir, filename)
+        self.last_server = server
+        self._transfers.last = None
 
-            wad_zip = requests.get(dl_url, stream=True)
+        try:
+            if not is_ftp(server):
+                wad_file = self.http_download(
+                    filename, file_dir, dl_folder, server, newdir, size
+                )
+            else:
+                wad_file = self.ftp_download(
+                    filename, file_dir, dl_folder, server, newdir, size
+                )
+        except Exception:
+            self.mirrors.record(server, ok=False)
+            raise
+
+        if wad_file is not None:
+            transfer = self.last_transfer or {}
+            self.mirrors.record(
+                server, transfer.get("bytes", 0), transfer.get("seconds", 0.0)
+            )
 
-            if newdir:
-                if not os.path.exists(dl_folder):
-                    os.makedirs(dl_folder)
+        return wad_file
 
-            save_loc = dl_folder + filename
+    def _fetch_wad(
+            self, wad_info, dl_folder=None, server=None, newdir=True, 
+            check=True
+        ):
+        """
+        Downloads a wad, using its wad info. If there's a manifest, the 
+        download is skipped when the file is already there, and unchanged, 
+        and the file is checked against the wad info's md5, and added to the 
+        manifest, once downloaded.
 
-            with open(save_loc, "wb") as wad_file:
-                for chunk in wad_zip.iter_content(chunk_size=1024): 
-                    if chunk:
-                        wad_file.write(chunk)
-            return wad_file
-        else:
-            return self.ftp_download(
-                filename, file_dir, dl_folder, server, newdir
-            )
+        :param wad_info: The wad info, in dict (JSON) form.
+        :param dl_folder: Where to download the file to.
+        :param server: Which server to download from.
+        :param newdir: Whether to make a new subdirectory for the wad.
+        :param check: Whether to check the manifest before downloading.
+
+        :returns: The closed file object.
+
+        """
+        if check:
+            save_loc = self._unchanged(wad_info, dl_folder)
+            if save_loc:
+                self._transfers.last = None
+                with open(save_loc, "rb") as wad_file:
+                    pass
+                return wad_file
+
+        wad_file = self.download(
+            wad_info["filename"], wad_info["dir"], dl_folder, server, newdir,
+            wad_info.get("size")
+        )
+
+        if wad_file is not None and self.manifest is not None:
+            md5 = wad_info.get("md5")
+            if md5 and _file_md5(wad_file.name) != md5:
+                os.remove(wad_file.name)
+                raise IOError(
+                    "The md5 of %s doesn't match its wad info." % (
+                        wad_file.name
+                    )
+                )
+            self.manifest.add(wad_info, wad_file.name)
+
+        return wad_file
+
+    def _unchanged(self, wad_info, dl_folder=None):
+        """
+        Checks whether a wad has already been downloaded, and hasn't changed 
+        since, going by ``Downwad.manifest``. A file that's there, but isn't 
+        in the manifest, is hashed, and added to it, if it matches the wad 
+        info's md5.
+
+        :param wad_info: The wad info, in dict (JSON) form.
+        :param dl_folder: Where the file would be downloaded to.
+
+        :returns: The location of the file, if it can be skipped, otherwise 
+        ``None``.
+
+        """
+        manifest = self.manifest
+        dl_folder = dl_folder or self.daw.dl_folder
+
+        if manifest is None or not dl_folder:
+            return
+
+        save_loc = dl_folder + wad_info["filename"]
+
+        if manifest.is_current(wad_info, save_loc):
+            return save_loc
+
+        if manifest.get(wad_info["dir"], wad_info["filename"]) is None:
+            md5 = wad_info.get("md5")
+            size = wad_info.get("size")
+            if (
+                md5 and os.path.exists(save_loc) and 
+                (size is None or os.path.getsize(save_loc) == size) and 
+                _file_md5(save_loc) == md5
+            ):
+                manifest.add(wad_info, save_loc)
+                return save_loc
 
     def ftp_download(
             self, filename, file_dir, dl_folder=None, 
-            server=DL_FTP_GERMANY, newdir=True
+            server=DL_FTP_GERMANY, newdir=True, size=None
         ):
         """        
         Downloads a wad with the given filename from the given /idgames 
-        directory, from a given FTP server.
+        directory, from a given FTP server. The file is downloaded to a 
+        ``.part`` file first, and if one is already there, from an earlier 
+        download that didn't finish, the download carries on from the end of 
+        it. Sessions are taken from, and handed back to, ``Downwad.ftp``, so 
+        they can be reused for the next file.
 
         :param filename: The filename of the file to download.
         :param file_dir: The /idgames path of the file.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Must be in 
+        ``Downwad.ftp_dirs``.
         :param newdir: Whether to make a new subdirectory for the wad, using 
         the wad's filename.
+        :param size: Optional. The expected size of the file, in bytes, to 
+        check the download against.
 
-        :returns: The final status of the download.
+        :returns: The closed file object, or ``None`` if the server is 
+        unknown.
 
         """
-        connection = ftplib.FTP(server)
-        connection.login() 
+        ftp_dir = self.ftp_dirs.get(server)
 
-        if server == DL_FTP_GERMANY:
-            connection.cwd(FTP_DIR_GERMANY + file_dir)
-        elif server == DL_FTP_GREECE:
-            connection.cwd(FTP_DIR_GREECE + file_dir)
-        elif server == DL_FTP_TEXAS:
-            connection.cwd(FTP_DIR_TEXAS + file_dir)
-        else:
+        if ftp_dir is None:
             return
 
         if newdir:
@@ -331,17 +528,217 @@ class Downwad(object):
                 os.makedirs(dl_folder)
 
         save_loc = dl_folder + filename
+        part_loc = save_loc + PART_EXT
 
-        with open(save_loc, 'wb') as wad_file:
-            status = connection.retrbinary(
-                "RETR %s" % (filename), wad_file.write
+        if size and _part_offset(part_loc, size) == size:
+            return _finish_part(part_loc, save_loc, size)
+
+        limiter = self.daw.limiter
+        limiter.request()
+
+        # A pooled session may have been dropped by the server, without it 
+        # showing until it's used, so try once more on a fresh one.
+        for attempt in (1, 2):
+            connection = self.ftp.acquire(server)
+            try:
+                connection.cwd(
+                    posixpath.join(connection.home, ftp_dir + file_dir)
+                )
+                self._ftp_retrieve(
+                    connection, filename, part_loc, size, limiter
+                )
+            except ftplib.error_perm:
+                self.ftp.release(server, connection)
+                raise
+            except ftplib.all_errors:
+                self.ftp.release(server, connection, broken=True)
+                if attempt == 2:
+                    raise
+            else:
+                self.ftp.release(server, connection)
+                break
+
+        return _finish_part(part_loc, save_loc, size)
+
+    def _ftp_retrieve(self, connection, filename, part_loc, size, limiter):
+        """
+        Retrieves a file over the given FTP session, into its ``.part`` file, 
+        resuming from the end of the ``.part`` file, if there is one.
+
+        :param connection: The FTP session, in the file's directory.
+        :param filename: The filename of the file to download.
+        :param part_loc: The location of the ``.part`` file.
+        :param size: Optional. The expected size of the file, in bytes.
+        :param limiter: The rate limiter to account the bytes with.
+
+        :returns: None.
+
+        """
+        def retrieve(offset):
+            # This is retrbinary, with reads sized to the transfer rate, 
+            # rather than a fixed blocksize.
+            connection.voidcmd("TYPE I")
+            data_conn = connection.transfercmd(
+                "RETR %s" % (filename), offset or None
             )
-            connection.quit()
+            try:
+                self._stream(data_conn.recv, part_loc, offset, size, limiter)
+            finally:
+                data_conn.close()
+            connection.voidresp()
+
+        offset = _part_offset(part_loc, size)
+
+        try:
+            retrieve(offset)
+        except ftplib.error_perm:
+            # The server doesn't support resuming, so start over.
+            if not offset:
+                raise
+            retrieve(0)
+
+    @property
+    def last_transfer(self):
+        """
+        The stats of the last transfer made by the calling thread, as a dict 
+        with ``bytes``, ``seconds``, and ``rate``, in bytes per second. 
+        ``None`` if the last download didn't transfer anything.
 
-        return wad_file
+        """
+        return getattr(self._transfers, "last", None)
+
+    def _stream(self, read, part_loc, offset, size, limiter):
+        """
+        Copies a download into its ``.part`` file. Each read is written 
+        straight to the file, and the reads grow or shrink to take about 
+        ``CHUNK_TIME`` seconds each, at the rate the transfer is going. If the 
+        size is known, the ``.part`` file is sized up front, and then cut back 
+        to what was actually written, once the transfer ends.
+
+        :param read: A function that takes a number of bytes, and returns up to 
+        that many bytes of the download, or nothing once it's done.
+        :param part_loc: The location of the ``.part`` file.
+        :param offset: The offset to write the download from. Anything in the 
+        ``.part`` file past this is overwritten.
+        :param size: Optional. The expected size of the file, in bytes.
+        :param limiter: The rate limiter to account the bytes with.
+
+        :returns: The number of bytes transferred.
+
+        """
+        chunk = CHUNK_MIN
+        total = 0
+
+        part_file = open(part_loc, "r+b" if offset else "wb")
+        start = time.time()
+
+        try:
+            if self.preallocate and size and size > offset:
+                part_file.truncate(size)
+            part_file.seek(offset)
+
+            while True:
+                data = read(chunk)
+                if not data:
+                    break
+
+                part_file.write(data)
+                total += len(data)
+                limiter.transfer(len(data))
+
+                elapsed = time.time() - start
+                if elapsed > 0:
+                    chunk = int(total / elapsed * CHUNK_TIME)
+                    chunk = min(CHUNK_MAX, max(CHUNK_MIN, chunk))
+        finally:
+            # Drop anything past what was written, so the next download 
+            # resumes from the right place.
+            part_file.truncate(offset + total)
+            part_file.close()
+
+            seconds = time.time() - start
+            self._transfers.last = {
+                "bytes": total,
+                "seconds": seconds,
+                "rate": total / seconds if seconds > 0 else 0.0
+            }
+
+        return total
+
+    def http_download(
+            self, filename, file_dir, dl_folder=None, server=DL_FLORIDA, 
+            newdir=True, size=None
+        ):
+        """
+        Downloads a wad with the given filename from the given /idgames 
+        directory, from a given HTTP server. The file is downloaded to a 
+        ``.part`` file first, and if one is already there, from an earlier 
+        download that didn't finish, the download carries on from the end of 
+        it.
+
+        :param filename: The filename of the file to download.
+        :param file_dir: The /idgames path of the file.
+        :param dl_folder: Where to download the file to.
+        :param server: Which server to download from.
+        :param newdir: Whether to make a new subdirectory for the wad, using 
+        the wad's filename.
+        :param size: Optional. The expected size of the file, in bytes, to 
+        check the download against.
+
+        :returns: The closed file object.
+
+        """
+        dl_url = "%s%s%s%s" % (server, IDGAMES, file_dir, filename)
+
+        if newdir:
+            if not os.path.exists(dl_folder):
+                os.makedirs(dl_folder)
+
+        save_loc = dl_folder + filename
+        part_loc = save_loc + PART_EXT
+        offset = _part_offset(part_loc, size)
+
+        if offset and offset == size:
+            return _finish_part(part_loc, save_loc, size)
+
+        headers = {}
+        if offset:
+            headers["Range"] = "bytes=%d-" % (offset)
+
+        self.daw.limiter.request()
+
+        wad_zip = self.daw.session.get(
+            dl_url, headers=headers, stream=True, timeout=self.daw.timeout
+        )
+
+        # The .part file is already complete, or is bad. Start over.
+        if wad_zip.status_code == 416:
+            wad_zip.close()
+            os.remove(part_loc)
+            return self.http_download(
+                filename, file_dir, dl_folder, server, newdir, size
+            )
+
+        wad_zip.raise_for_status()
+
+        # Only carry on from the offset if the server actually sent just the 
+        # rest of the file.
+        if wad_zip.status_code != 206:
+            offset = 0
+
+        def read(amount):
+            return wad_zip.raw.read(amount, decode_content=True)
+
+        try:
+            self._stream(read, part_loc, offset, size, self.daw.limiter)
+        finally:
+            # Hand the connection back to the session's pool.
+            wad_zip.close()
+
+        return _finish_part(part_loc, save_loc, size)
 
     def wad_id(
-            self, wad_id, dl_folder=None, server=DL_FTP_GERMANY, 
+            self, wad_id, dl_folder=None, server=None, 
             newdir=True
         ):
         """
@@ -349,7 +746,8 @@ class Downwad(object):
 
         :param wad_id: The id of the wad to download.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Picked automatically, 
+        if not given.
         :param newdir: Whether to make a new subdirectory for the wad, using 
         the wad's filename.
 
@@ -362,53 +760,228 @@ class Downwad(object):
         if "error" in wad_info:
             return wad_info
 
-        file_dir = wad_info["dir"]
-        filename = wad_info["filename"]
-
-        result = self.download(
-            filename, file_dir, dl_folder, server, newdir
-        )
-
-        return result
+        return self._fetch_wad(wad_info, dl_folder, server, newdir)
 
     def id_list(
-            self, id_list, dl_folder=None, server=DL_FTP_GERMANY, 
-            newdir=True
+            self, id_list, dl_folder=None, server=None, 
+            newdir=True, servers=None, per_mirror=2
         ):
         """
         Download wads from a given list/tuple of id numbers.
 
         :param id_list: The list/tuple of ID numbers of wads to download.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Picked automatically, 
+        if not given.
         :param newdir: Whether to make a new subdirectory for the wad, using 
         the wad's filename.
+        :param servers: Optional. A list of servers to download from, in 
+        parallel, instead of just ``server``. See ``bulk``. The full report 
+        is kept in ``Downwad.last_report``.
+        :param per_mirror: When using ``servers``, the most files to download 
+        from each server at once.
 
         :returns: Any errors.
 
         """
-        list_len = len(id_list)
-        count = 0
-        errors = []
+        if servers:
+            report = self.bulk(id_list, dl_folder, servers, per_mirror, newdir)
+            errors = [x for x in report["files"] if x["error"]]
+        else:
+            errors = []
 
-        for wad_id in id_list:
-            count += 1
-            result = self.wad_id(
-                wad_id,
-                dl_folder,
-                server,
-                newdir
-            )
-            if "error" in result or "warning" in result:
-                errors.append(result)
-            if count < list_len:
-                time.sleep(self.DL_DELAY)
+            for wad_id in id_list:
+                result = self.wad_id(
+                    wad_id,
+                    dl_folder,
+                    server,
+                    newdir
+                )
+                if _is_error(result):
+                    errors.append(result)
 
         if errors:
             return errors
 
+    def bulk(
+            self, items, dl_folder=None, servers=None, per_mirror=2, 
+            newdir=True, retries=1
+        ):
+        """
+        Downloads a list of wads, spread over several mirrors at once. Each 
+        file goes to whichever mirror is expected to finish it soonest, based 
+        on how many downloads it's running, and its latency and throughput so 
+        far. Mirrors that are out of rotation are skipped.
+
+        Files that would be saved to the same place, the same file given 
+        twice, or two files with the same filename, from different 
+        directories, are only downloaded once, for the first of them. The 
+        rest are reported as failed, rather than racing to write the file.
+
+        :param items: A list of wad IDs, and/or wad info, to download.
+        :param dl_folder: Where to download the files to.
+        :param servers: The servers to download from. Defaults to 
+        ``Downwad.servers``.
+        :param per_mirror: The most files to download from each server at once.
+        :param newdir: Whether to make a new subdirectory for the wads, if it 
+        doesn't exist.
+        :param retries: How many other servers to try a file on, if it fails.
+
+        :returns: A report of the downloads, in a ``dict``, with the keys 
+        ``ok``, ``failed``, ``skipped``, ``bytes``, ``seconds`` and 
+        ``files``. ``files`` is a list with a ``dict`` for each file, in the 
+        order given, with the keys ``id``, ``filename``, ``server``, 
+        ``bytes``, ``seconds``, ``skipped`` (``True`` if the file was already 
+        downloaded, and unchanged, going by ``Downwad.manifest``) and 
+        ``error`` (``None`` if the download succeeded).
+
+        """
+        if not servers:
+            servers = self.servers
+
+        def fetch(job):
+            entry, wad_info = job
+            if wad_info is not None:
+                self._bulk_file(
+                    entry, wad_info, dl_folder, servers, per_mirror, newdir, 
+                    retries
+                )
+            return entry
+
+        start = time.time()
+        pool = ThreadPool(max(1, min(len(items), per_mirror * len(servers))))
+
+        try:
+            jobs = pool.map(self._bulk_info, items)
+
+            # Only the first file for each place is downloaded.
+            folder = dl_folder or self.daw.dl_folder
+            targets = {}
+            for entry, wad_info in jobs:
+                if wad_info is None:
+                    continue
+                target = (folder, wad_info["filename"])
+                if target in targets:
+                    entry["error"] = "Same target path as %s%s." % (
+                        targets[target]["dir"], targets[target]["filename"]
+                    )
+                else:
+                    targets[target] = wad_info
+
+            files = pool.map(
+                fetch, [
+                    (entry, wad_info if entry["error"] is None else None)
+                    for entry, wad_info in jobs
+                ]
+            )
+        finally:
+            pool.close()
+            pool.join()
+
+        failed = len([x for x in files if x["error"]])
+
+        report = {
+            "ok": len(files) - failed,
+            "failed": failed,
+            "skipped": len([x for x in files if x["skipped"]]),
+            "bytes": sum(x["bytes"] for x in files),
+            "seconds": time.time() - start,
+            "files": files
+        }
+        self.last_report = report
+
+        return report
+
+    def _bulk_info(self, item):
+        """
+        Gets the wad info of one file for ``bulk``, and starts its report.
+
+        :param item: The wad ID, or wad info, of the file.
+
+        :returns: A tuple of the report ``dict`` for the file, and its wad 
+        info, or ``None``, if it couldn't be got.
+
+        """
+        entry = {
+            "id": item,
+            "filename": None,
+            "server": None,
+            "bytes": 0,
+            "seconds": 0.0,
+            "skipped": False,
+            "error": None
+        }
+
+        if hasattr(item, "get"):
+            wad_info = item
+            entry["id"] = item.get("id")
+        else:
+            try:
+                wad_info = self.daw.get_id(item)
+            except Exception as err:
+                entry["error"] = str(err)
+                return entry, None
+            if _is_error(wad_info):
+                entry["error"] = wad_info
+                return entry, None
+
+        entry["filename"] = wad_info["filename"]
+
+        return entry, wad_info
+
+    def _bulk_file(
+            self, entry, wad_info, dl_folder, servers, per_mirror, newdir, 
+            retries
+        ):
+        """
+        Downloads one file for ``bulk``, trying other servers if it fails.
+
+        :param entry: The report ``dict`` for the file, which is filled in.
+        :param wad_info: The wad info of the file.
+
+        :returns: The report ``dict`` for the file.
+
+        """
+        # Skip the file before taking up a mirror, if it's already there.
+        try:
+            if self._unchanged(wad_info, dl_folder):
+                entry["skipped"] = True
+                return entry
+        except Exception as err:
+            entry["error"] = str(err)
+            return entry
+
+        tried = []
+
+        while len(tried) <= retries:
+            server = self.mirrors.acquire(servers, per_mirror, tried)
+            if server is None:
+                break
+            tried.append(server)
+
+            entry["server"] = server
+            start = time.time()
+
+            try:
+                wad_file = self._fetch_wad(
+                    wad_info, dl_folder, server, newdir, False
+                )
+                size = os.path.getsize(wad_file.name)
+            except Exception as err:
+                entry["error"] = str(err)
+                continue
+            finally:
+                self.mirrors.release(server)
+
+            entry["seconds"] = time.time() - start
+            entry["bytes"] = size
+            entry["error"] = None
+            break
+
+        return entry
+
     def file_path(
-        self, path, dl_folder=None, server=DL_FTP_GERMANY, 
+        self, path, dl_folder=None, server=None, 
         newdir=True
         ):
         """
@@ -416,7 +989,8 @@ class Downwad(object):
 
         :param path: The full idgames path of the wad, including filename.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Picked automatically, 
+        if not given.
         :param newdir: Whether to a new subdirectory for the wad, using the
         wad's filename.
 
@@ -426,14 +1000,11 @@ class Downwad(object):
         """
         wad_info = self.daw.get_file_path(path)
 
-        wad_dir = wad_info["dir"]
-        wad_filename = wad_info["filename"]
-
-        return self.download(wad_filename, wad_dir, dl_folder, server, newdir)
+        return self._fetch_wad(wad_info, dl_folder, server, newdir)
 
     def folder_year(
             self, year, file_dir=None, dl_folder=None, 
-            server=DL_FTP_GERMANY, newdir=True
+            server=None, newdir=True
         ):
         """
         Download all of the wads from a given year, in a given 
@@ -442,7 +1013,8 @@ class Downwad(object):
         :param year: The year to download wads from.
         :param file_dir: The /idgames path to download from.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Picked automatically, 
+        if not given.
         :param newdir: Whether to make a new subdirectory for each wad, using 
         the wad's filename.
 
@@ -450,30 +1022,19 @@ class Downwad(object):
 
         """
         year = str(year)
-        files = self.daw.get_files(file_folder)
-        files_len = len(files["content"]["file"])
-        count = 0
+        files = self.daw.get_files(file_dir)
         errors = []
-        for item in files["content"]["file"]:
-            count += 1
+        for item in files:
             if item["date"][0:4] == year:
-                result = self.download(
-                    item["filename"],
-                    item["dir"],
-                    dl_folder,
-                    server,
-                    newdir
-                )
-                if "error" in result or "warning" in result:
+                result = self._fetch_wad(item, dl_folder, server, newdir)
+                if _is_error(result):
                     errors.append(result)
-                if count < files_len:
-                    time.sleep(self.DL_DELAY)
 
         if errors:
             return errors
 
     def wad_info(
-            self, wad_info, dl_folder=None, server=DL_FTP_GERMANY, 
+            self, wad_info, dl_folder=None, server=None, 
             newdir=True
         ):
         """
@@ -481,7 +1042,8 @@ class Downwad(object):
 
         :param wad_info: The wad info, in dict (JSON) form.
         :param dl_folder: Where to download the file to.
-        :param server: Which server to download from.
+        :param server: Which server to download from. Picked automatically, 
+        if not given.
         :param newdir: Whether to a new subdirectory for the wad, using the
         wad's filename.
 
@@ -489,10 +1051,192 @@ class Downwad(object):
         the download.
 
         """
-        wad_dir = wad_info["dir"]
-        wad_filename = wad_info["filename"]
+        return self._fetch_wad(wad_info, dl_folder, server, newdir)
+
+#===============================================================================
+# Manifest Class
+#===============================================================================
+
+class Manifest(object):
+    """
+    A record of the wads that have been downloaded, kept in a JSON lines file, 
+    so that later runs can skip the ones that haven't changed. Each line is 
+    the filename, dir, size, date and md5 from a wad's info, and where it was 
+    saved. New entries are appended, and later lines replace earlier ones for 
+    the same file, so a run that's killed part way loses at most the line it 
+    was writing.
+
+    """
+
+    def __init__(self, filename):
+        """
+        The init method for the Manifest class. Loads the manifest, if the 
+        file exists.
+
+        :param filename: The filename of the manifest.
+
+        """
+        self.filename = filename
+        self.entries = {}
+
+        self._lock = threading.Lock()
+        # How many lines in the file have been replaced by later ones.
+        self._stale = 0
+
+        if os.path.exists(filename):
+            # Rewrite the file if it ends in a cut off line, so new entries 
+            # don't get appended to it, or if it's mostly old entries.
+            if not self._load() or self._stale > len(self.entries):
+                self.compact()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _load(self):
+        """
+        Reads the manifest file, replaying the entries in order.
+
+        :returns: ``False`` if any of the lines couldn't be read.
+
+        """
+        intact = True
+
+        with open(self.filename, "r") as manifest_file:
+            for line in manifest_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line that was cut off part way.
+                    intact = False
+                    continue
+
+                key = entry["dir"] + entry["filename"]
+                if key in self.entries:
+                    self._stale += 1
+
+                if entry.get("removed"):
+                    self.entries.pop(key, None)
+                    self._stale += 1
+                else:
+                    self.entries[key] = entry
+
+        return intact
+
+    def _append(self, entry):
+        """
+        Appends an entry to the manifest file.
+
+        :param entry: The entry, in dict form.
+
+        :returns: None.
+
+        """
+        with open(self.filename, "a") as manifest_file:
+            manifest_file.write(json.dumps(entry) + "\n")
+
+    def add(self, wad_info, path):
+        """
+        Adds a downloaded wad to the manifest.
+
+        :param wad_info: The wad info, in dict (JSON) form.
+        :param path: Where the file was saved.
+
+        :returns: The manifest entry.
+
+        """
+        entry = dict(
+            (x, wad_info.get(x)) for x in MANIFEST_FIELDS
+        )
+        entry["path"] = path
+        key = entry["dir"] + entry["filename"]
+
+        with self._lock:
+            if key in self.entries:
+                self._stale += 1
+            self.entries[key] = entry
+            self._append(entry)
+
+        return entry
+
+    def compact(self):
+        """
+        Rewrites the manifest file with just the current entries, dropping 
+        any that have been replaced or removed.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            temp_name = self.filename + ".tmp"
+
+            with open(temp_name, "w") as manifest_file:
+                for entry in self.entries.itervalues():
+                    manifest_file.write(json.dumps(entry) + "\n")
+
+            _replace(temp_name, self.filename)
+            self._stale = 0
+
+    def get(self, file_dir, filename):
+        """
+        Gets the manifest entry for a file.
+
+        :param file_dir: The /idgames path of the file.
+        :param filename: The filename of the file.
+
+        :returns: The entry, in dict form, or ``None`` if it's not in the 
+        manifest.
+
+        """
+        return self.entries.get(file_dir + filename)
+
+    def is_current(self, wad_info, path):
+        """
+        Checks whether a wad is in the manifest, still on disk at the given 
+        location, and unchanged, going by the size, date and md5 in its info. 
+        The file itself isn't hashed, just checked for its size.
+
+        :param wad_info: The wad info, in dict (JSON) form.
+        :param path: Where the file should be.
+
+        :returns: ``True`` if the wad doesn't need downloading again.
+
+        """
+        entry = self.get(wad_info["dir"], wad_info["filename"])
+
+        if entry is None or entry.get("path") != path:
+            return False
+
+        for field in ("size", "date", "md5"):
+            if wad_info.get(field) is not None:
+                if wad_info[field] != entry.get(field):
+                    return False
+
+        if not os.path.exists(path):
+            return False
+
+        return entry["size"] is None or os.path.getsize(path) == entry["size"]
+
+    def remove(self, file_dir, filename):
+        """
+        Removes a file from the manifest.
+
+        :param file_dir: The /idgames path of the file.
+        :param filename: The filename of the file.
 
-        return self.download(wad_filename, wad_dir, dl_folder, server, newdir)
+        :returns: None.
+
+        """
+        key = file_dir + filename
+
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._stale += 1
+                self._append(
+                    {"dir": file_dir, "filename": filename, "removed": True}
+                )
 
 #===============================================================================
 # Misc. Functions Class
@@ -577,7 +1321,11 @@ class MiscFuncs(object):
 #===============================================================================
 
 class IOFuncs(object):
-    """A class with methods for saving/opening wad id lists, and JSON data."""
+    """
+    A class with methods for saving/opening wad id lists, and JSON data, 
+    whole, or a record per line.
+
+    """
 
     @staticmethod
     def open_id_list(filename=None):
@@ -621,6 +1369,39 @@ class IOFuncs(object):
             with open(filename, "r") as json_file:
                 return json.load(json_file)
 
+    @staticmethod
+    def open_jsonl(filename, zipped=False):
+        """
+        Opens JSON lines data, one record per line, a record at a time, so 
+        the whole file is never in memory at once. A cut off last line, from 
+        a writer that was killed part way, is skipped.
+
+        :param filename: The filename of the file to be opened.
+        :param zipped: Whether or not the file is gzipped.
+
+        :yields: Each record, in the order they were written.
+
+        """
+        if zipped:
+            # GzipFile's own readline is slow, so buffer it.
+            jsonl_file = io.BufferedReader(gzip.open(filename, "rb"))
+        else:
+            jsonl_file = open(filename, "rb")
+
+        with jsonl_file:
+            for line in jsonl_file:
+                if not line.strip():
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if line.endswith("\n"):
+                        raise
+                    break
+
+                yield record
+
     @staticmethod
     def save_id_list(id_list, filename=None):
         """
@@ -655,51 +1436,332 @@ class IOFuncs(object):
         """
         if zipped:
             json_gzip = gzip.open(filename, 'wb')
-            json_gzip.write(json.dumps(data))
+            json_gzip.write(json.dumps(data, default=_to_json))
             return json_gzip 
         else:
             with open(filename, "w") as json_file:
-                return json.dump(data, json_file)
+                return json.dump(data, json_file, default=_to_json)
 
         return json_file
 
+    @staticmethod
+    def save_jsonl(records, filename, zipped=False, append=False):
+        """
+        Saves JSON lines data, one record per line, a record at a time, so 
+        records can come from a generator, like ``Crawler.crawl``, without 
+        all of them being in memory at once.
+
+        :param records: An iterable of records.
+        :param filename: The filename of the file to be saved.
+        :param zipped: Whether or not to gzip the data.
+        :param append: Whether to add to the end of the file, instead of 
+        replacing it.
+
+        :returns: The number of records saved.
+
+        """
+        with JsonLinesWriter(filename, zipped, append) as writer:
+            return writer.extend(records)
+
+#===============================================================================
+# JsonLinesWriter Class
+#===============================================================================
+
+class JsonLinesWriter(object):
+    """
+    Writes records to a JSON lines file, one per line, as they're made. 
+    Appends by default, so a stopped crawl can carry on adding to the same 
+    file. Gzipped files are appended to as a new gzip member, which 
+    ``IOFuncs.open_jsonl`` reads straight through.
+
+    """
+
+    def __init__(self, filename, zipped=False, append=True):
+        """
+        The init method for the JsonLinesWriter class. Opens the file.
+
+        :param filename: The filename of the file to write to.
+        :param zipped: Whether or not to gzip the data.
+        :param append: Whether to add to the end of the file, instead of 
+        replacing it.
+
+        """
+        self.filename = filename
+        self.count = 0
+
+        mode = "ab" if append else "wb"
+        if zipped:
+            self._file = gzip.open(filename, mode)
+        else:
+            self._file = open(filename, mode)
+
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Closes the file. For a gzipped file, this writes the end of the gzip 
+        member, so it should always be called.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            self._file.close()
+
+    def extend(self, records):
+        """
+        Writes several records.
+
+        :param records: An iterable of records.
+
+        :returns: The number of records written.
+
+        """
+        count = 0
+
+        for record in records:
+            self.write(record)
+            count += 1
+
+        return count
+
+    def flush(self):
+        """
+        Flushes what's been written so far to disk.
+
+        :returns: None.
+
+        """
+        with self._lock:
+            self._file.flush()
+
+    def write(self, record):
+        """
+        Writes a record.
+
+        :param record: The record, in a form ``json.dumps`` accepts.
+
+        :returns: None.
+
+        """
+        line = json.dumps(record, default=_to_json) + "\n"
+
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
 #===============================================================================
 # Other Bits & Pieces
 #===============================================================================
 
-def _frange(start, stop, step, floatfix=True):
+def _file_md5(filename):
     """
-    Returns a float range generator.
+    Gets the md5 of a file.
 
-    :param start: The start of the range.
-    :param stop: The end of the range.
-    :param step: How much to increment the range each step.
-    :param floatfix: This "fixes" the floats so that equality checks work.
-    Why this works? I really don't know. But it does.
+    :param filename: The filename of the file.
 
-    :yields: A float range.
+    :returns: The md5, as a hex string.
 
     """
-    r = start
-    while r < stop:
-        if floatfix:
-            yield float(str(r))
-        else:
-            yield r
-        r += step
+    md5 = hashlib.md5()
+
+    with open(filename, "rb") as hash_file:
+        for block in iter(lambda: hash_file.read(CHUNK_MAX), ""):
+            md5.update(block)
+
+    return md5.hexdigest()
+
+def _finish_part(part_loc, save_loc, size=None):
+    """
+    Checks a finished ``.part`` file against the expected size, and moves it 
+    into place.
+
+    :param part_loc: The location of the ``.part`` file.
+    :param save_loc: Where to move the file to.
+    :param size: Optional. The expected size of the file, in bytes.
+
+    :returns: The closed file object, of the file in its final location.
+
+    """
+    part_size = os.path.getsize(part_loc)
+
+    if size is not None and part_size != size:
+        # A .part file bigger than the file can't be resumed.
+        if part_size > size:
+            os.remove(part_loc)
+        raise IOError(
+            "Downloaded %d bytes of %s, expected %d." % (
+                part_size, save_loc, size
+            )
+        )
+
+    _replace(part_loc, save_loc)
+
+    with open(save_loc, "rb") as wad_file:
+        pass
+
+    return wad_file
+
+def _is_error(result):
+    """
+    Checks whether the result of a download is an error/warning response.
+
+    :param result: The result of a download.
+
+    :returns: ``True`` if the result is an error/warning response.
 
-def _trunc_rating(rating, places=1):
     """
-    Truncates the wad ratings to a given number of decimal places.
+    return type(result) == dict and ("error" in result or "warning" in result)
+
+def _part_offset(part_loc, size=None):
+    """
+    Gets the offset to resume a download from, using its ``.part`` file.
+
+    :param part_loc: The location of the ``.part`` file.
+    :param size: Optional. The expected size of the file, in bytes.
+
+    :returns: The number of bytes already downloaded.
+
+    """
+    if not os.path.exists(part_loc):
+        return 0
+
+    offset = os.path.getsize(part_loc)
+
+    if size is not None and offset > size:
+        return 0
+
+    # A full-size .part file may have been sized up front, by a download that 
+    # was killed before it could cut it back. The part that was never written 
+    # is zeros, so resume from after the last byte that isn't one.
+    if offset and offset == size:
+        with open(part_loc, "rb") as part_file:
+            while offset:
+                start = max(0, offset - CHUNK_MIN)
+                part_file.seek(start)
+                data = part_file.read(offset - start).rstrip("\0")
+                offset = start + len(data)
+                if data:
+                    break
+
+    return offset
+
+# MoveFileEx flags: replace the file if it's there, and don't return until 
+# the move is on disk.
+_MOVEFILE_REPLACE_EXISTING = 0x1
+_MOVEFILE_WRITE_THROUGH = 0x8
+
+def _replace(temp_name, filename):
+    """
+    Moves a file into place, over the given file, in one step, so the file 
+    is never missing, or half written. On POSIX systems, anything that 
+    already has the old file open keeps using it. Windows won't replace a 
+    file that's open, or mapped, and raises a ``WindowsError`` instead.
+
+    :param temp_name: The filename of the file to move.
+    :param filename: The filename to move it to.
+
+    :returns: None.
+
+    """
+    if os.name != "nt":
+        os.rename(temp_name, filename)
+        return
+
+    # os.rename won't replace a file on Windows, and there's no os.replace 
+    # in Python 2, so this goes straight to MoveFileEx, which will.
+    encoding = sys.getfilesystemencoding()
+    names = [
+        x if isinstance(x, unicode) else x.decode(encoding) 
+        for x in (temp_name, filename)
+    ]
+    flags = _MOVEFILE_REPLACE_EXISTING | _MOVEFILE_WRITE_THROUGH
+
+    if not ctypes.windll.kernel32.MoveFileExW(names[0], names[1], flags):
+        raise ctypes.WinError()
+
+def _to_json(obj):
+    """
+    Gets something ``json`` can save, for an object it can't, such as a 
+    ``WadInfo``.
+
+    :param obj: The object.
 
-    :param places: The number of decimal places to truncate to.
+    :returns: The object's ``to_dict``.
 
     """
-    _rating = str(rating).split(".")
-    _rating[1] = _rating[1][0:places]
-    _rating = float(".".join(_rating))
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+
+    raise TypeError("%r is not JSON serializable" % (obj))
+
+def _date_number(date):
+    """
+    Turns a date into a number that sorts the same way.
+
+    :param date: The date, as "yyyy-mm-dd".
+
+    :returns: The date as an ``int``, yyyymmdd, or 0 if it isn't a date.
+
+    """
+    try:
+        return int(date[0:4] + date[5:7] + date[8:10])
+    except (TypeError, ValueError):
+        return 0
+
+def _rating_tenths(rating):
+    """
+    Truncates a rating to tenths, without going through a string.
+
+    :param rating: The rating.
+
+    :returns: The rating, in tenths, as an ``int``.
+
+    """
+    # The rounding keeps values like 3.9999999999 from being cut down to 3.9.
+    return int(math.floor(round(rating * 10, 9)))
+
+def _compile_filter(name, value):
+    """
+    Compiles one filter into a test.
+
+    :param name: The filter name.
+    :param value: The filter's value, or range of values.
+
+    :returns: A function that takes a result, and returns ``True`` if it 
+    passes the filter.
+
+    """
+    if name == FILTER_DATE:
+        return lambda x: x["date"] == value
+
+    if name == FILTER_GAME:
+        game_path = "%s/" % (value)
+        return lambda x: game_path in x["dir"]
+
+    low, high = SearchFilter.bounds(name, value)
+
+    if name == FILTER_YEAR:
+        # Compare the years as strings, rather than converting every date.
+        low, high = ("%04d" % (low), "%04d" % (high))
+        return lambda x: low <= x["date"][0:4] <= high
+
+    if name == FILTER_RATING:
+        return lambda x: low <= _rating_tenths(x["rating"]) <= high
+
+    if name == FILTER_SIZE:
+        return lambda x: low <= x["size"] // 1000 <= high
+
+    if name == FILTER_VOTES:
+        return lambda x: low <= x["votes"] <= high
 
-    return _rating
+    raise KeyError("Unknown filter: %s" % (name))
 
 #===============================================================================
 # If Main
@@ -32,6 +32,9 @@ setup(
     install_requires=[
         "requests"
     ],
+    extras_require={
+        "catalog": ["numpy"]
+    },
     include_package_data=True,
     zip_safe=False
 )
\ No newline at end of file
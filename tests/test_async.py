@@ -0,0 +1,85 @@
+#===============================================================================
+# Test Async: Tests for DAPIWAsync
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``AsyncDAPIWrap``, against a fake idgames API with some latency, so
+running calls at once can be told from running them one after the other.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import threading
+import time
+import unittest
+
+from dapiwrap import (
+    AsyncDAPIWrap,
+    FakeIdgames
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+LATENCY = 0.2
+
+class AsyncDAPIWrapTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(50, latency=LATENCY).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def test_calls_run_at_once(self):
+        with AsyncDAPIWrap(self.fake.client(), concurrency=4) as adaw:
+            start = time.time()
+            pending = [adaw.get_id(x) for x in (1, 2, 3, 4)]
+            submitted = time.time() - start
+
+            wads = adaw.gather(pending, timeout=10)
+            seconds = time.time() - start
+
+        self.assertLess(submitted, LATENCY / 2)
+        self.assertLess(seconds, LATENCY * 3)
+        self.assertEqual([x["id"] for x in wads], [1, 2, 3, 4])
+
+    def test_concurrency_limit(self):
+        with AsyncDAPIWrap(self.fake.client(), concurrency=2) as adaw:
+            start = time.time()
+            adaw.gather([adaw.get_id(x) for x in (1, 2, 3, 4)], timeout=10)
+            seconds = time.time() - start
+
+        self.assertGreaterEqual(seconds, LATENCY * 2)
+
+    def test_callback(self):
+        done = threading.Event()
+        results = []
+
+        def callback(wad_info):
+            results.append(wad_info)
+            done.set()
+
+        with AsyncDAPIWrap(self.fake.client()) as adaw:
+            adaw.get_id(7, callback=callback)
+            self.assertTrue(done.wait(10))
+
+        self.assertEqual(results[0]["id"], 7)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+#===============================================================================
+# Test Cache: Tests for DAPIWCache
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for the response caches, on their own, and in front of the fake
+idgames API.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from dapiwrap import (
+    A_GET_ID,
+    A_LATESTFILES,
+    A_PING,
+    FakeIdgames
+)
+
+from dapiwrap.dapiwcache import (
+    DiskCache,
+    MemoryCache,
+    TieredCache
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class MemoryCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def test_skips_the_server(self):
+        cache = MemoryCache()
+        daw = self.fake.client(cache=cache)
+
+        first = daw.get_id(5)
+        requests = self.fake.api.requests
+        second = daw.get_id(5)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.fake.api.requests, requests)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+        daw.invalidate(A_GET_ID, 5)
+        daw.get_id(5)
+        self.assertEqual(self.fake.api.requests, requests + 1)
+
+    def test_errors_and_pings_are_not_cached(self):
+        cache = MemoryCache()
+        daw = self.fake.client(cache=cache)
+
+        daw.get_id(9999)
+        daw.ping()
+
+        self.assertEqual(len(cache), 0)
+
+    def test_drops_least_recently_used(self):
+        cache = MemoryCache(max_entries=2)
+
+        cache.set("a", "1", A_GET_ID)
+        cache.set("b", "2", A_GET_ID)
+        cache.get("a")
+        cache.set("c", "3", A_GET_ID)
+
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_byte_limit(self):
+        cache = MemoryCache(max_bytes=10)
+
+        cache.set("a", "x" * 6, A_GET_ID)
+        cache.set("b", "y" * 6, A_GET_ID)
+        cache.set("c", "z" * 11, A_GET_ID)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "y" * 6)
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.stats()["bytes"], 6)
+
+    def test_expiry(self):
+        cache = MemoryCache(ttls={A_GET_ID: 0.2})
+
+        cache.set("a", "1", A_GET_ID)
+        cache.set("b", "2", A_PING)
+
+        self.assertEqual(cache.get("a", A_GET_ID), "1")
+        self.assertIsNone(cache.get("b"))
+
+        time.sleep(0.3)
+        self.assertIsNone(cache.get("a", A_GET_ID))
+
+class DiskCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        self.filename = os.path.join(self.folder, "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_lasts_between_instances(self):
+        self.fake.client(cache=DiskCache(self.filename)).get_id(6)
+        requests = self.fake.api.requests
+
+        wad_info = self.fake.client(cache=DiskCache(self.filename)).get_id(6)
+
+        self.assertEqual(wad_info["id"], 6)
+        self.assertEqual(self.fake.api.requests, requests)
+
+    def test_shared_between_processes(self):
+        process = multiprocessing.Process(
+            target=_set_entries, args=(self.filename, 20)
+        )
+        process.start()
+        process.join(30)
+
+        self.assertEqual(process.exitcode, 0)
+        cache = DiskCache(self.filename)
+        self.assertEqual(len(cache), 20)
+        self.assertEqual(cache.get("url 19"), "body 19" * 100)
+
+    def test_shared_between_threads(self):
+        cache = DiskCache(self.filename)
+        threads = [
+            threading.Thread(target=_set_entries, args=(cache, 10, x))
+            for x in xrange(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertEqual(len(cache), 40)
+
+    def test_expiry(self):
+        cache = DiskCache(self.filename, ttls={A_GET_ID: 0.2})
+
+        cache.set("a", "1", A_GET_ID)
+        self.assertEqual(cache.get("a", A_GET_ID), "1")
+
+        time.sleep(0.3)
+        self.assertIsNone(cache.get("a", A_GET_ID))
+
+class TieredCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_promotes_with_the_time_left(self):
+        ttls = {A_LATESTFILES: 1}
+        memory = MemoryCache(ttls=ttls)
+        disk = DiskCache(os.path.join(self.folder, "cache.db"), ttls=ttls)
+        tiers = TieredCache(memory, disk)
+
+        disk.set("url", "body", A_LATESTFILES)
+        expires = disk.lookup("url")[0]
+
+        time.sleep(0.5)
+        self.assertEqual(tiers.get("url", A_LATESTFILES), "body")
+        self.assertAlmostEqual(memory.lookup("url")[0], expires, places=3)
+
+        time.sleep(0.6)
+        self.assertIsNone(tiers.get("url", A_LATESTFILES))
+        self.assertIsNone(memory.get("url"))
+
+    def test_sets_every_tier(self):
+        memory = MemoryCache()
+        disk = DiskCache(os.path.join(self.folder, "cache.db"))
+
+        TieredCache(memory, disk).set("url", "body", A_GET_ID)
+
+        self.assertEqual(memory.get("url"), "body")
+        self.assertEqual(disk.get("url"), "body")
+
+def _set_entries(cache, count, prefix=""):
+    """Fills a cache, or the cache file with the given filename."""
+    if isinstance(cache, basestring):
+        cache = DiskCache(cache)
+
+    for x in xrange(count):
+        cache.set(
+            "url %s%d" % (prefix, x), "body %s%d" % (prefix, x) * 100,
+            A_GET_ID
+        )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
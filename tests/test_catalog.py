@@ -0,0 +1,136 @@
+#===============================================================================
+# Test Catalog: Tests for DAPIWCatalog
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``Catalog``, checking its filters and sorts give the same results as
+``SearchFilter``, and sorting the list, on records from the fake idgames
+archive. Skipped if ``numpy`` isn't installed.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import unittest
+
+from dapiwrap import (
+    DIRECT_ASC,
+    DIRECT_DESC,
+    DOOM,
+    DOOM2,
+    FILTER_DATE,
+    FILTER_GAME,
+    FILTER_GYR,
+    FILTER_RATING,
+    FILTER_SIZE,
+    FILTER_VOTES,
+    FILTER_YEAR,
+    HERETIC,
+    SORTS,
+    FakeIdgames,
+    SearchFilter
+)
+
+from dapiwrap.dapiwcatalog import (
+    Catalog,
+    numpy
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+# Every filter, with single values, ranges, and values on the edges of the
+# made up records below.
+FILTERS = [
+    (FILTER_DATE, "2001-05-05"),
+    (FILTER_GAME, DOOM),
+    (FILTER_GAME, DOOM2),
+    (FILTER_GAME, HERETIC),
+    (FILTER_GYR, (DOOM2, (2000, 2005), 4.0)),
+    (FILTER_GYR, (DOOM, (1994, 2000), (3.0, 4.5))),
+    (FILTER_RATING, 3.0),
+    (FILTER_RATING, 4.5),
+    (FILTER_RATING, (3.0, 4.0)),
+    (FILTER_RATING, (2.05, 3.95)),
+    (FILTER_SIZE, 1000),
+    (FILTER_SIZE, (500, 1000)),
+    (FILTER_SIZE, 50),
+    (FILTER_SIZE, (10, 40)),
+    (FILTER_VOTES, 0),
+    (FILTER_VOTES, 10),
+    (FILTER_VOTES, (5, 10)),
+    (FILTER_YEAR, 2001),
+    (FILTER_YEAR, (1994, 2001)),
+    [(FILTER_GAME, DOOM2), (FILTER_VOTES, (1, 30))],
+    [(FILTER_YEAR, (2000, 2010)), (FILTER_SIZE, (20, 80)),
+     (FILTER_RATING, (2.5, 5.0))]
+]
+
+@unittest.skipIf(numpy is None, "Catalog requires the numpy package.")
+class CatalogTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with FakeIdgames(500) as fake:
+            records = [
+                fake.archive.records[x] for x in sorted(fake.archive.records)
+            ]
+
+        # Records right on the edges of the filters.
+        edges = [
+            {"rating": 3.0, "votes": 10, "size": 1000000,
+             "date": "2001-05-05"},
+            {"rating": 4.0, "votes": 5, "size": 1000999,
+             "date": "1994-01-01"},
+            {"rating": 4.5, "votes": 0, "size": 500000,
+             "date": "2001-12-31"},
+            {"rating": 3.99, "votes": 11, "size": 100000,
+             "date": "2000-01-01"}
+        ]
+        for wad_id, (record, edge) in enumerate(zip(records, edges), 10000):
+            records.append(dict(record, id=wad_id, **edge))
+
+        cls.records = records
+        cls.catalog = Catalog(records)
+        cls.filter = SearchFilter()
+
+    def test_filters_match_searchfilter(self):
+        for filters in FILTERS:
+            self.assertEqual(
+                list(self.catalog.view().chain(filters).ids()),
+                [x["id"] for x in self.filter.chain(self.records, filters)],
+                filters
+            )
+
+    def test_sorts_match_sorted(self):
+        view = self.catalog.view().chain((FILTER_GAME, DOOM2))
+        matches = self.filter.chain(self.records, (FILTER_GAME, DOOM2))
+
+        for sort in SORTS:
+            for direction in (DIRECT_ASC, DIRECT_DESC):
+                self.assertEqual(
+                    sorted(
+                        [x[sort] for x in view.sort(sort, direction)],
+                        reverse=direction == DIRECT_DESC
+                    ),
+                    [x[sort] for x in view.sort(sort, direction)]
+                )
+                self.assertEqual(
+                    sorted(x["id"] for x in view.sort(sort, direction)),
+                    sorted(x["id"] for x in matches)
+                )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#===============================================================================
+# Test Crawl: Tests for Crawler
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``Crawler``, crawling the fake idgames archive.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    A_GETFILES_NAME,
+    Crawler,
+    FakeIdgames
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class CrawlerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(300).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+        shutil.rmtree(self.folder)
+
+    def test_finds_every_file_once(self):
+        crawler = Crawler(self.daw, workers=4)
+        ids = [x["id"] for x in crawler.crawl()]
+
+        self.assertEqual(sorted(ids), sorted(self.fake.archive.records))
+        self.assertEqual(crawler.errors, {})
+        self.assertEqual(crawler.stats["files"], len(ids))
+
+    def test_resumes_from_the_checkpoint(self):
+        checkpoint = os.path.join(self.folder, "crawl.json")
+        ids = set()
+
+        crawler = Crawler(self.daw, workers=2, checkpoint=checkpoint)
+        crawl = crawler.crawl()
+        for wad_info in crawl:
+            ids.add(wad_info["id"])
+            if len(ids) >= 50:
+                break
+        crawl.close()
+        self.assertTrue(os.path.exists(checkpoint))
+
+        crawler = Crawler(self.daw, workers=2, checkpoint=checkpoint)
+        ids.update(x["id"] for x in crawler.crawl())
+
+        self.assertEqual(ids, set(self.fake.archive.records))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_getfiles_errors(self):
+        path = sorted(x for x in self.fake.archive.files if
+                      self.fake.archive.files[x])[0]
+        call = self.daw.call
+
+        def failing_call(action, params=None, raw_bytes=False):
+            if action == A_GETFILES_NAME and params == path:
+                return {"error": {"type": "Error", "message": "Failed."}}
+            return call(action, params, raw_bytes)
+
+        self.daw.call = failing_call
+        crawler = Crawler(self.daw, workers=4)
+        dirs = set(x["dir"] for x in crawler.crawl())
+
+        self.assertEqual(crawler.errors, {path: "Failed."})
+        self.assertNotIn(path, dirs)
+        self.assertNotIn(path, crawler.done)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
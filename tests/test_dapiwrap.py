@@ -0,0 +1,276 @@
+#===============================================================================
+# Test DAPIWrap: Tests for DAPIWrap
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``DAPIWrap``'s methods, against the fake idgames API.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import json
+import unittest
+
+from dapiwrap import (
+    A_GET_ID,
+    A_GETFILES_NAME,
+    DECODERS,
+    DIRECT_DESC,
+    FILTER_YEAR,
+    SEARCH_LIMIT,
+    SORT_SIZE,
+    FakeIdgames,
+    MemoryCache
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class GetIdListTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+
+    def test_keeps_order_and_drops_duplicates(self):
+        ids = [5, 3, 9, 3, 1, 5, 7]
+
+        for workers in (1, 4):
+            requests = self.fake.api.requests
+            wads = self.daw.get_id_list(ids, workers=workers)
+
+            self.assertEqual([x["id"] for x in wads], [5, 3, 9, 1, 7])
+            self.assertEqual(self.fake.api.requests - requests, 5)
+
+    def test_collects_errors(self):
+        errors = []
+        wads = self.daw.get_id_list([2, 9999, 4], workers=3, errors=errors)
+
+        self.assertEqual([x["id"] for x in wads], [2, 4])
+        self.assertEqual([x[0] for x in errors], [9999])
+        self.assertIn("error", errors[0][1])
+
+    def test_raw_keeps_errors(self):
+        wads = self.daw.get_id_list([2, 9999], raw=True)
+
+        self.assertEqual(len(wads), 2)
+        self.assertIn("content", wads[0])
+        self.assertIn("error", wads[1])
+
+class SearchCompleteTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(600).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+
+    def scan(self, query):
+        """Searches every record, with no limit on the results."""
+        return [
+            x for x in self.fake.archive.records.itervalues()
+            if query in x["filename"].lower()
+        ]
+
+    def test_same_as_an_uncapped_scan(self):
+        for query in ("o", "1", "dead"):
+            results, complete = self.daw.search_complete(query)
+
+            self.assertTrue(complete)
+            self.assertEqual(
+                sorted(x["id"] for x in results),
+                sorted(x["id"] for x in self.scan(query))
+            )
+
+        self.assertGreater(len(self.scan("o")), SEARCH_LIMIT)
+
+    def test_sort_and_filters(self):
+        params = {
+            "sort": SORT_SIZE, "dir": DIRECT_DESC,
+            "filter": (FILTER_YEAR, (1994, 2004))
+        }
+        results, complete = self.daw.search_complete("o", params)
+
+        expected = self.daw.filter.chain(self.scan("o"), params["filter"])
+        expected.sort(key=lambda x: (x["size"], x["id"]), reverse=True)
+
+        self.assertTrue(complete)
+        self.assertEqual(
+            [x["id"] for x in results], [x["id"] for x in expected]
+        )
+
+    def test_incomplete_results(self):
+        with FakeIdgames(2000) as fake:
+            daw = fake.client()
+            results, complete = daw.search_complete("e")
+            more, _ = daw.search_complete("e", shards=list("aeiou0123456789"))
+            daw.close()
+
+            scan = set(
+                x["id"] for x in fake.archive.records.itervalues()
+                if "e" in x["filename"].lower()
+            )
+
+        self.assertFalse(complete)
+        self.assertLess(set(x["id"] for x in results), scan)
+        self.assertLessEqual(set(x["id"] for x in more), scan)
+        self.assertGreater(len(more), len(results))
+
+class WalkTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(300).start()
+        cls.archive = cls.fake.archive
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+
+    def ids(self, paths):
+        """Gets the IDs of the files in the given directories."""
+        return sorted(x for path in paths for x in self.archive.files[path])
+
+    def test_iter_files(self):
+        path = sorted(x for x, y in self.archive.files.iteritems() if y)[0]
+
+        requests = self.fake.api.requests
+        wads = list(self.daw.iter_files(path))
+
+        self.assertEqual(sorted(x["id"] for x in wads), self.ids([path]))
+        # Just the one getfiles call, without getdirs.
+        self.assertEqual(self.fake.api.requests - requests, 1)
+
+    def test_iter_files_recursive(self):
+        wads = list(self.daw.iter_files("levels/doom2/", recursive=True))
+
+        self.assertEqual(
+            sorted(x["id"] for x in wads),
+            self.ids(x for x in self.archive.files if "/doom2/" in x)
+        )
+
+    def test_iter_tree(self):
+        tree = list(self.daw.iter_tree())
+        paths = [x[0] for x in tree]
+
+        self.assertEqual(
+            sorted(paths),
+            sorted(x for x in self.archive.dirs if x != "levels/")
+        )
+        self.assertEqual(
+            sorted(y["id"] for x in tree for y in x[2]),
+            sorted(self.archive.records)
+        )
+
+        # Depth first, with each directory before its subdirectories.
+        for path, subdirs, _ in tree:
+            self.assertEqual(
+                [x["name"] for x in subdirs], self.archive.subdirs[path]
+            )
+            for subdir in subdirs:
+                self.assertLess(paths.index(path), paths.index(subdir["name"]))
+
+    def test_iter_tree_is_lazy(self):
+        requests = self.fake.api.requests
+        tree = self.daw.iter_tree("levels/")
+
+        self.assertEqual(next(tree)[0], "levels/")
+        self.assertEqual(self.fake.api.requests - requests, 2)
+
+class DecoderTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def test_every_decoder_matches_json(self):
+        calls = [(A_GET_ID, 5), (A_GETFILES_NAME, "levels/doom2/")]
+        expected = [
+            json.loads(self.fake.client().call(x, y, raw_bytes=True))
+            for x, y in calls
+        ]
+
+        for name in DECODERS:
+            daw = self.fake.client(decoder=name)
+            self.assertEqual(
+                [daw.call(x, y) for x, y in calls], expected, name
+            )
+            daw.close()
+
+    def test_decoder_function(self):
+        decoded = []
+
+        def decoder(body):
+            decoded.append(body)
+            return json.loads(body)
+
+        daw = self.fake.client(decoder=decoder)
+        wad_info = daw.get_id(5)
+
+        self.assertEqual(wad_info["id"], 5)
+        self.assertEqual(len(decoded), 1)
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(KeyError):
+            self.fake.client(decoder="nonsense")
+
+    def test_raw_bytes(self):
+        cache = MemoryCache()
+        daw = self.fake.client(cache=cache)
+
+        body = daw.call(A_GET_ID, 6, raw_bytes=True)
+        self.assertIsInstance(body, str)
+        self.assertEqual(json.loads(body)["content"]["id"], 6)
+
+        # Not cached, since it wasn't checked for errors.
+        self.assertEqual(len(cache), 0)
+
+        # But served from the cache, once it's there.
+        daw.get_id(6)
+        requests = self.fake.api.requests
+        self.assertEqual(daw.call(A_GET_ID, 6, raw_bytes=True), body)
+        self.assertEqual(self.fake.api.requests, requests)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
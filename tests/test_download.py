@@ -0,0 +1,296 @@
+#===============================================================================
+# Test Download: Tests for Downwad
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``Downwad``'s downloads, against the fake HTTP and FTP mirrors.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    PART_EXT,
+    FakeIdgames,
+    Manifest
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class BulkTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-") + os.sep
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+        shutil.rmtree(self.folder)
+
+    def check_file(self, wad_info):
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+
+        with open(self.folder + wad_info["filename"], "rb") as wad_file:
+            self.assertEqual(wad_file.read(), data)
+
+    def test_downloads_from_every_mirror(self):
+        wads = self.daw.get_id_list(range(1, 13))
+
+        report = self.daw.download.bulk(wads, self.folder, per_mirror=2)
+
+        self.assertEqual(report["ok"], 12)
+        self.assertEqual(report["failed"], 0)
+        self.assertEqual(report["bytes"], sum(x["size"] for x in wads))
+        self.assertEqual(
+            [x["id"] for x in report["files"]], [x["id"] for x in wads]
+        )
+        self.assertEqual(
+            set(x["server"] for x in report["files"]),
+            set([self.fake.http.url, self.fake.ftp.url])
+        )
+        for wad_info in wads:
+            self.check_file(wad_info)
+
+    def test_same_target_is_downloaded_once(self):
+        wad_info = self.daw.get_id(20)
+        other = dict(self.daw.get_id(21), filename=wad_info["filename"])
+
+        report = self.daw.download.bulk(
+            [20, wad_info, other, 22], self.folder,
+            servers=[self.fake.http.url]
+        )
+
+        self.assertEqual(report["ok"], 2)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual(
+            [x["error"] is None for x in report["files"]],
+            [True, False, False, True]
+        )
+        self.assertEqual(
+            sorted(os.listdir(self.folder)),
+            sorted([wad_info["filename"], report["files"][3]["filename"]])
+        )
+        self.check_file(wad_info)
+
+    def test_errors_are_reported(self):
+        report = self.daw.download.bulk([9999, 30], self.folder)
+
+        self.assertEqual(report["ok"], 1)
+        self.assertEqual(report["failed"], 1)
+        self.assertIsNotNone(report["files"][0]["error"])
+
+class StreamTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-") + os.sep
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+        shutil.rmtree(self.folder)
+
+    def download(self, wad_id, server, size=None):
+        wad_info = self.daw.get_id(wad_id)
+        if size is None:
+            size = wad_info["size"]
+
+        self.daw.download.download(
+            wad_info["filename"], wad_info["dir"], self.folder, server,
+            size=size
+        )
+
+        return wad_info
+
+    def test_downloads_are_whole(self):
+        for preallocate in (True, False):
+            self.daw.download.preallocate = preallocate
+
+            for wad_id, server in ((1, self.fake.http.url),
+                                   (2, self.fake.ftp.url)):
+                wad_info = self.download(wad_id, server)
+                data = self.fake.archive.data(
+                    wad_info["dir"] + wad_info["filename"]
+                )
+
+                with open(self.folder + wad_info["filename"], "rb") as wad:
+                    self.assertEqual(wad.read(), data)
+                self.assertEqual(
+                    self.daw.download.last_transfer["bytes"], len(data)
+                )
+
+                os.remove(self.folder + wad_info["filename"])
+
+    def test_size_mismatch(self):
+        wad_info = self.daw.get_id(3)
+        save_loc = self.folder + wad_info["filename"]
+
+        # Too small: the .part file can't be resumed, so it's removed.
+        with self.assertRaises(IOError):
+            self.download(3, self.fake.http.url, wad_info["size"] - 1)
+        self.assertFalse(os.path.exists(save_loc + PART_EXT))
+
+        # Too big: the .part file is kept, to resume later.
+        with self.assertRaises(IOError):
+            self.download(3, self.fake.ftp.url, wad_info["size"] + 1)
+        self.assertEqual(
+            os.path.getsize(save_loc + PART_EXT), wad_info["size"]
+        )
+        self.assertFalse(os.path.exists(save_loc))
+
+    def test_interrupted_stream_is_cut_back(self):
+        part_loc = self.folder + "test.zip" + PART_EXT
+        chunks = ["a" * 100, "b" * 100]
+
+        def read(amount):
+            if not chunks:
+                raise IOError("The connection dropped.")
+            return chunks.pop(0)
+
+        self.daw.download.preallocate = True
+        with self.assertRaises(IOError):
+            self.daw.download._stream(read, part_loc, 0, 1000, self.daw.limiter)
+
+        self.assertEqual(os.path.getsize(part_loc), 200)
+
+    def test_preallocated_part_file(self):
+        wad_info = self.daw.get_id(14)
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+        save_loc = self.folder + wad_info["filename"]
+
+        # Sized up front, by a download killed before it could cut it back.
+        with open(save_loc + PART_EXT, "wb") as part_file:
+            part_file.write(data[0:1000])
+            part_file.write("\0" * (wad_info["size"] - 1000))
+
+        self.daw.download.ftp_download(
+            wad_info["filename"], wad_info["dir"], self.folder,
+            self.fake.ftp.url, size=wad_info["size"]
+        )
+
+        with open(save_loc, "rb") as wad_file:
+            self.assertEqual(wad_file.read(), data)
+
+class ManifestTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-") + os.sep
+        self.filename = self.folder + "manifest.jsonl"
+        self.daw = self.fake.client()
+        self.daw.download.manifest = Manifest(self.filename)
+
+    def tearDown(self):
+        self.daw.close()
+        shutil.rmtree(self.folder)
+
+    def test_skips_unchanged_files(self):
+        self.daw.download.wad_id(40, self.folder)
+        requests = self.fake.http.requests + self.fake.ftp.requests
+
+        # A new manifest, loaded from the file.
+        self.daw.download.manifest = Manifest(self.filename)
+        self.daw.download.wad_id(40, self.folder)
+        report = self.daw.download.bulk([40, 41], self.folder)
+
+        self.assertEqual(
+            self.fake.http.requests + self.fake.ftp.requests, requests + 1
+        )
+        self.assertEqual(report["skipped"], 1)
+        self.assertEqual([x["skipped"] for x in report["files"]], [True, False])
+
+    def test_downloads_changed_files(self):
+        wad_info = self.daw.get_id(42)
+        self.daw.download.wad_info(wad_info, self.folder)
+        requests = self.fake.http.requests + self.fake.ftp.requests
+
+        os.remove(self.folder + wad_info["filename"])
+        self.daw.download.wad_info(wad_info, self.folder)
+
+        # The manifest says the file's been changed since.
+        self.daw.download.manifest.add(
+            dict(wad_info, md5="0" * 32), self.folder + wad_info["filename"]
+        )
+        self.daw.download.wad_info(wad_info, self.folder)
+
+        self.assertEqual(
+            self.fake.http.requests + self.fake.ftp.requests, requests + 2
+        )
+
+    def test_adds_files_already_there(self):
+        wad_info = self.daw.get_id(43)
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+
+        with open(self.folder + wad_info["filename"], "wb") as wad_file:
+            wad_file.write(data)
+
+        requests = self.fake.http.requests + self.fake.ftp.requests
+        self.daw.download.wad_info(wad_info, self.folder)
+
+        self.assertEqual(
+            self.fake.http.requests + self.fake.ftp.requests, requests
+        )
+        self.assertIn(
+            wad_info["dir"] + wad_info["filename"], self.daw.download.manifest
+        )
+
+    def test_cut_off_line_and_removals(self):
+        manifest = self.daw.download.manifest
+        wads = self.daw.get_id_list([44, 45])
+        for wad_info in wads:
+            manifest.add(wad_info, self.folder + wad_info["filename"])
+        manifest.remove(wads[0]["dir"], wads[0]["filename"])
+
+        with open(self.filename, "a") as manifest_file:
+            manifest_file.write('{"dir": "levels/')
+
+        loaded = Manifest(self.filename)
+        self.assertEqual(len(loaded), 1)
+        self.assertIsNotNone(loaded.get(wads[1]["dir"], wads[1]["filename"]))
+
+        # The cut off line was dropped, so the file can be appended to.
+        loaded.add(wads[0], self.folder + wads[0]["filename"])
+        self.assertEqual(len(Manifest(self.filename)), 2)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#===============================================================================
+# Test Filters: Tests for SearchFilter
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``SearchFilter``, checking the ends of each range, and that the
+compiled filters give the same results as filtering a record at a time, on
+records from the fake idgames archive.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import unittest
+
+from dapiwrap import (
+    DOOM,
+    DOOM2,
+    FILTER_DATE,
+    FILTER_GAME,
+    FILTER_GYR,
+    FILTER_RATING,
+    FILTER_SIZE,
+    FILTER_VOTES,
+    FILTER_YEAR,
+    HERETIC,
+    FakeIdgames,
+    SearchFilter
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+def baseline(record, name, value):
+    """
+    Checks a record against one filter, the long way, by the rules in
+    ``SearchFilter.bounds``.
+
+    """
+    if name == FILTER_DATE:
+        return record["date"] == value
+    if name == FILTER_GAME:
+        return "%s/" % (value) in record["dir"]
+    if name == FILTER_GYR:
+        return all(
+            baseline(record, x, y)
+            for x, y in zip((FILTER_GAME, FILTER_YEAR, FILTER_RATING), value)
+        )
+
+    if type(value) not in (tuple, list):
+        value = (value, value)
+        single = True
+    else:
+        single = False
+    low, high = value
+
+    if name == FILTER_YEAR:
+        return low <= int(record["date"][0:4]) <= high
+    if name == FILTER_RATING:
+        tenths = int(("%.4f" % (record["rating"])).replace(".", "")) // 1000
+        return low * 10 <= tenths <= high * 10
+    if name == FILTER_SIZE:
+        size = record["size"] // 1000
+        return low <= size <= high if single else low <= size < high
+    if name == FILTER_VOTES:
+        votes = record["votes"]
+        return low <= votes <= high if single else low <= votes < high
+
+FILTERS = [
+    (FILTER_DATE, "2001-05-05"),
+    (FILTER_GAME, DOOM),
+    (FILTER_GAME, HERETIC),
+    (FILTER_GYR, (DOOM2, (1994, 2005), (2.0, 4.0))),
+    (FILTER_RATING, 3.0),
+    (FILTER_RATING, (3.0, 4.0)),
+    (FILTER_RATING, (2.5, 4.5)),
+    (FILTER_SIZE, 50),
+    (FILTER_SIZE, (10, 40)),
+    (FILTER_VOTES, 0),
+    (FILTER_VOTES, (5, 10)),
+    (FILTER_YEAR, 2001),
+    (FILTER_YEAR, (1994, 2001))
+]
+
+class SearchFilterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with FakeIdgames(500) as fake:
+            cls.records = [
+                fake.archive.records[x] for x in sorted(fake.archive.records)
+            ]
+
+        # Ratings, and dates, right on the edges of the filters.
+        for record, rating in zip(cls.records, (3.0, 4.0, 4.09, 4.1, 2.99)):
+            record["rating"] = rating
+        cls.records[0]["date"] = "2001-05-05"
+
+        cls.filter = SearchFilter()
+
+    def check(self, name, value, passes, fails):
+        """Checks which values of a field a filter lets through."""
+        field = name.split(":")[1]
+        match = self.filter.compile((name, value))
+
+        for x in passes:
+            self.assertTrue(match({field: x}), (value, x))
+        for x in fails:
+            self.assertFalse(match({field: x}), (value, x))
+
+    def test_rating_bounds(self):
+        self.assertEqual(
+            SearchFilter.bounds(FILTER_RATING, (3.0, 4.0)), (30, 40)
+        )
+        self.check(
+            FILTER_RATING, (3.0, 4.0), (3.0, 3.5, 4.0, 4.09), (2.99, 4.1)
+        )
+        self.check(FILTER_RATING, 4.0, (4.0, 4.05, 4.09), (3.99, 4.1))
+
+    def test_size_bounds(self):
+        self.assertEqual(
+            SearchFilter.bounds(FILTER_SIZE, (100, 200)), (100, 199)
+        )
+        self.check(
+            FILTER_SIZE, (100, 200), (100000, 150000, 199999),
+            (99999, 200000)
+        )
+        self.check(FILTER_SIZE, 100, (100000, 100999), (99999, 101000))
+
+    def test_votes_bounds(self):
+        self.assertEqual(SearchFilter.bounds(FILTER_VOTES, (5, 10)), (5, 9))
+        self.check(FILTER_VOTES, (5, 10), (5, 9), (4, 10))
+        self.check(FILTER_VOTES, 5, (5,), (4, 6))
+
+    def test_year_bounds(self):
+        self.assertEqual(
+            SearchFilter.bounds(FILTER_YEAR, (1994, 2000)), (1994, 2000)
+        )
+
+    def test_every_filter_matches_baseline(self):
+        for name, value in FILTERS:
+            self.assertEqual(
+                self.filter.chain(self.records, (name, value)),
+                [x for x in self.records if baseline(x, name, value)],
+                (name, value)
+            )
+
+    def test_chains_match_baseline(self):
+        chains = [FILTERS[1:4], FILTERS[5::3], FILTERS]
+
+        for filters in chains:
+            expected = [
+                x for x in self.records
+                if all(baseline(x, y, z) for y, z in filters)
+            ]
+            match = self.filter.compile(filters)
+
+            self.assertEqual(
+                self.filter.chain(self.records, filters), expected
+            )
+            self.assertEqual(
+                list(self.filter.ichain(self.records, filters)), expected
+            )
+            self.assertEqual(filter(match, self.records), expected)
+
+    def test_named_methods(self):
+        self.assertEqual(
+            self.filter.gyr(self.records, DOOM2, 2001, 4.0),
+            self.filter.chain(self.records, (FILTER_GYR, (DOOM2, 2001, 4.0)))
+        )
+        self.assertEqual(
+            self.filter.rating(self.records, (3.0, 4.0)),
+            self.filter.chain(self.records, (FILTER_RATING, (3.0, 4.0)))
+        )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
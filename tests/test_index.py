@@ -0,0 +1,100 @@
+#===============================================================================
+# Test Index: Tests for DAPIWIndex
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``SearchIndex``, checking it gives the same results as
+searching the list, on records from the fake idgames API.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import unittest
+
+from dapiwrap import (
+    DIRECT_ASC,
+    DIRECT_DESC,
+    INDEX_NGRAM_FIELDS,
+    INDEX_TOKEN_FIELDS,
+    SORT_RATING,
+    SORTS,
+    TYPE_FILE,
+    FakeIdgames
+)
+
+from dapiwrap.dapiwindex import SearchIndex
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class SearchIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with FakeIdgames(300) as fake:
+            cls.daw = fake.client()
+            cls.records = list(cls.daw.iter_files("levels/", recursive=True))
+            # With the long fields, which getfiles leaves out.
+            cls.full = [
+                fake.archive.records[x] for x in sorted(fake.archive.records)
+            ]
+
+    def ids(self, results):
+        return [x["id"] for x in results]
+
+    def test_same_as_list(self):
+        index = SearchIndex(self.full)
+
+        for query in ("doom", "e", "map", "zzz", "Hell Base"):
+            for srchtype in INDEX_NGRAM_FIELDS + INDEX_TOKEN_FIELDS:
+                params = {
+                    "type": srchtype, "sort": SORT_RATING, "dir": DIRECT_DESC
+                }
+                self.assertEqual(
+                    self.ids(self.daw.search_local(index, query, params)),
+                    self.ids(self.daw.search_local(self.full, query, params))
+                )
+
+    def test_sorts(self):
+        index = SearchIndex(self.records)
+
+        for sort in SORTS:
+            for direct in (DIRECT_ASC, DIRECT_DESC):
+                params = {"type": TYPE_FILE, "sort": sort, "dir": direct}
+                self.assertEqual(
+                    self.ids(self.daw.search_local(index, "a", params)),
+                    self.ids(self.daw.search_local(self.records, "a", params))
+                )
+
+    def test_add_and_remove(self):
+        index = SearchIndex(self.records[1:])
+        record = self.records[0]
+        params = {"type": TYPE_FILE}
+
+        index.add(record)
+        self.assertIn(
+            record["id"],
+            self.ids(self.daw.search_local(index, record["filename"], params))
+        )
+
+        index.remove(record["id"])
+        self.assertNotIn(
+            record["id"],
+            self.ids(self.daw.search_local(index, record["filename"], params))
+        )
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#===============================================================================
+# Test IO: Tests for IOFuncs
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for saving, and opening, JSON lines files, plain and gzipped, with
+records from the fake idgames archive.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    FakeIdgames,
+    IOFuncs,
+    JsonLinesWriter
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class JsonLinesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with FakeIdgames(100) as fake:
+            cls.records = [
+                fake.archive.records[x] for x in sorted(fake.archive.records)
+            ]
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        self.filename = os.path.join(self.folder, "records.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_round_trip(self):
+        for zipped in (False, True):
+            count = IOFuncs.save_jsonl(
+                (x for x in self.records), self.filename, zipped
+            )
+
+            self.assertEqual(count, len(self.records))
+            self.assertEqual(
+                list(IOFuncs.open_jsonl(self.filename, zipped)), self.records
+            )
+
+    def test_append(self):
+        for zipped in (False, True):
+            IOFuncs.save_jsonl(self.records[0:40], self.filename, zipped)
+            IOFuncs.save_jsonl(
+                self.records[40:], self.filename, zipped, append=True
+            )
+
+            self.assertEqual(
+                list(IOFuncs.open_jsonl(self.filename, zipped)), self.records
+            )
+
+    def test_replace(self):
+        IOFuncs.save_jsonl(self.records, self.filename)
+        IOFuncs.save_jsonl(self.records[0:5], self.filename)
+
+        self.assertEqual(
+            list(IOFuncs.open_jsonl(self.filename)), self.records[0:5]
+        )
+
+    def test_writer(self):
+        with JsonLinesWriter(self.filename, zipped=True) as writer:
+            writer.write(self.records[0])
+            writer.flush()
+            writer.extend(self.records[1:10])
+
+        self.assertEqual(writer.count, 10)
+        self.assertEqual(
+            list(IOFuncs.open_jsonl(self.filename, True)), self.records[0:10]
+        )
+
+    def test_cut_off_line(self):
+        IOFuncs.save_jsonl(self.records[0:10], self.filename)
+        with open(self.filename, "ab") as jsonl_file:
+            jsonl_file.write('{"id": 11, "title": "Cut o')
+
+        self.assertEqual(
+            list(IOFuncs.open_jsonl(self.filename)), self.records[0:10]
+        )
+
+    def test_bad_line(self):
+        with open(self.filename, "wb") as jsonl_file:
+            jsonl_file.write('{"id": 1}\nnot json\n{"id": 2}\n')
+
+        with self.assertRaises(ValueError):
+            list(IOFuncs.open_jsonl(self.filename))
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
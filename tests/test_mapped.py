@@ -0,0 +1,125 @@
+#===============================================================================
+# Test Mapped: Tests for DAPIWMapped
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``MappedCatalog``, built from records from the fake idgames
+API.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    FakeIdgames,
+    MappedCatalog,
+    WadInfo
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class MappedCatalogTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with FakeIdgames(100) as fake:
+            cls.records = fake.client().get_id_list(range(1, 51))
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        self.filename = os.path.join(self.folder, "catalog.cat")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_lookups(self):
+        for compress in (False, True):
+            self.assertEqual(
+                MappedCatalog.build(self.records, self.filename, compress), 50
+            )
+
+            with MappedCatalog(self.filename) as catalog:
+                self.assertEqual(len(catalog), 50)
+                self.assertEqual(catalog[7], self.records[6])
+                self.assertIn(50, catalog)
+                self.assertNotIn(51, catalog)
+                self.assertIsNone(catalog.get(0))
+                self.assertEqual(list(catalog.ids()), range(1, 51))
+                self.assertEqual(
+                    [x["id"] for x in catalog.get_id_list([3, 99, 1])], [3, 1]
+                )
+
+    def test_compact(self):
+        MappedCatalog.build(self.records, self.filename)
+
+        with MappedCatalog(self.filename, compact=True) as catalog:
+            self.assertIsInstance(catalog[3], WadInfo)
+            self.assertEqual(catalog[3], self.records[2])
+
+    def test_not_a_catalog(self):
+        with open(self.filename, "wb") as bad_file:
+            bad_file.write("not a catalog, but long enough to have a header")
+
+        self.assertRaises(ValueError, MappedCatalog, self.filename)
+
+    @unittest.skipIf(os.name == "nt", "Windows won't replace a mapped file.")
+    def test_rebuild_while_open(self):
+        MappedCatalog.build(self.records, self.filename)
+
+        with MappedCatalog(self.filename) as old:
+            MappedCatalog.build(self.records[0:10], self.filename)
+
+            self.assertEqual(old[40], self.records[39])
+            with MappedCatalog(self.filename) as new:
+                self.assertEqual(len(new), 10)
+
+        self.assertFalse(os.path.exists(self.filename + ".tmp"))
+
+    def test_shared_between_processes(self):
+        MappedCatalog.build(self.records, self.filename, True)
+        pool = multiprocessing.Pool(2)
+
+        try:
+            titles = pool.map(
+                _title, [(self.filename, x) for x in (1, 25, 50, 99)]
+            )
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertEqual(
+            titles,
+            [self.records[0]["title"], self.records[24]["title"],
+             self.records[49]["title"], None]
+        )
+
+def _title(job):
+    """Gets the title of a record, from a catalog opened in this process."""
+    filename, wad_id = job
+
+    with MappedCatalog(filename) as catalog:
+        wad_info = catalog.get(wad_id)
+
+    return wad_info and wad_info["title"]
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
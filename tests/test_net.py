@@ -0,0 +1,320 @@
+#===============================================================================
+# Test Net: Tests for DAPIWNet
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for the rate limits, mirror monitoring and connection pools, on their
+own, and against the fake idgames servers.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from dapiwrap import FakeIdgames
+
+from dapiwrap.dapiwnet import (
+    FTPPool,
+    MirrorMonitor,
+    RateLimiter,
+    SingleFlight,
+    TokenBucket
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(10, 3)
+
+        start = time.time()
+        for _ in xrange(3):
+            bucket.acquire()
+        self.assertLess(time.time() - start, 0.05)
+
+        for _ in xrange(3):
+            bucket.acquire()
+        self.assertGreaterEqual(time.time() - start, 0.25)
+
+    def test_no_limit(self):
+        bucket = TokenBucket(None)
+
+        self.assertEqual(bucket.acquire(10 ** 9), 0.0)
+
+    def test_shared_between_threads(self):
+        bucket = TokenBucket(20, 1)
+
+        def run():
+            for _ in xrange(5):
+                bucket.acquire()
+
+        threads = [threading.Thread(target=run) for _ in xrange(4)]
+
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        # 20 tokens, with one to start with, at 20 a second.
+        self.assertGreaterEqual(time.time() - start, 0.9)
+
+class RateLimiterTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(50).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def test_limits_api_calls(self):
+        daw = self.fake.client(limiter=RateLimiter(10, 2))
+
+        start = time.time()
+        daw.get_id_list(range(1, 7), workers=3)
+        seconds = time.time() - start
+        daw.close()
+
+        self.assertGreaterEqual(seconds, 0.35)
+
+    def test_limits_bytes(self):
+        limiter = RateLimiter(None, byte_rate=1000)
+
+        limiter.transfer(1000)
+        self.assertGreater(limiter.transfer(500), 0.4)
+
+class MirrorMonitorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(50).start()
+
+        # A mirror that refuses connections.
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        cls.dead = "http://127.0.0.1:%d/" % (sock.getsockname()[1])
+        sock.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def monitor(self, **kwargs):
+        return MirrorMonitor(
+            timeout=2, ftp_dirs={self.fake.ftp.url: ""}, **kwargs
+        )
+
+    def test_best_skips_mirrors_that_are_down(self):
+        monitor = self.monitor(max_failures=1)
+        mirrors = [self.dead, self.fake.http.url, self.fake.ftp.url]
+
+        self.assertNotEqual(monitor.best(mirrors), self.dead)
+        self.assertFalse(monitor.is_up(self.dead))
+        self.assertTrue(monitor.is_up(self.fake.http.url))
+        self.assertTrue(monitor.is_up(self.fake.ftp.url))
+
+        for _ in xrange(3):
+            monitor.record(self.fake.http.url, ok=False)
+        self.assertEqual(monitor.best(mirrors), self.fake.ftp.url)
+
+    def test_failed_probes_count_towards_max_failures(self):
+        monitor = self.monitor(max_failures=3)
+
+        for failures in xrange(1, 4):
+            self.assertFalse(monitor.probe(self.dead))
+            self.assertEqual(monitor.is_up(self.dead), failures < 3)
+
+        self.assertTrue(monitor.probe(self.fake.http.url))
+        self.assertEqual(monitor.snapshot()[self.fake.http.url]["failures"], 0)
+
+    def test_every_mirror_down(self):
+        monitor = self.monitor(max_failures=1)
+        mirrors = [self.fake.http.url, self.fake.ftp.url]
+        monitor.probe_all(mirrors)
+
+        monitor.record(self.fake.http.url, ok=False)
+        monitor.record(self.fake.ftp.url, ok=False)
+
+        # The one that was taken out first.
+        self.assertEqual(monitor.best(mirrors), self.fake.http.url)
+
+class FTPPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(50).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.server = self.fake.ftp.url
+        self.pool = FTPPool(size=2, timeout=5)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuses_sessions(self):
+        first = self.pool.acquire(self.server)
+        self.pool.release(self.server, first)
+
+        self.assertIs(self.pool.acquire(self.server), first)
+
+    def test_checks_idle_sessions(self):
+        self.pool.check_after = 0
+
+        first = self.pool.acquire(self.server)
+        self.pool.release(self.server, first)
+        second = self.pool.acquire(self.server)
+        self.pool.release(self.server, second)
+
+        # The session drops while it's idle.
+        first.sock.shutdown(socket.SHUT_RDWR)
+
+        self.assertIs(second, first)
+        self.assertIsNot(self.pool.acquire(self.server), first)
+
+    def test_does_not_reuse_broken_sessions(self):
+        first = self.pool.acquire(self.server)
+        self.pool.release(self.server, first, broken=True)
+
+        second = self.pool.acquire(self.server)
+
+        self.assertIsNot(second, first)
+        second.voidcmd("NOOP")
+
+    def test_size_limit(self):
+        sessions = [self.pool.acquire(self.server) for _ in xrange(2)]
+        got = []
+
+        thread = threading.Thread(
+            target=lambda: got.append(self.pool.acquire(self.server))
+        )
+        thread.start()
+        time.sleep(0.2)
+        self.assertEqual(got, [])
+
+        self.pool.release(self.server, sessions[0])
+        thread.join(5)
+        self.assertEqual(got, [sessions[0]])
+
+    def test_downloads_share_a_session(self):
+        folder = tempfile.mkdtemp(prefix="dapiwrap-test-") + os.sep
+        daw = self.fake.client()
+
+        try:
+            for wad_info in daw.get_id_list([1, 2, 3]):
+                daw.download.ftp_download(
+                    wad_info["filename"], wad_info["dir"], folder,
+                    self.server, size=wad_info["size"]
+                )
+            sessions = [daw.download.ftp.acquire(self.server) for _ in (1, 2)]
+        finally:
+            daw.close()
+            shutil.rmtree(folder)
+
+        self.assertGreater(sessions[0].last_used, 0)
+        self.assertEqual(sessions[1].last_used, 0)
+
+class SingleFlightTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(50, latency=0.3).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def run_at_once(self, func, count=8):
+        """Runs a function on several threads at once."""
+        results = []
+        start = threading.Event()
+
+        def run():
+            start.wait()
+            try:
+                results.append(func())
+            except Exception as err:
+                results.append(err)
+
+        threads = [threading.Thread(target=run) for _ in xrange(count)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join(30)
+
+        return results
+
+    def test_identical_calls_make_one_request(self):
+        daw = self.fake.client()
+        requests = self.fake.api.requests
+
+        wads = self.run_at_once(lambda: daw.get_id(9))
+
+        self.assertEqual(self.fake.api.requests - requests, 1)
+        self.assertEqual(daw.flights.shared, 7)
+        self.assertEqual([x["id"] for x in wads], [9] * 8)
+
+        # Once it's done, the next call makes its own request.
+        daw.get_id(9)
+        self.assertEqual(self.fake.api.requests - requests, 2)
+
+    def test_different_calls_are_not_shared(self):
+        daw = self.fake.client()
+        requests = self.fake.api.requests
+        ids = iter(xrange(1, 9))
+
+        self.run_at_once(lambda: daw.get_id(next(ids)))
+
+        self.assertEqual(self.fake.api.requests - requests, 8)
+
+    def test_without_single_flight(self):
+        daw = self.fake.client(single_flight=False)
+        requests = self.fake.api.requests
+
+        self.run_at_once(lambda: daw.get_id(9), 4)
+
+        self.assertEqual(self.fake.api.requests - requests, 4)
+
+    def test_errors_are_shared(self):
+        flights = SingleFlight()
+        calls = []
+
+        def fail():
+            calls.append(1)
+            time.sleep(0.3)
+            raise IOError("Failed.")
+
+        errors = self.run_at_once(lambda: flights.do("key", fail), 4)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([type(x) for x in errors], [IOError] * 4)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#===============================================================================
+# Test Record: Tests for DAPIWRecord
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``WadInfo``, checking it can stand in for the ``dict`` form of wad
+info, from the fake idgames API.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    FILTER_RATING,
+    TYPE_AUTHOR,
+    FakeIdgames,
+    IOFuncs,
+    WadInfo
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class WadInfoTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.record = self.fake.client().get_id(7)
+
+    def test_same_as_dict(self):
+        wad = WadInfo(self.record)
+
+        self.assertEqual(wad, self.record)
+        self.assertEqual(wad.to_dict(), self.record)
+        self.assertEqual(sorted(wad.keys()), sorted(self.record))
+        self.assertEqual(wad["textfile"], self.record["textfile"])
+        self.assertEqual(wad.get("nonsense", 1), 1)
+        self.assertNotIn("nonsense", wad)
+        with self.assertRaises(KeyError):
+            wad["nonsense"]
+
+    def test_changes(self):
+        wad = WadInfo(self.record)
+
+        wad["title"] = u"Caf\xe9"
+        wad["extra"] = [1, 2]
+        wad["textfile"] = u"\u263a" * 100
+        del wad["votes"]
+
+        self.assertEqual(wad["title"], u"Caf\xe9")
+        self.assertEqual(wad["extra"], [1, 2])
+        self.assertEqual(wad.textfile, u"\u263a" * 100)
+        self.assertNotIn("votes", wad)
+        with self.assertRaises(KeyError):
+            del wad["votes"]
+
+    def test_shares_values(self):
+        first = WadInfo(self.record)
+        second = WadInfo(dict(self.record, dir=u"%s" % (self.record["dir"])))
+
+        self.assertIs(first["dir"], second["dir"])
+        self.assertIsInstance(first["filename"], str)
+
+    def test_pickle(self):
+        wad = WadInfo(self.record)
+
+        self.assertEqual(pickle.loads(pickle.dumps(wad, 2)), wad)
+
+    def test_compact_client(self):
+        daw = self.fake.client(compact=True)
+        wads = daw.get_id_list([1, 2, 3, 4, 5])
+        files = daw.get_files(self.record["dir"])
+
+        self.assertTrue(all(isinstance(x, WadInfo) for x in wads + files))
+        self.assertIsInstance(daw.get_id(7), WadInfo)
+        self.assertEqual(daw.get_id(7), self.record)
+
+        # It works wherever the dict form does.
+        dicts = self.fake.client().get_id_list([1, 2, 3, 4, 5])
+        self.assertEqual(
+            daw.filter.chain(wads, (FILTER_RATING, (0.0, 5.0))),
+            daw.filter.chain(dicts, (FILTER_RATING, (0.0, 5.0)))
+        )
+        self.assertEqual(
+            daw.search_local(wads, "a", {"type": TYPE_AUTHOR}),
+            daw.search_local(dicts, "a", {"type": TYPE_AUTHOR})
+        )
+
+        folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        filename = os.path.join(folder, "records.jsonl")
+        try:
+            IOFuncs.save_jsonl(wads, filename)
+            self.assertEqual(list(IOFuncs.open_jsonl(filename)), dicts)
+        finally:
+            shutil.rmtree(folder)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
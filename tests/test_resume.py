@@ -0,0 +1,119 @@
+#===============================================================================
+# Test Resume: Tests for Resumed Downloads
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for carrying on downloads from ``.part`` files, against the fake
+HTTP and FTP mirrors.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    PART_EXT,
+    FakeIdgames
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class ResumeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fake = FakeIdgames(100).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.fake.stop()
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-") + os.sep
+        self.daw = self.fake.client()
+
+    def tearDown(self):
+        self.daw.close()
+        shutil.rmtree(self.folder)
+
+    def resume(self, download, server, wad_id):
+        """
+        Starts a download from a ``.part`` file of made up bytes, so it can
+        be told whether the download carried on from it, or started over.
+
+        """
+        wad_info = self.daw.get_id(wad_id)
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+        save_loc = self.folder + wad_info["filename"]
+
+        with open(save_loc + PART_EXT, "wb") as part_file:
+            part_file.write("x" * 1000)
+
+        download(
+            wad_info["filename"], wad_info["dir"], self.folder, server,
+            size=wad_info["size"]
+        )
+
+        with open(save_loc, "rb") as wad_file:
+            self.assertEqual(wad_file.read(), "x" * 1000 + data[1000:])
+        self.assertFalse(os.path.exists(save_loc + PART_EXT))
+
+    def test_http_resume(self):
+        self.resume(self.daw.download.http_download, self.fake.http.url, 10)
+
+    def test_ftp_resume(self):
+        self.resume(self.daw.download.ftp_download, self.fake.ftp.url, 11)
+
+    def test_finished_part_file(self):
+        wad_info = self.daw.get_id(12)
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+        save_loc = self.folder + wad_info["filename"]
+
+        with open(save_loc + PART_EXT, "wb") as part_file:
+            part_file.write(data)
+
+        requests = self.fake.http.requests
+        self.daw.download.http_download(
+            wad_info["filename"], wad_info["dir"], self.folder,
+            self.fake.http.url, size=wad_info["size"]
+        )
+
+        self.assertEqual(self.fake.http.requests, requests)
+        with open(save_loc, "rb") as wad_file:
+            self.assertEqual(wad_file.read(), data)
+
+    def test_oversized_part_file(self):
+        wad_info = self.daw.get_id(13)
+        data = self.fake.archive.data(wad_info["dir"] + wad_info["filename"])
+        save_loc = self.folder + wad_info["filename"]
+
+        with open(save_loc + PART_EXT, "wb") as part_file:
+            part_file.write("x" * (wad_info["size"] + 10))
+
+        self.daw.download.http_download(
+            wad_info["filename"], wad_info["dir"], self.folder,
+            self.fake.http.url, size=wad_info["size"]
+        )
+
+        with open(save_loc, "rb") as wad_file:
+            self.assertEqual(wad_file.read(), data)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()
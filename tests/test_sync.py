@@ -0,0 +1,128 @@
+#===============================================================================
+# Test Sync: Tests for CatalogSync
+#-------------------------------------------------------------------------------
+# Version: 0.3.0
+# Updated: 15-06-2014
+# Author: Alex Crawford
+# License: MIT
+#===============================================================================
+
+"""
+Tests for ``CatalogSync``, adding votes to the fake idgames archive
+between syncs.
+
+"""
+
+#===============================================================================
+# Imports
+#===============================================================================
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dapiwrap import (
+    CatalogSync,
+    FakeIdgames
+)
+
+#===============================================================================
+# Tests
+#===============================================================================
+
+class CatalogSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeIdgames(300).start()
+        self.archive = self.fake.archive
+        self.folder = tempfile.mkdtemp(prefix="dapiwrap-test-")
+        self.state = os.path.join(self.folder, "sync.json")
+        self.sync = CatalogSync(self.fake.client(), self.state, limit=10)
+
+    def tearDown(self):
+        self.fake.stop()
+        shutil.rmtree(self.folder)
+
+    def vote(self, wad_id, count=1):
+        """Adds identical votes, with no review, for a file."""
+        for _ in xrange(count):
+            self.archive.votes.insert(0, {
+                "id": wad_id,
+                "title": self.archive.records[wad_id]["title"],
+                "reviewtext": "", "vote": 5
+            })
+
+    def old_file(self):
+        """Gets a file in a directory none of the latest files are in."""
+        latest = sorted(self.archive.records)[-self.sync.limit:]
+        latest_dirs = set(self.archive.records[x]["dir"] for x in latest)
+
+        return [
+            x for x in sorted(self.archive.records)
+            if self.archive.records[x]["dir"] not in latest_dirs
+        ][0]
+
+    def test_first_sync_only_marks(self):
+        result = self.sync.sync()
+
+        self.assertEqual((result["new"], result["changed"]), ([], []))
+        self.assertEqual(self.sync.last_id, max(self.archive.records))
+
+    def test_votes(self):
+        self.sync.sync()
+        wad_id = self.old_file()
+
+        self.vote(wad_id, 2)
+        result = self.sync.sync()
+
+        self.assertFalse(result["gap"])
+        self.assertEqual([x["id"] for x in result["changed"]], [wad_id])
+
+        # The marks are kept between runs.
+        self.assertEqual(
+            CatalogSync(self.fake.client(), self.state).votes,
+            self.sync.votes
+        )
+        self.assertEqual(self.sync.sync()["changed"], [])
+
+    def test_identical_votes(self):
+        self.sync.sync()
+        wad_id = self.old_file()
+
+        # The same as the newest vote, which was seen last sync.
+        newest = self.archive.votes[0]
+        self.archive.votes.insert(0, dict(newest))
+        result = self.sync.sync()
+
+        self.assertFalse(result["gap"])
+        self.assertEqual([x["id"] for x in result["changed"]], [newest["id"]])
+
+        self.vote(wad_id)
+        self.vote(wad_id)
+        result = self.sync.sync()
+
+        self.assertFalse(result["gap"])
+        self.assertEqual([x["id"] for x in result["changed"]], [wad_id])
+
+    def test_votes_gap_rescans_voted_dirs(self):
+        self.sync.sync()
+        wad_id = self.old_file()
+        wad_dir = self.archive.records[wad_id]["dir"]
+
+        self.vote(wad_id, self.sync.limit + 2)
+        result = self.sync.sync()
+
+        self.assertTrue(result["gap"])
+        changed = set(x["id"] for x in result["changed"])
+        self.assertTrue(set(
+            x for x, y in self.archive.records.iteritems()
+            if y["dir"] == wad_dir
+        ) <= changed)
+
+#===============================================================================
+# If Main
+#===============================================================================
+
+if __name__ == '__main__':
+    unittest.main()